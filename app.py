@@ -1,13 +1,26 @@
 import os
-from utils.file_utils import get_dirs, get_files_in_dir, get_specs_dict, is_valid_spec
+import time
+from utils.compression import CODECS, load_codec_module
+from utils.datatypes import get_datatype
+from utils.engines import ENGINES, get_engine
+from utils.file_utils import DEFAULT_CHUNK_SIZE, get_dirs, get_files_in_dir, get_stem, index_data_files, \
+    match_spec_name, scan_files
+from utils.formatter import Formatter, Spec, process_file
+from utils.manifest import is_up_to_date, load_manifest, make_entry, save_manifest
+from utils.metrics import Metrics
+from utils.query import Query
+from utils.registry import SpecRegistry, get_entry_formatter, get_entry_spec
+from utils.serializers import SERIALIZERS, get_serializer
+from utils.sharding import get_shard_ranges
+from utils.sinks import OUTPUT_FORMATS, get_extension, merge_outputs
+from utils.watcher import DirectoryWatcher
+from utils.writer import DEFAULT_BUFFER_SIZE
 
-# Get base directory and directories
+# Get base directory
 BASE_DIR = os.path.abspath(os.path.dirname(__file__))
-[specs_dir, data_dir, output_dir] = get_dirs(BASE_DIR)
 
-# Get list of files in specs and data
-specs_files = get_files_in_dir(specs_dir)
-data_files = get_files_in_dir(data_dir)
+# Compiled specs and options set up once per worker process by init_worker
+worker_state = {}
 
 def get_output_line(line, dict_specs):
     """
@@ -25,60 +38,835 @@ def get_output_line(line, dict_specs):
 
     for column_name, column_specs in dict_specs.items():
         width = int(column_specs['width'])
-        datatype = column_specs['datatype'].lower()
+        datatype = get_datatype(column_specs['datatype'])
         end = start + width
         value = line[start:end].strip()
 
-        # Convert the value based on the datatype
-        if datatype == 'boolean':
-            output_line[column_name] = value == '1'
-        elif datatype == 'integer':
-            try:
-                output_line[column_name] = int(value)
-            except ValueError:
-                output_line[column_name] = None
-        elif datatype == 'text':
-            output_line[column_name] = value
-        else:
-            output_line[column_name] = value
+        # Convert the value based on the datatype, unknown datatypes are kept as text
+        output_line[column_name] = datatype.convert(value)
 
         start = end
-        
+
     return output_line
 
-def process_data(specs_dir, data_dir, output_dir, specs_files, data_files):
+def make_result(data_file, output_path, rows=0, seconds=0.0, error=None, skipped=False, metrics=None):
+    """
+    Build the result reported for a processed data file.
+
+    Args:
+        data_file (str): File name of the data file.
+        output_path (str): Path of the output file.
+        rows (int): Number of rows written.
+        seconds (float): Time spent processing the file.
+        error (str): Description of the error raised while processing the file, if any.
+        skipped (bool): Whether the file was skipped because its output is up to date.
+        metrics (Metrics): Metrics of the file, if the run is measured.
+
+    Returns:
+        dict: Result with the data file, output file, row count, elapsed seconds,
+            error message, whether the file was skipped and its metrics.
+    """
+    return {
+        'data_file': data_file,
+        'output_file': output_path,
+        'rows': rows,
+        'seconds': seconds,
+        'error': error,
+        'skipped': skipped,
+        'metrics': metrics
+    }
+
+def describe_error(error):
+    """
+    Describe an exception for reporting in results.
+
+    Args:
+        error (Exception): Exception to describe.
+
+    Returns:
+        str: Exception type and message.
+    """
+    return f"{type(error).__name__}: {error}"
+
+def run_job(compiled, data_file, data_path, output_path, start, end, options):
+    """
+    Process a data file or a byte range of it, capturing its timing and any error.
+
+    Args:
+        compiled (tuple): Decoder and serializer compiled for the data file's spec.
+        data_file (str): File name of the data file.
+        data_path (str): Path of the data file to process.
+        output_path (str): Path of the output file to write.
+        start (int): Byte offset of the first line to process.
+        end (int): Byte offset where processing stops, None processes to the end of the file.
+        options (dict): Options of the run, as built by process_data.
+
+    Returns:
+        dict: Result as returned by make_result.
+    """
+    metrics = Metrics(**options['metrics']) if options['metrics'] is not None else None
+    started = time.perf_counter()
+
+    try:
+        rows = process_file(*compiled, data_path, output_path, chunk_size=options['chunk_size'], start=start, end=end,
+                            engine=options['engine'], output_format=options['output_format'], metrics=metrics,
+                            compression=options['compression'], buffer_size=options['buffer_size'])
+    except Exception as e:
+        return make_result(data_file, output_path, seconds=time.perf_counter() - started, error=describe_error(e))
+
+    seconds = time.perf_counter() - started
+    if metrics is not None:
+        metrics.seconds = seconds
+    return make_result(data_file, output_path, rows, seconds, metrics=metrics)
+
+def make_formatters(specs_by_name, options):
+    """
+    Build a Formatter of every spec with the engine, serializer and query selected in the options.
+
+    Args:
+        specs_by_name (dict): Dictionary mapping spec names to column specifications.
+        options (dict): Options of the run, as built by process_data.
+
+    Returns:
+        dict: Dictionary mapping spec names to Formatters.
+    """
+    return {
+        spec_name: Formatter(Spec(dict_specs, spec_name), engine=options['engine'], serializer=options['serializer'],
+                             query=options['query'])
+        for spec_name, dict_specs in specs_by_name.items()
+    }
+
+def compile_specs(formatters):
+    """
+    Compile the decoder and serializer of every spec, or reuse those its Formatter already compiled.
+
+    Args:
+        formatters (dict): Dictionary mapping spec names to Formatters.
+
+    Returns:
+        dict: Dictionary mapping spec names to (decoder, serializer) tuples.
+    """
+    return {spec_name: (formatter.get_decoder(), formatter.get_serializer())
+            for spec_name, formatter in formatters.items()}
+
+def init_worker(specs_by_name, options):
+    """
+    Compile every spec once when a worker process starts.
+
+    Args:
+        specs_by_name (dict): Dictionary mapping spec names to column specifications.
+        options (dict): Options of the run, as built by process_data.
+    """
+    worker_state['compiled'] = compile_specs(make_formatters(specs_by_name, options))
+    worker_state['options'] = options
+
+def run_worker_job(spec_name, *job):
+    """
+    Run a job in a worker process using its precompiled decoder and serializer.
+    """
+    return run_job(worker_state['compiled'][spec_name], *job, worker_state['options'])
+
+def run_jobs(jobs, formatters, workers, options):
+    """
+    Run jobs in this process or in a process pool.
+
+    Jobs run in this process reuse the decoders and serializers the
+    Formatters already compiled, worker processes compile their own once.
+
+    Args:
+        jobs (list): Jobs as (spec name, data file, data path, output path, start, end) tuples.
+        formatters (dict): Dictionary mapping spec names to Formatters.
+        workers (int): Number of worker processes, 1 runs jobs in this process
+            and None uses every CPU.
+        options (dict): Options of the run, as built by process_data.
+
+    Returns:
+        list: One result per job, in job order.
+    """
+    if workers == 1 or len(jobs) <= 1:
+        compiled = compile_specs(formatters)
+        return [run_job(compiled[spec_name], *job, options) for spec_name, *job in jobs]
+
+    # Imported here so importing this module stays cheap
+    from concurrent.futures import ProcessPoolExecutor
+
+    results = []
+    specs_by_name = {spec_name: formatter.spec.dict_specs for spec_name, formatter in formatters.items()}
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                             initargs=(specs_by_name, options)) as executor:
+        futures = [executor.submit(run_worker_job, *job) for job in jobs]
+
+        # Collect in submission order so results are deterministic
+        for future, job in zip(futures, jobs):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append(make_result(job[1], job[3], error=describe_error(e)))
+
+    return results
+
+def run_sharded_jobs(jobs, formatters, workers, options, shards):
+    """
+    Run jobs with each data file split into line-aligned byte ranges.
+
+    Every range is written to its own part file, then the parts are joined in
+    order into the job's output file.
+
+    Args:
+        jobs (list): Jobs as (spec name, data file, data path, output path, start, end) tuples.
+        formatters (dict): Dictionary mapping spec names to Formatters.
+        workers (int): Number of worker processes, None uses every CPU.
+        options (dict): Options of the run, as built by process_data.
+        shards (int): Number of byte ranges each data file is split into.
+
+    Returns:
+        list: One result per job, in job order.
+    """
+    results = [None] * len(jobs)
+    shard_jobs = []
+    owners = []
+
+    for index, (spec_name, data_file, data_path, output_path, _, _) in enumerate(jobs):
+        try:
+            ranges = get_shard_ranges(data_path, shards)
+        except OSError as e:
+            results[index] = make_result(data_file, output_path, error=describe_error(e))
+            continue
+
+        for part, (start, end) in enumerate(ranges):
+            shard_jobs.append((spec_name, data_file, data_path, f"{output_path}.part{part}", start, end))
+            owners.append(index)
+
+    shard_results = run_jobs(shard_jobs, formatters, workers, options)
+
+    for index, (_, data_file, _, output_path, _, _) in enumerate(jobs):
+        if results[index] is not None:
+            continue
+
+        parts = [result for owner, result in zip(owners, shard_results) if owner == index]
+        rows = sum(result['rows'] for result in parts)
+        seconds = sum(result['seconds'] for result in parts)
+        error = next((result['error'] for result in parts if result['error']), None)
+        part_paths = [result['output_file'] for result in parts]
+        metrics = None
+
+        if error is None:
+            started = time.perf_counter()
+            try:
+                merge_outputs(options['output_format'], part_paths, output_path)
+            except Exception as e:
+                error = describe_error(e)
+            merged = time.perf_counter()
+            seconds += merged - started
+
+            if error is None and options['metrics'] is not None:
+                metrics = Metrics(**options['metrics'])
+                for result in parts:
+                    metrics.merge(result['metrics'])
+                metrics.stages['merge'] = merged - started
+                metrics.seconds = seconds
+                metrics.bytes_out = os.path.getsize(output_path)
+
+        # Remove parts left behind by a failed shard or merge
+        for part_path in part_paths:
+            if os.path.exists(part_path):
+                os.remove(part_path)
+
+        results[index] = make_result(data_file, output_path, rows, seconds, error, metrics=metrics)
+
+    return results
+
+def run_incremental_jobs(jobs, formatters, spec_hashes, data_stats, output_dir, workers, options, shards, force):
+    """
+    Run only the jobs whose output is missing or out of date, recording produced outputs in the manifest.
+
+    Args:
+        jobs (list): Jobs as (spec name, data file, data path, output path, start, end) tuples.
+        formatters (dict): Dictionary mapping spec names to Formatters.
+        spec_hashes (dict): Dictionary mapping spec names to hashes of their spec files.
+        data_stats (dict): Dictionary mapping data file names to their stat, for those already known.
+        output_dir (str): Directory where output files are written.
+        workers (int): Number of worker processes, None uses every CPU.
+        options (dict): Options of the run, as built by process_data.
+        shards (int): Number of byte ranges each data file is split into.
+        force (bool): Run every job even if its output is up to date.
+
+    Returns:
+        list: One result per job, in job order.
+    """
+    manifest = load_manifest(output_dir)
+    settings = {'serializer': options['serializer'], 'output_format': options['output_format']}
+    if options['query'] is not None:
+        settings['query'] = options['query'].describe()
+    results = [None] * len(jobs)
+    pending = []
+    entries = {}
+
+    for index, (spec_name, data_file, data_path, output_path, _, _) in enumerate(jobs):
+        output_name = os.path.basename(output_path)
+        previous = manifest.get(output_name)
+
+        try:
+            entry = make_entry(data_path, spec_hashes[spec_name], settings, previous, data_stats.get(data_file))
+        except OSError:
+            # Let processing report the error
+            pending.append(index)
+            continue
+
+        if not force and is_up_to_date(previous, entry, output_path):
+            manifest[output_name] = entry
+            results[index] = make_result(data_file, output_path, skipped=True)
+        else:
+            pending.append(index)
+            entries[output_name] = entry
+
+    pending_jobs = [jobs[index] for index in pending]
+    if shards > 1:
+        pending_results = run_sharded_jobs(pending_jobs, formatters, workers, options, shards)
+    else:
+        pending_results = run_jobs(pending_jobs, formatters, workers, options)
+
+    for index, result in zip(pending, pending_results):
+        results[index] = result
+        output_name = os.path.basename(result['output_file'])
+        if result['error'] or output_name not in entries:
+            manifest.pop(output_name, None)
+        else:
+            manifest[output_name] = entries[output_name]
+
+    save_manifest(output_dir, manifest)
+    return results
+
+def load_spec(registry, specs_dir, spec_file):
+    """
+    Get the registry entry of a spec, reporting why it is skipped if it cannot be used.
+
+    The spec, its hash and its Formatters all come from the one entry, so
+    they are consistent even if the file changes meanwhile.
+
+    Args:
+        registry (SpecRegistry): Registry caching parsed specs.
+        specs_dir (str): Directory containing spec files.
+        spec_file (str): File name of the spec file.
+
+    Returns:
+        dict: Entry of a valid spec, see SpecRegistry.get_entry, or None if it is skipped.
+    """
+    if not spec_file.endswith('.csv'):
+        print(f"Skipping {spec_file} because it is not a .csv file")
+        return None
+
+    try:
+        entry = registry.get_entry(os.path.join(specs_dir, spec_file))
+        get_entry_spec(entry)
+        return entry
+    except ValueError as e:
+        print(f"Skipping {spec_file} because {e}")
+    except OSError as e:
+        print(f"Skipping {spec_file} because it could not be read: {describe_error(e)}")
+    return None
+
+def process_data(specs_dir, data_dir, output_dir, specs_files, data_files, chunk_size=DEFAULT_CHUNK_SIZE, workers=1,
+                 shards=1, engine='text', serializer='template', output_format='ndjson', incremental=False,
+                 force=False, metrics=None, registry=None, compression=None, buffer_size=DEFAULT_BUFFER_SIZE,
+                 query=None):
     """
     Process data files based on specifications and write output to JSON lines format.
 
+    A data file that fails to process is reported in the results and does not
+    stop the remaining files from being processed. Output files are written
+    to a temporary file, fsynced and renamed into the output directory once
+    complete, so a crashed or failed run never leaves a truncated output.
+
     Args:
         specs_dir (str): Directory containing specification files.
         data_dir (str): Directory containing data files.
         output_dir (str): Directory where output files will be written.
         specs_files (list): List of specification file names.
-        data_files (list): List of data file names.
+        data_files (list): List of data file names, or a dictionary mapping them
+            to their stat as returned by scan_files. Each data file is matched
+            to the spec its name starts with, see match_spec_name; data files
+            matching no spec are reported and skipped. Data files ending with
+            the extension of a codec, e.g. `.txt.gz`, are decompressed.
+        chunk_size (int): Maximum number of lines held in memory at once per file.
+        workers (int): Number of worker processes, 1 processes files in this process
+            and None uses every CPU.
+        shards (int): Number of line-aligned byte ranges each data file is split
+            into, so a single large file can be processed by several workers.
+            Compressed data files are not split.
+        engine (str): Engine reading data files, 'text', 'mmap' or 'numpy'. The
+            'mmap' and 'numpy' engines parse bytes and decode text columns as
+            Latin-1, which gives the same output as 'text' for ASCII and Latin-1
+            data files. The 'numpy' engine requires numpy.
+        serializer (str): Serializer writing output rows: 'template' (default) and
+            'json' write standard library formatted JSON, 'orjson' writes compact
+            JSON and requires orjson, 'auto' uses orjson when it is installed.
+        output_format (str): 'ndjson' (default), or 'arrow', 'feather' or 'parquet'
+            to write typed columnar files with pyarrow, one record batch per chunk.
+        incremental (bool): Skip data files whose output is up to date according
+            to the manifest in the output directory, and record produced outputs
+            in it. An output is up to date when its data file content, spec file,
+            serializer and output format are unchanged, and it was produced by a
+            release converting data the same way, see OUTPUT_VERSION.
+        force (bool): With `incremental`, process every data file anyway and
+            refresh the manifest.
+        metrics (Metrics): Metrics filled with the totals of the run and the
+            metrics of each processed data file: stage timers, rows, bytes in
+            and out and conversion failures per column. None, the default,
+            measures nothing and adds no per-chunk work.
+        registry (SpecRegistry): Registry reading and caching the specs, so
+            repeated runs only read specs that changed, and their Formatters,
+            so runs in this process reuse their compiled decoders and
+            serializers. Defaults to a new registry, which reads each spec file once.
+        compression (str): Codec compressing NDJSON output files, 'gzip', 'zstd'
+            (requires zstandard) or 'lz4' (requires lz4), in a background thread
+            per output file when there is more than one CPU. None, the default,
+            writes uncompressed files.
+        buffer_size (int): Bytes of output gathered before each write to an
+            output file, so slow or network filesystems see few large writes.
+        query (Query): Columns to output and conditions rows must meet, checked
+            while parsing so unselected columns and rejected rows are never
+            converted. Specs lacking a column of the query are reported and
+            skipped with their data files. Outputs are recorded in the manifest
+            with the query, so changing it reprocesses them. None, the default,
+            outputs every column of every row.
+
+    Returns:
+        list: One result per processed data file, in spec then data file order.
     """
+    # Fail fast on an unknown engine, serializer, output format or codec rather than once per data file
+    get_engine(engine)
+    get_serializer(serializer, [])
+    extension = get_extension(output_format, compression)
+    if compression:
+        load_codec_module(compression)
+    options = {
+        'chunk_size': chunk_size,
+        'engine': engine,
+        'serializer': serializer,
+        'output_format': output_format,
+        'compression': compression,
+        'buffer_size': buffer_size,
+        'query': query,
+        'metrics': metrics.get_options() if metrics is not None else None
+    }
+    started = time.perf_counter()
+    registry = registry if registry is not None else SpecRegistry()
+    formatters = {}
+    spec_hashes = {}
+    unqueried = set()
+    jobs = []
+
     for spec_file in specs_files:
-        if not is_valid_spec(spec_file, specs_dir):
+        entry = load_spec(registry, specs_dir, spec_file)
+        if entry is None:
             continue
 
         spec_filename = os.path.splitext(spec_file)[0]
-        dict_specs = get_specs_dict(spec_file, specs_dir)
+        if query is not None:
+            try:
+                query.resolve(entry['spec'].columns)
+            except ValueError as e:
+                print(f"Skipping {spec_file} because the query does not apply: {e}")
+                unqueried.add(spec_filename)
+                continue
 
-        for data_file in data_files:
-            data_filename = os.path.splitext(data_file)[0].split('_')[0]
+        # The registry keeps Formatters, so repeated runs reuse their compiled decoders and serializers
+        formatters[spec_filename] = get_entry_formatter(entry, engine, serializer, query)
+        spec_hashes[spec_filename] = entry['sha256']
 
-            if spec_filename != data_filename:
-                continue
+    # Match every data file to its spec in one pass, the data files of skipped specs are not orphans
+    data_by_spec, orphans = index_data_files(data_files, set(formatters) | unqueried)
+    for data_file in orphans:
+        print(f"Skipping {data_file} because no spec matches its name")
 
+    for spec_filename in formatters:
+        for data_file in data_by_spec.get(spec_filename, []):
             # Prepare output file
-            output_filename = os.path.join(output_dir, f"{os.path.splitext(data_file)[0]}.ndjson")
+            output_filename = os.path.join(output_dir, f"{get_stem(data_file)}{extension}")
+            jobs.append((spec_filename, data_file, os.path.join(data_dir, data_file), output_filename, 0, None))
+
+    if incremental:
+        data_stats = data_files if isinstance(data_files, dict) else {}
+        results = run_incremental_jobs(jobs, formatters, spec_hashes, data_stats, output_dir, workers, options,
+                                       shards, force)
+    elif shards > 1:
+        results = run_sharded_jobs(jobs, formatters, workers, options, shards)
+    else:
+        results = run_jobs(jobs, formatters, workers, options)
+
+    for result in results:
+        if result['error']:
+            print(f"Failed to process {result['data_file']}: {result['error']}")
+        if metrics is not None and result['metrics'] is not None:
+            metrics.add_file(result['data_file'], result['metrics'])
+
+    if metrics is not None:
+        metrics.wall_seconds = time.perf_counter() - started
+
+    return results
+
+def format_summary(results):
+    """
+    Format per-file timings of a run as a table.
+
+    Args:
+        results (list): Results as returned by process_data.
+
+    Returns:
+        str: Summary with one line per data file followed by totals.
+    """
+    lines = []
+    for result in results:
+        status = 'FAILED' if result['error'] else 'skipped' if result['skipped'] else 'ok'
+        lines.append(f"{result['data_file']:<40} {result['rows']:>12} rows {result['seconds']:>9.3f}s  {status}")
+
+    failed = sum(1 for result in results if result['error'])
+    skipped = sum(1 for result in results if result['skipped'])
+    rows = sum(result['rows'] for result in results)
+    lines.append(f"{len(results)} files, {len(results) - failed - skipped} processed, {skipped} skipped, "
+                 f"{failed} failed, {rows} rows")
+    return '\n'.join(lines)
+
+def run_watched_job(spec_name, dict_specs, data_file, data_path, output_path, options):
+    """
+    Run a job in a watch worker process, compiling its spec again only when the spec changed.
+
+    Args:
+        spec_name (str): Name of the data file's spec.
+        dict_specs (dict): Current column specifications of that spec.
+        data_file (str): File name of the data file.
+        data_path (str): Path of the data file to process.
+        output_path (str): Path of the output file to write.
+        options (dict): Options of the run, as built by watch.
+
+    Returns:
+        dict: Result as returned by make_result.
+    """
+    watched = worker_state.setdefault('watched', {})
+    cached = watched.get(spec_name)
+    if cached is None or cached[0] != dict_specs:
+        formatters = make_formatters({spec_name: dict_specs}, options)
+        cached = watched[spec_name] = (dict_specs, compile_specs(formatters)[spec_name])
+    return run_job(cached[1], data_file, data_path, output_path, 0, None, options)
+
+def format_watch_result(result):
+    """
+    Format the result of a data file converted while watching.
+
+    Args:
+        result (dict): Result as returned by make_result, with its 'latency'.
+
+    Returns:
+        str: One line with the row count, processing time and latency since the file landed.
+    """
+    if result['error']:
+        return f"{result['data_file']}: FAILED {result['error']}"
+    return (f"{result['data_file']}: {result['rows']} rows in {result['seconds']:.3f}s, "
+            f"written {result['latency']:.3f}s after it landed")
+
+async def watch(specs_dir, data_dir, output_dir, workers=1, queue_size=1000, poll_interval=0.1,
+                chunk_size=DEFAULT_CHUNK_SIZE, engine='text', serializer='template', output_format='ndjson',
+                on_result=None, stop=None, registry=None, compression=None, buffer_size=DEFAULT_BUFFER_SIZE):
+    """
+    Convert data files as they land, until stopped.
+
+    The specs and data directories are polled every `poll_interval` seconds.
+    Files are picked up once their size and modification time have settled,
+    which includes the files present when watching starts. Data files whose
+    output is up to date according to the manifest in the output directory
+    are skipped, as with incremental runs of process_data.
+
+    At most `workers` files are converted at once, in worker processes, and at
+    most `queue_size` more wait in the queue; further files are only queued as
+    room frees up. A spec file that changes is parsed again, and its data files
+    are converted again with the new spec.
+
+    Args:
+        specs_dir (str): Directory containing spec files.
+        data_dir (str): Directory containing data files.
+        output_dir (str): Directory where output files are written.
+        workers (int): Number of data files converted at once, each in its own worker process.
+        queue_size (int): Maximum number of data files waiting for a worker.
+        poll_interval (float): Seconds between polls of the directories.
+        chunk_size (int): Maximum number of lines held in memory at once per file.
+        engine (str): Engine reading data files, as for process_data.
+        serializer (str): Serializer writing NDJSON rows, as for process_data.
+        output_format (str): Output file format, as for process_data.
+        on_result (callable): Called with the result of each converted data file,
+            which has a 'latency' key with the seconds between the data file's
+            last modification and its output being written. Defaults to
+            printing format_watch_result.
+        stop (asyncio.Event): Event stopping the watch once set; queued files
+            are dropped and conversions in progress are finished.
+        registry (SpecRegistry): Registry reading and caching the specs,
+            defaults to a new registry.
+        compression (str): Codec compressing NDJSON output files, as for process_data.
+        buffer_size (int): Bytes of output gathered before each write, as for process_data.
+    """
+    import asyncio
+    from concurrent.futures import ProcessPoolExecutor
+
+    # Fail fast on an unknown engine, serializer, output format or codec
+    get_engine(engine)
+    get_serializer(serializer, [])
+    extension = get_extension(output_format, compression)
+    if compression:
+        load_codec_module(compression)
+    options = {
+        'chunk_size': chunk_size,
+        'engine': engine,
+        'serializer': serializer,
+        'output_format': output_format,
+        'compression': compression,
+        'buffer_size': buffer_size,
+        'query': None,
+        'metrics': None
+    }
+    settings = {'serializer': serializer, 'output_format': output_format}
+    on_result = on_result or (lambda result: print(format_watch_result(result)))
+    stop = stop or asyncio.Event()
+
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue(maxsize=queue_size)
+    # Spec files are few and often edited in place, so list them on every poll
+    spec_watcher = DirectoryWatcher(specs_dir, full_scan_interval=0)
+    data_watcher = DirectoryWatcher(data_dir)
+    manifest = load_manifest(output_dir)
+    registry = registry if registry is not None else SpecRegistry()
+    state = {'dirty': False}
+    specs_by_name = {}
+    spec_hashes = {}
+    data_stats = {}
+    orphans = set()
+
+    # Data files to convert that are not queued yet, and those queued or being converted
+    pending = {}
+    active = set()
+
+    def update_specs():
+        changed, removed = spec_watcher.poll()
+        updated = set()
+
+        for spec_file, _ in changed:
+            spec_name = os.path.splitext(spec_file)[0]
+            specs_by_name.pop(spec_name, None)
+            entry = load_spec(registry, specs_dir, spec_file)
+            if entry is not None:
+                specs_by_name[spec_name] = entry['spec'].dict_specs
+                spec_hashes[spec_name] = entry['sha256']
+                updated.add(spec_name)
+
+        for spec_file in removed:
+            specs_by_name.pop(os.path.splitext(spec_file)[0], None)
+
+        # Convert the data files of new and changed specs again
+        if updated:
+            for data_file in data_stats:
+                if match_spec_name(data_file, specs_by_name) in updated:
+                    orphans.discard(data_file)
+                    pending[data_file] = None
+
+    def update_data():
+        changed, removed = data_watcher.poll()
+        for data_file, stat in changed:
+            data_stats[data_file] = stat
+            pending[data_file] = None
+        for data_file in removed:
+            data_stats.pop(data_file, None)
+            pending.pop(data_file, None)
+
+    async def convert(data_file):
+        spec_name = match_spec_name(data_file, specs_by_name)
+        if spec_name is None:
+            if data_file not in orphans:
+                orphans.add(data_file)
+                print(f"Skipping {data_file} because no spec matches its name")
+            return
+
+        data_path = os.path.join(data_dir, data_file)
+        output_path = os.path.join(output_dir, f"{get_stem(data_file)}{extension}")
+        output_name = os.path.basename(output_path)
+        previous = manifest.get(output_name)
+
+        try:
+            entry = await loop.run_in_executor(None, make_entry, data_path, spec_hashes[spec_name], settings, previous)
+        except OSError:
+            # Removed since it was listed
+            return
+
+        if is_up_to_date(previous, entry, output_path):
+            manifest[output_name] = entry
+            return
+
+        result = await loop.run_in_executor(executor, run_watched_job, spec_name, specs_by_name[spec_name],
+                                            data_file, data_path, output_path, options)
+        result['latency'] = time.time() - entry['mtime_ns'] / 1e9
+
+        if result['error']:
+            manifest.pop(output_name, None)
+        else:
+            manifest[output_name] = entry
+        state['dirty'] = True
+        on_result(result)
+
+    async def consume():
+        while True:
+            data_file = await queue.get()
+            try:
+                await convert(data_file)
+            except Exception as e:
+                print(f"Failed to process {data_file}: {describe_error(e)}")
+            finally:
+                active.discard(data_file)
+                queue.task_done()
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        consumers = [asyncio.create_task(consume()) for _ in range(workers)]
+        try:
+            while not stop.is_set():
+                update_specs()
+                update_data()
+
+                # Queue pending files while there is room, files being converted wait until they are done
+                for data_file in list(pending):
+                    if queue.full():
+                        break
+                    if data_file not in active:
+                        del pending[data_file]
+                        active.add(data_file)
+                        queue.put_nowait(data_file)
+
+                if state['dirty'] and not active:
+                    save_manifest(output_dir, manifest)
+                    state['dirty'] = False
+
+                try:
+                    await asyncio.wait_for(stop.wait(), poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+            # Drop queued files and let conversions in progress finish
+            while not queue.empty():
+                active.discard(queue.get_nowait())
+                queue.task_done()
+            await queue.join()
+        finally:
+            for consumer in consumers:
+                consumer.cancel()
+            await asyncio.gather(*consumers, return_exceptions=True)
+            if state['dirty']:
+                save_manifest(output_dir, manifest)
+
+async def watch_until_signalled(*args, **kwargs):
+    """
+    Run watch until the process receives SIGINT or SIGTERM.
+
+    Args:
+        *args: Positional arguments of watch.
+        **kwargs: Keyword arguments of watch.
+    """
+    import asyncio
+    import signal
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in [signal.SIGINT, signal.SIGTERM]:
+        loop.add_signal_handler(signum, stop.set)
+    await watch(*args, stop=stop, **kwargs)
+
+def main(argv=None):
+    """
+    Command line entry point: process every data file in the project directories.
+
+    Args:
+        argv (list): Command line arguments, defaults to sys.argv.
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Convert fixed-width data files to NDJSON using their specs.')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='number of worker processes, 0 uses every CPU (default: 1)')
+    parser.add_argument('--engine', choices=list(ENGINES), default='text',
+                        help='engine reading data files (default: text)')
+    parser.add_argument('--serializer', choices=SERIALIZERS, default='template',
+                        help="serializer writing output rows, 'auto' uses orjson when installed (default: template)")
+    parser.add_argument('--format', choices=list(OUTPUT_FORMATS), default='ndjson', dest='output_format',
+                        help='output file format, columnar formats require pyarrow (default: ndjson)')
+    parser.add_argument('--compression', choices=list(CODECS),
+                        help='compress NDJSON output files, zstd and lz4 require their packages (default: none)')
+    parser.add_argument('--buffer-size', type=float, default=DEFAULT_BUFFER_SIZE / (1 << 20), metavar='MB',
+                        help=f'MB of output gathered before each write (default: {DEFAULT_BUFFER_SIZE >> 20})')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f'lines converted per batch (default: {DEFAULT_CHUNK_SIZE})')
+    parser.add_argument('--shards', type=int, default=1,
+                        help='split each data file into this many byte ranges processed in parallel (default: 1)')
+    parser.add_argument('--force', action='store_true',
+                        help='reprocess data files even if their output is up to date')
+    parser.add_argument('--metrics', metavar='PATH',
+                        help='write run metrics to PATH, in Prometheus text format if it ends with .prom, else JSON')
+    parser.add_argument('--profile', metavar='DIR', help='write cProfile stats of each output file to DIR')
+    parser.add_argument('--profile-every', type=int, default=1, metavar='N',
+                        help='with --profile, profile one chunk out of N (default: 1)')
+    parser.add_argument('--watch', action='store_true',
+                        help='keep running and convert data files as they land, until interrupted')
+    parser.add_argument('--poll-interval', type=float, default=0.1,
+                        help='with --watch, seconds between polls of specs/ and data/ (default: 0.1)')
+    parser.add_argument('--queue-size', type=int, default=1000,
+                        help='with --watch, maximum number of data files waiting for a worker (default: 1000)')
+    parser.add_argument('--spec-cache', metavar='PATH',
+                        help='persist parsed specs to PATH so later runs only read specs that changed')
+    parser.add_argument('--select', metavar='COLUMNS',
+                        help='comma-separated columns to output, in order; specs lacking one are skipped')
+    parser.add_argument('--where', action='append', default=[], metavar='CONDITION',
+                        help="only output rows meeting CONDITION, e.g. 'active == true' or 'customer_id < 1000', "
+                             "with ==, !=, <, <=, > or >=; repeat to require several")
+    args = parser.parse_args(argv)
+    registry = SpecRegistry(cache_path=args.spec_cache)
+    buffer_size = int(args.buffer_size * (1 << 20))
+
+    query = None
+    if args.select is not None or args.where:
+        if args.watch:
+            parser.error('--select and --where do not apply to --watch')
+        columns = [column.strip() for column in args.select.split(',')] if args.select is not None else None
+        try:
+            query = Query(columns, args.where)
+        except ValueError as e:
+            parser.error(str(e))
+
+    # Get directories and list of files in specs and data
+    [specs_dir, data_dir, output_dir] = get_dirs(BASE_DIR)
+
+    if args.watch:
+        import asyncio
+        asyncio.run(watch_until_signalled(specs_dir, data_dir, output_dir, workers=args.workers or os.cpu_count(),
+                                          queue_size=args.queue_size, poll_interval=args.poll_interval,
+                                          chunk_size=args.chunk_size, engine=args.engine, serializer=args.serializer,
+                                          output_format=args.output_format, registry=registry,
+                                          compression=args.compression, buffer_size=buffer_size))
+        if args.spec_cache:
+            registry.save()
+        return
+
+    specs_files = sorted(get_files_in_dir(specs_dir))
+    data_files = scan_files(data_dir)
+
+    metrics = Metrics(args.profile, args.profile_every) if args.metrics or args.profile else None
+
+    results = process_data(specs_dir, data_dir, output_dir, specs_files, data_files,
+                           chunk_size=args.chunk_size, workers=args.workers or None, shards=args.shards,
+                           engine=args.engine, serializer=args.serializer, output_format=args.output_format,
+                           incremental=True, force=args.force, metrics=metrics, registry=registry,
+                           compression=args.compression, buffer_size=buffer_size, query=query)
+    print(format_summary(results))
+    if args.spec_cache:
+        registry.save()
 
-            # Process data file and write output
-            with open(os.path.join(data_dir, data_file), 'r') as f:
-                with open(output_filename, 'w') as output_file:
-                    for line in f.readlines():
-                        output_line = get_output_line(line, dict_specs)
-                        output_file.write(str(output_line).replace("'", '"') + '\n')
+    if args.metrics:
+        with open(args.metrics, 'w') as f:
+            f.write(metrics.to_prometheus() if args.metrics.endswith('.prom') else metrics.to_json())
 
 
-process_data(specs_dir, data_dir, output_dir, specs_files, data_files)
\ No newline at end of file
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+import argparse
+import io
+import os
+import shutil
+import time
+from tempfile import TemporaryDirectory
+from app import process_data
+from benchmarks.generate import generate_data_file
+from utils.compression import CODECS, get_codec_extension, load_codec_module, open_codec, open_decompressed
+from utils.decoder import compile_decoder
+from utils.file_utils import DEFAULT_CHUNK_SIZE, get_specs_dict, iter_chunks
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SPECS_DIR = os.path.join(BASE_DIR, 'specs')
+
+def get_available_codecs():
+    """
+    Get the codecs whose package is installed.
+    """
+    available = []
+    for codec in CODECS:
+        try:
+            load_codec_module(codec)
+        except ImportError:
+            print(f'{codec}: skipped, its package is not installed')
+            continue
+        available.append(codec)
+    return available
+
+def compress_file(path, codec):
+    """
+    Write a compressed copy of a file next to it.
+
+    Returns:
+        str: Path of the compressed copy.
+    """
+    compressed_path = path + get_codec_extension(codec)
+    with open(path, 'rb') as source, open_codec(compressed_path, codec, 'wb') as target:
+        shutil.copyfileobj(source, target, 1 << 20)
+    return compressed_path
+
+def bench_parse(decoder, compressed_path, threaded):
+    """
+    Decompress and decode every line of a compressed data file.
+
+    Returns:
+        float: Elapsed seconds.
+    """
+    started = time.perf_counter()
+    with io.TextIOWrapper(open_decompressed(compressed_path, threaded=threaded)) as f:
+        for chunk in iter_chunks(f, DEFAULT_CHUNK_SIZE):
+            decoder.decode_chunk(chunk)
+    return time.perf_counter() - started
+
+def bench_process_data(spec_file, data_dir, data_file, compression):
+    """
+    Convert a data file with process_data, reading and writing with the given codecs.
+
+    Returns:
+        tuple: Elapsed seconds and size of the output file in bytes.
+    """
+    with TemporaryDirectory() as output_dir:
+        started = time.perf_counter()
+        [result] = process_data(SPECS_DIR, data_dir, output_dir, [spec_file], [data_file], compression=compression)
+        elapsed = time.perf_counter() - started
+        if result['error']:
+            raise RuntimeError(result['error'])
+        return elapsed, os.path.getsize(result['output_file'])
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure throughput of compressed inputs and outputs per codec.')
+    parser.add_argument('--spec', default='testformat4.csv', help='spec file in specs/')
+    parser.add_argument('--rows', type=int, default=500000, help='number of synthetic rows')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per measurement, the best one is kept')
+    args = parser.parse_args()
+
+    codecs = get_available_codecs()
+    decoder = compile_decoder(get_specs_dict(args.spec, SPECS_DIR))
+
+    with TemporaryDirectory() as temp_dir:
+        data_file = f'{os.path.splitext(args.spec)[0]}_2000-01-01.txt'
+        data_path = os.path.join(temp_dir, data_file)
+        size = generate_data_file(args.spec, SPECS_DIR, data_path, args.rows)
+        print(f'{args.spec}: {args.rows} rows, {size / 1e6:.1f} MB')
+
+        print('Decompress and decode, inline and in a background thread:')
+        for codec in codecs:
+            compressed_path = compress_file(data_path, codec)
+            compressed_size = os.path.getsize(compressed_path)
+            inline = min(bench_parse(decoder, compressed_path, False) for _ in range(args.repeat))
+            threaded = min(bench_parse(decoder, compressed_path, True) for _ in range(args.repeat))
+            print(f'{codec:>6}: ratio {size / compressed_size:5.2f}x, inline {size / 1e6 / inline:7.1f} MB/sec, '
+                  f'threaded {size / 1e6 / threaded:7.1f} MB/sec ({inline / threaded:4.2f}x)')
+            os.remove(compressed_path)
+
+        print('process_data, compressed input and output with the same codec:')
+        for codec in [None] + codecs:
+            input_file = os.path.basename(compress_file(data_path, codec)) if codec else data_file
+            runs = [bench_process_data(args.spec, temp_dir, input_file, codec) for _ in range(args.repeat)]
+            seconds, output_size = min(runs)
+            print(f"{codec or 'none':>6}: {args.rows / seconds:12,.0f} rows/sec {size / 1e6 / seconds:7.1f} MB/sec, "
+                  f"output {output_size / 1e6:7.1f} MB")
+            if codec:
+                os.remove(os.path.join(temp_dir, input_file))
+
+if __name__ == '__main__':
+    main()
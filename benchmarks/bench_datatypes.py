@@ -0,0 +1,84 @@
+import argparse
+import importlib.util
+import random
+import time
+from datetime import datetime
+from decimal import Decimal
+from app import get_output_line
+from benchmarks.generate import generate_value
+from utils.decoder import compile_decoder
+from utils.file_utils import DEFAULT_CHUNK_SIZE, iter_chunks
+
+# Datatypes measured, the width of their column, and how a consumer converts the string of a TEXT column instead
+DATATYPES = [
+    ('TEXT', 10, None),
+    ('BOOLEAN', 1, lambda value: value == '1'),
+    ('INTEGER', 10, int),
+    ('FLOAT', 10, float),
+    ('DECIMAL', 10, Decimal),
+    ('S9(7)V99', 10, lambda value: Decimal(value) / 100),
+    ('DATE', 8, lambda value: datetime.strptime(value, '%Y%m%d').date()),
+]
+
+def time_chunks(lines, decode_chunk, repeat):
+    """
+    Decode the lines chunk by chunk, keeping the best of `repeat` runs.
+
+    Returns:
+        float: Elapsed seconds.
+    """
+    best = None
+    chunks = list(iter_chunks(lines, DEFAULT_CHUNK_SIZE))
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for chunk in chunks:
+            decode_chunk(chunk)
+        elapsed = time.perf_counter() - started
+        best = min(best or elapsed, elapsed)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure conversion throughput of each datatype.')
+    parser.add_argument('--rows', type=int, default=500000, help='number of values per datatype')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per measurement, the best one is kept')
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    text_specs = None
+    print(f'{args.rows} values per datatype, millions of values/sec:')
+    print(f"{'datatype':>10} {'reference':>10} {'str':>8} {'bytes':>8} {'numpy':>8} {'as TEXT':>8} "
+          f"{'+ convert':>10}")
+
+    for datatype, width, consume in DATATYPES:
+        dict_specs = {'value': {'width': str(width), 'datatype': datatype}}
+        text_specs = {'value': {'width': str(width), 'datatype': 'TEXT'}}
+        lines = [generate_value(width, datatype.lower(), rng) + '\n' for _ in range(args.rows)]
+        byte_lines = [line.encode() for line in lines]
+
+        def convert_downstream(chunk, decode_chunk=compile_decoder(text_specs).decode_chunk, consume=consume):
+            return [consume(row['value']) for row in decode_chunk(chunk)]
+
+        runs = [
+            ('reference', lines, lambda chunk: [get_output_line(line, dict_specs) for line in chunk]),
+            ('str', lines, compile_decoder(dict_specs).decode_chunk),
+            ('bytes', byte_lines, compile_decoder(dict_specs, binary=True).decode_chunk),
+        ]
+        if importlib.util.find_spec('numpy'):
+            from utils.numpy_decoder import compile_numpy_decoder
+            runs.append(('numpy', byte_lines, compile_numpy_decoder(dict_specs).decode_chunk))
+        else:
+            runs.append(('numpy', None, None))
+        runs.append(('as TEXT', lines, compile_decoder(text_specs).decode_chunk))
+        runs.append(('+ convert', lines, convert_downstream if consume else None))
+
+        cells = []
+        for name, run_lines, decode_chunk in runs:
+            if decode_chunk is None:
+                cells.append('-')
+                continue
+            seconds = time_chunks(run_lines, decode_chunk, args.repeat)
+            cells.append(f'{args.rows / seconds / 1e6:.2f}')
+        print(f'{datatype:>10} {cells[0]:>10} {cells[1]:>8} {cells[2]:>8} {cells[3]:>8} {cells[4]:>8} {cells[5]:>10}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+import argparse
+import os
+import time
+from tempfile import TemporaryDirectory
+from app import get_output_line
+from benchmarks.generate import generate_data_file
+from utils.decoder import compile_decoder
+from utils.file_utils import get_specs_dict
+
+SPECS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'specs')
+
+def time_decode(data_path, decode, mode='r'):
+    """
+    Decode every line of a data file and measure throughput.
+
+    Args:
+        data_path (str): Path of the data file.
+        decode (callable): Function converting a line into a dictionary.
+        mode (str): Mode the data file is opened in, 'rb' passes `bytes` lines.
+
+    Returns:
+        tuple: Number of rows decoded and elapsed seconds.
+    """
+    rows = 0
+    started = time.perf_counter()
+    with open(data_path, mode) as f:
+        for line in f:
+            decode(line)
+            rows += 1
+    return rows, time.perf_counter() - started
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare interpreted and compiled line decoding.')
+    parser.add_argument('--spec', default='testformat4.csv', help='spec file in specs/')
+    parser.add_argument('--rows', type=int, default=1000000, help='number of synthetic rows')
+    args = parser.parse_args()
+
+    dict_specs = get_specs_dict(args.spec, SPECS_DIR)
+    decoder = compile_decoder(dict_specs)
+
+    with TemporaryDirectory() as temp_dir:
+        data_path = os.path.join(temp_dir, 'data.txt')
+        size = generate_data_file(args.spec, SPECS_DIR, data_path, args.rows)
+        print(f'{args.spec}: {args.rows} rows, {size / 1e6:.1f} MB')
+
+        for name, decode, mode in [
+            ('get_output_line', lambda line: get_output_line(line, dict_specs), 'r'),
+            ('compiled decoder', decoder.decode, 'r'),
+            ('bytes decoder', compile_decoder(dict_specs, binary=True).decode, 'rb'),
+        ]:
+            rows, elapsed = time_decode(data_path, decode, mode)
+            print(f'{name:>16}: {rows / elapsed:12,.0f} rows/sec ({elapsed:.2f}s)')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+import argparse
+import filecmp
+import os
+import time
+from tempfile import TemporaryDirectory
+from app import process_data
+from benchmarks.generate import generate_data_file
+from utils.engines import ENGINES
+
+SPECS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'specs')
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare end-to-end throughput of the parsing engines.')
+    parser.add_argument('--spec', default='testformat4.csv', help='spec file in specs/')
+    parser.add_argument('--rows', type=int, default=1000000, help='number of synthetic rows')
+    parser.add_argument('--engines', nargs='+', default=list(ENGINES), help='engines to compare')
+    args = parser.parse_args()
+
+    spec_name = os.path.splitext(args.spec)[0]
+    data_file = f'{spec_name}_2000-01-01.txt'
+
+    with TemporaryDirectory() as temp_dir:
+        data_dir = os.path.join(temp_dir, 'data')
+        os.makedirs(data_dir)
+        size = generate_data_file(args.spec, SPECS_DIR, os.path.join(data_dir, data_file), args.rows)
+        print(f'{args.spec}: {args.rows} rows, {size / 1e6:.1f} MB')
+
+        outputs = []
+        for engine in args.engines:
+            output_dir = os.path.join(temp_dir, engine)
+            os.makedirs(output_dir)
+
+            started = time.perf_counter()
+            [result] = process_data(SPECS_DIR, data_dir, output_dir, [args.spec], [data_file], engine=engine)
+            elapsed = time.perf_counter() - started
+            outputs.append(result['output_file'])
+            print(f'{engine:>8}: {args.rows / elapsed:12,.0f} rows/sec {size / 1e6 / elapsed:8.1f} MB/sec')
+
+        identical = all(filecmp.cmp(outputs[0], output, shallow=False) for output in outputs[1:])
+        print(f'identical output: {identical}')
+
+if __name__ == '__main__':
+    main()
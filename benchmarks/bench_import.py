@@ -0,0 +1,36 @@
+import argparse
+import os
+import subprocess
+import sys
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def measure_import(module):
+    """
+    Import a module in a fresh interpreter and return its cumulative import time.
+
+    Args:
+        module (str): Name of the module to import.
+
+    Returns:
+        float: Import time of the module and everything it imports, in milliseconds.
+    """
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            cwd=BASE_DIR, check=True, capture_output=True, text=True)
+
+    # The module's own line comes last, with its cumulative time in microseconds
+    line = result.stderr.strip().splitlines()[-1]
+    return int(line.split('|')[1]) / 1000
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure the import time of the library modules.')
+    parser.add_argument('--modules', nargs='+', default=['app', 'utils.formatter'], help='modules to import')
+    parser.add_argument('--repeat', type=int, default=10, help='fresh interpreters per module, the best is kept')
+    args = parser.parse_args()
+
+    for module in args.modules:
+        best = min(measure_import(module) for _ in range(args.repeat))
+        print(f'{module:>20}: {best:8.1f} ms')
+
+if __name__ == '__main__':
+    main()
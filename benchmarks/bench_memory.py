@@ -0,0 +1,60 @@
+import argparse
+import os
+import resource
+import subprocess
+import sys
+from tempfile import TemporaryDirectory
+from benchmarks.generate import generate_data_file
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SPECS_DIR = os.path.join(BASE_DIR, 'specs')
+
+def run_child(spec_file, data_dir, output_dir, data_file):
+    """
+    Process a single data file and print the peak RSS of this process in KB.
+    """
+    from app import process_data
+    process_data(SPECS_DIR, data_dir, output_dir, [spec_file], [data_file])
+    print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+
+def measure_peak_rss(spec_file, data_dir, output_dir, data_file):
+    """
+    Run process_data in a fresh interpreter and return its peak RSS.
+
+    Args:
+        spec_file (str): File name of the spec file.
+        data_dir (str): Directory containing the data file.
+        output_dir (str): Directory where the output file will be written.
+        data_file (str): File name of the data file.
+
+    Returns:
+        int: Peak resident set size of the child process in KB.
+    """
+    result = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.bench_memory', '--child', spec_file, data_dir, output_dir, data_file],
+        cwd=BASE_DIR, check=True, capture_output=True, text=True
+    )
+    return int(result.stdout.split()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure peak RSS of process_data for growing inputs.')
+    parser.add_argument('--spec', default='testformat4.csv', help='spec file in specs/')
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000, 1000000, 5000000],
+                        help='input sizes in rows')
+    parser.add_argument('--child', nargs=4, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(*args.child)
+        return
+
+    spec_name = os.path.splitext(args.spec)[0]
+    for rows in args.rows:
+        with TemporaryDirectory() as temp_dir:
+            data_file = f'{spec_name}_2000-01-01.txt'
+            size = generate_data_file(args.spec, SPECS_DIR, os.path.join(temp_dir, data_file), rows)
+            peak = measure_peak_rss(args.spec, temp_dir, temp_dir, data_file)
+            print(f'{rows:>10} rows ({size / 1e6:8.1f} MB): peak RSS {peak / 1024:8.1f} MB')
+
+if __name__ == '__main__':
+    main()
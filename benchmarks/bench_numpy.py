@@ -0,0 +1,55 @@
+import argparse
+import os
+import time
+from tempfile import TemporaryDirectory
+from benchmarks.generate import generate_data_file
+from utils.decoder import compile_decoder
+from utils.file_utils import get_specs_dict
+from utils.numpy_decoder import compile_numpy_decoder
+
+SPECS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'specs')
+
+# Integer and boolean heavy spec, the case the NumPy engine is meant for
+NUMERIC_SPEC = 'column name,width,datatype\n' + ''.join(
+    [f'amount{i},9,INTEGER\n' for i in range(8)] + [f'flag{i},1,BOOLEAN\n' for i in range(4)]
+)
+
+def time_chunks(lines, decode_chunk, chunk_size):
+    """
+    Decode lines chunk by chunk and return the elapsed seconds.
+    """
+    started = time.perf_counter()
+    for offset in range(0, len(lines), chunk_size):
+        decode_chunk(lines[offset:offset + chunk_size])
+    return time.perf_counter() - started
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the NumPy chunk decoder with the pure-Python bytes decoder.')
+    parser.add_argument('--rows', type=int, default=500000, help='number of synthetic rows per spec')
+    parser.add_argument('--chunk-size', type=int, default=10000, help='lines per chunk')
+    args = parser.parse_args()
+
+    with TemporaryDirectory() as temp_dir:
+        with open(os.path.join(temp_dir, 'numeric.csv'), 'w') as f:
+            f.write(NUMERIC_SPEC)
+
+        for spec_file, specs_dir in [('testformat4.csv', SPECS_DIR), ('numeric.csv', temp_dir)]:
+            data_path = os.path.join(temp_dir, 'data.txt')
+            generate_data_file(spec_file, specs_dir, data_path, args.rows)
+            with open(data_path, 'rb') as f:
+                lines = f.readlines()
+
+            dict_specs = get_specs_dict(spec_file, specs_dir)
+            numpy_decoder = compile_numpy_decoder(dict_specs)
+            print(f'{spec_file}: {len(lines)} rows')
+
+            for name, decode_chunk in [
+                ('python rows', compile_decoder(dict_specs, binary=True).decode_chunk),
+                ('numpy rows', numpy_decoder.decode_chunk),
+                ('numpy columns', numpy_decoder.decode_columns),
+            ]:
+                elapsed = time_chunks(lines, decode_chunk, args.chunk_size)
+                print(f'{name:>16}: {len(lines) / elapsed:12,.0f} rows/sec')
+
+if __name__ == '__main__':
+    main()
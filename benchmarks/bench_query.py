@@ -0,0 +1,67 @@
+import argparse
+import importlib.util
+import os
+import time
+from tempfile import TemporaryDirectory
+from app import process_data
+from benchmarks.generate import generate_data_file
+from utils.query import Query
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SPECS_DIR = os.path.join(BASE_DIR, 'specs')
+
+# Queries on testformat4, from none to selecting one row in a hundred; customer IDs are uniform over 8 digits
+QUERIES = [
+    ('everything', None),
+    ('2 of 4 columns', Query(['customer_id', 'active'])),
+    ('active == true', Query(where=['active == true'])),
+    ('1% of rows', Query(where=['customer_id >= 99000000'])),
+    ('1% of rows, 1 column', Query(['first_name'], ['customer_id >= 99000000'])),
+]
+
+def bench_query(spec_file, data_dir, data_file, engine, query):
+    """
+    Convert a data file with process_data and a query.
+
+    Returns:
+        tuple: Elapsed seconds and number of rows written.
+    """
+    with TemporaryDirectory() as output_dir:
+        started = time.perf_counter()
+        [result] = process_data(SPECS_DIR, data_dir, output_dir, [spec_file], [data_file], engine=engine,
+                                query=query)
+        elapsed = time.perf_counter() - started
+        if result['error']:
+            raise RuntimeError(result['error'])
+        with open(result['output_file'], 'rb') as f:
+            return elapsed, sum(1 for _ in f)
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure process_data with projection and predicates pushed down.')
+    parser.add_argument('--rows', type=int, default=500000, help='number of synthetic rows')
+    parser.add_argument('--engines', nargs='+', default=['text', 'mmap', 'numpy'], help='engines to measure')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per measurement, the best one is kept')
+    args = parser.parse_args()
+
+    spec_file = 'testformat4.csv'
+    with TemporaryDirectory() as data_dir:
+        data_file = 'testformat4_2000-01-01.txt'
+        size = generate_data_file(spec_file, SPECS_DIR, os.path.join(data_dir, data_file), args.rows)
+        print(f'{spec_file}: {args.rows} rows, {size / 1e6:.1f} MB')
+
+        for engine in args.engines:
+            if engine == 'numpy' and not importlib.util.find_spec('numpy'):
+                print(f'{engine}: skipped, numpy is not installed')
+                continue
+
+            print(f'{engine} engine:')
+            baseline = None
+            for name, query in QUERIES:
+                seconds, written = min(bench_query(spec_file, data_dir, data_file, engine, query)
+                                       for _ in range(args.repeat))
+                baseline = baseline or seconds
+                print(f'{name:>22}: {args.rows / seconds:12,.0f} rows/sec, {written:>8} rows written, '
+                      f'{baseline / seconds:5.2f}x')
+
+if __name__ == '__main__':
+    main()
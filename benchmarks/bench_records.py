@@ -0,0 +1,102 @@
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from tempfile import TemporaryDirectory
+from benchmarks.generate import generate_data_file
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SPECS_DIR = os.path.join(BASE_DIR, 'specs')
+
+def load_dicts(formatter, data_path):
+    return list(formatter.parse_path(data_path))
+
+def load_records(formatter, data_path):
+    with open(data_path, 'r') as f:
+        return list(formatter.parse_records(f))
+
+def load_batches(formatter, data_path):
+    return list(formatter.parse_batches(data_path))
+
+# Ways of keeping every row of a data file in memory
+REPRESENTATIONS = {
+    'dicts': load_dicts,
+    'records': load_records,
+    'batches': load_batches,
+}
+
+def run_child(representation, spec_file, data_path, engine):
+    """
+    Load every row of the data file and print the memory they retain, the load time and the peak RSS as JSON.
+    """
+    from utils.formatter import Formatter, Spec
+
+    formatter = Formatter(Spec.from_path(os.path.join(SPECS_DIR, spec_file)), engine=engine)
+    # Compile first, so imports such as NumPy's are not counted as retained by the rows
+    formatter.get_record_decoder()
+    formatter.get_batch_decoder()
+    tracemalloc.start()
+    started = time.perf_counter()
+    rows = REPRESENTATIONS[representation](formatter, data_path)
+    elapsed = time.perf_counter() - started
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(json.dumps({
+        'retained_bytes': retained,
+        'seconds': elapsed,
+        'peak_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        'items': len(rows),
+    }))
+
+def measure(representation, spec_file, data_path, engine):
+    """
+    Load a data file in a fresh interpreter with one representation.
+
+    Args:
+        representation (str): Name of the representation, one of REPRESENTATIONS.
+        spec_file (str): File name of the spec file in specs/.
+        data_path (str): Path of the data file.
+        engine (str): Engine reading the data file for the dicts and batches representations.
+
+    Returns:
+        dict: Bytes retained by the loaded rows, load seconds (slowed down by
+            tracemalloc) and peak RSS in KB.
+    """
+    result = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.bench_records', '--child', representation, spec_file, data_path, engine],
+        cwd=BASE_DIR, check=True, capture_output=True, text=True
+    )
+    return json.loads(result.stdout.splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure the memory of rows kept as dicts, Records or RecordBatches.')
+    parser.add_argument('--spec', default='testformat4.csv', help='spec file in specs/')
+    parser.add_argument('--rows', type=int, default=1000000, help='number of synthetic rows')
+    parser.add_argument('--engine', default='text', help='engine reading the data file')
+    parser.add_argument('--child', nargs=4, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(*args.child)
+        return
+
+    with TemporaryDirectory() as temp_dir:
+        data_path = os.path.join(temp_dir, f'{os.path.splitext(args.spec)[0]}_2000-01-01.txt')
+        size = generate_data_file(args.spec, SPECS_DIR, data_path, args.rows)
+        print(f'{args.spec}: {args.rows} rows, {size / 1e6:.1f} MB')
+
+        baseline = None
+        for representation in REPRESENTATIONS:
+            result = measure(representation, args.spec, data_path, args.engine)
+            baseline = baseline or result['retained_bytes']
+            print(f"{representation:>8}: {result['retained_bytes'] / 1e6:8.1f} MB retained "
+                  f"({result['retained_bytes'] / baseline:5.2f}x dicts, {result['retained_bytes'] / size:5.2f}x data) "
+                  f"peak RSS {result['peak_rss_kb'] / 1024:8.1f} MB, loaded in {result['seconds']:.2f}s")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+import argparse
+import os
+import time
+from tempfile import TemporaryDirectory
+from benchmarks.generate import generate_data_file
+from utils.decoder import compile_decoder
+from utils.file_utils import get_specs_dict
+from utils.serializers import get_serializer, load_orjson
+
+SPECS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'specs')
+
+def encode_repr(rows):
+    """
+    The original serialization, kept as a baseline: not valid JSON for booleans and nulls.
+    """
+    return ''.join([str(row).replace("'", '"') + '\n' for row in rows]).encode()
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare serialization throughput of the NDJSON serializers.')
+    parser.add_argument('--spec', default='testformat4.csv', help='spec file in specs/')
+    parser.add_argument('--rows', type=int, default=500000, help='number of synthetic rows')
+    args = parser.parse_args()
+
+    decoder = compile_decoder(get_specs_dict(args.spec, SPECS_DIR))
+
+    with TemporaryDirectory() as temp_dir:
+        data_path = os.path.join(temp_dir, 'data.txt')
+        generate_data_file(args.spec, SPECS_DIR, data_path, args.rows)
+        with open(data_path, 'r') as f:
+            rows = decoder.decode_chunk(f.readlines())
+
+    backends = [('repr (baseline)', encode_repr)]
+    for name in ['json', 'template', 'orjson']:
+        if name == 'orjson' and not load_orjson():
+            print('orjson: not installed, skipped')
+            continue
+        backends.append((name, get_serializer(name, decoder.columns).encode_chunk))
+
+    print(f'{args.spec}: {len(rows)} rows')
+    for name, encode_chunk in backends:
+        started = time.perf_counter()
+        output = encode_chunk(rows)
+        elapsed = time.perf_counter() - started
+        print(f'{name:>16}: {len(rows) / elapsed:12,.0f} rows/sec {len(output) / 1e6 / elapsed:8.1f} MB/sec')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,34 @@
+import argparse
+import os
+import time
+from tempfile import TemporaryDirectory
+from app import process_data
+from benchmarks.generate import generate_data_file
+
+SPECS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'specs')
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure scaling of single-file processing across byte-range shards.')
+    parser.add_argument('--spec', default='testformat4.csv', help='spec file in specs/')
+    parser.add_argument('--rows', type=int, default=2000000, help='number of synthetic rows')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8], help='worker counts to compare')
+    args = parser.parse_args()
+
+    spec_name = os.path.splitext(args.spec)[0]
+    data_file = f'{spec_name}_2000-01-01.txt'
+
+    with TemporaryDirectory() as temp_dir:
+        size = generate_data_file(args.spec, SPECS_DIR, os.path.join(temp_dir, data_file), args.rows)
+        print(f'{args.spec}: {args.rows} rows, {size / 1e6:.1f} MB')
+
+        baseline = None
+        for workers in args.workers:
+            started = time.perf_counter()
+            process_data(SPECS_DIR, temp_dir, temp_dir, [args.spec], [data_file], workers=workers, shards=workers)
+            elapsed = time.perf_counter() - started
+            baseline = baseline or elapsed
+            print(f'{workers:>3} workers: {elapsed:7.2f}s {args.rows / elapsed:12,.0f} rows/sec '
+                  f'{size / 1e6 / elapsed:8.1f} MB/sec  speedup {baseline / elapsed:4.2f}x')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+import argparse
+import json
+import os
+import time
+from tempfile import TemporaryDirectory
+from app import process_data
+from benchmarks.generate import generate_data_file
+from utils.sinks import OUTPUT_FORMATS
+
+SPECS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'specs')
+
+def load_output(output_format, path):
+    """
+    Load an output file the way a downstream job would.
+
+    Args:
+        output_format (str): Name of the output format.
+        path (str): Path of the output file.
+
+    Returns:
+        int: Number of rows loaded.
+    """
+    if output_format == 'ndjson':
+        with open(path, 'rb') as f:
+            return len([json.loads(line) for line in f])
+
+    import pyarrow as pa
+    if output_format == 'parquet':
+        import pyarrow.parquet as pq
+        return pq.read_table(path).num_rows
+    with pa.memory_map(path) as source:
+        return pa.ipc.open_file(source).read_all().num_rows
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare output formats by write time, file size and load time.')
+    parser.add_argument('--spec', default='testformat4.csv', help='spec file in specs/')
+    parser.add_argument('--rows', type=int, default=1000000, help='number of synthetic rows')
+    parser.add_argument('--engine', default='text', help='engine reading the data file')
+    parser.add_argument('--formats', nargs='+', default=list(OUTPUT_FORMATS), help='output formats to compare')
+    args = parser.parse_args()
+
+    spec_name = os.path.splitext(args.spec)[0]
+    data_file = f'{spec_name}_2000-01-01.txt'
+
+    with TemporaryDirectory() as temp_dir:
+        size = generate_data_file(args.spec, SPECS_DIR, os.path.join(temp_dir, data_file), args.rows)
+        print(f'{args.spec}: {args.rows} rows, {size / 1e6:.1f} MB')
+
+        for output_format in args.formats:
+            started = time.perf_counter()
+            [result] = process_data(SPECS_DIR, temp_dir, temp_dir, [args.spec], [data_file],
+                                    engine=args.engine, output_format=output_format)
+            written = time.perf_counter() - started
+            if result['error']:
+                print(f"{output_format:>8}: {result['error']}")
+                continue
+
+            started = time.perf_counter()
+            load_output(output_format, result['output_file'])
+            loaded = time.perf_counter() - started
+
+            output_size = os.path.getsize(result['output_file'])
+            print(f'{output_format:>8}: write {written:6.2f}s  size {output_size / 1e6:8.1f} MB  load {loaded:6.2f}s')
+
+if __name__ == '__main__':
+    main()
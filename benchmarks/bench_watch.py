@@ -0,0 +1,73 @@
+import argparse
+import asyncio
+import os
+import shutil
+import statistics
+from tempfile import TemporaryDirectory
+from app import watch
+from benchmarks.generate import generate_data_file
+
+SPECS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'specs')
+
+async def measure_latencies(spec_file, temp_dir, files, rows, interval, workers, poll_interval):
+    """
+    Drop data files one by one into a watched directory and collect the latency of each output.
+
+    Returns:
+        list: Latencies in seconds, in the order outputs were written.
+    """
+    specs_dir = os.path.join(temp_dir, 'specs')
+    data_dir = os.path.join(temp_dir, 'data')
+    output_dir = os.path.join(temp_dir, 'output')
+    staging_dir = os.path.join(temp_dir, 'staging')
+    for directory in [specs_dir, data_dir, output_dir, staging_dir]:
+        os.makedirs(directory)
+    shutil.copy(os.path.join(SPECS_DIR, spec_file), specs_dir)
+
+    spec_name = os.path.splitext(spec_file)[0]
+    staged = []
+    for index in range(files):
+        path = os.path.join(staging_dir, f'{spec_name}_{index:06}.txt')
+        generate_data_file(spec_file, SPECS_DIR, path, rows, seed=index)
+        staged.append(path)
+
+    latencies = []
+    stop = asyncio.Event()
+    task = asyncio.create_task(watch(specs_dir, data_dir, output_dir, workers=workers, poll_interval=poll_interval,
+                                     on_result=lambda result: latencies.append(result['latency']), stop=stop))
+
+    # Let the worker processes start before the first drop
+    await asyncio.sleep(0.5)
+    for path in staged:
+        # Drops land atomically, as a producer renaming a finished file would, and latency counts from the drop
+        os.utime(path)
+        os.replace(path, os.path.join(data_dir, os.path.basename(path)))
+        await asyncio.sleep(interval)
+
+    while len(latencies) < files:
+        await asyncio.sleep(0.05)
+    stop.set()
+    await task
+    return latencies
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure the latency from a data file landing to its output.')
+    parser.add_argument('--spec', default='testformat4.csv', help='spec file in specs/')
+    parser.add_argument('--files', type=int, default=50, help='number of data files dropped')
+    parser.add_argument('--rows', type=int, default=1000, help='rows per data file')
+    parser.add_argument('--interval', type=float, default=0.05, help='seconds between drops')
+    parser.add_argument('--workers', type=int, default=2, help='files converted at once')
+    parser.add_argument('--poll-interval', type=float, default=0.1, help='seconds between polls')
+    args = parser.parse_args()
+
+    with TemporaryDirectory() as temp_dir:
+        latencies = asyncio.run(measure_latencies(args.spec, temp_dir, args.files, args.rows, args.interval,
+                                                  args.workers, args.poll_interval))
+
+    latencies.sort()
+    print(f'{args.files} files of {args.rows} rows, poll interval {args.poll_interval}s')
+    print(f'latency p50 {statistics.median(latencies):.3f}s '
+          f'p95 {latencies[int(len(latencies) * 0.95) - 1]:.3f}s max {latencies[-1]:.3f}s')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+import argparse
+import io
+import os
+import time
+from tempfile import TemporaryDirectory
+from benchmarks.generate import DEFAULT_MIX, generate_data_file, generate_spec
+from utils.decoder import compile_decoder
+from utils.file_utils import get_specs_dict, iter_chunks
+from utils.serializers import get_serializer
+from utils.writer import AtomicWriter
+
+class CountingFile(io.RawIOBase):
+    """
+    Raw file counting the write calls reaching the operating system.
+    """
+
+    def __init__(self, f):
+        self.f = f
+        self.writes = 0
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self.writes += 1
+        return self.f.write(b)
+
+    def fileno(self):
+        return self.f.fileno()
+
+    def close(self):
+        self.f.close()
+        super().close()
+
+def write_direct(payloads, path, buffer_size):
+    """
+    Write each chunk to a file opened at its final path, as sinks did before AtomicWriter.
+    """
+    raw = CountingFile(io.FileIO(path, 'w'))
+    with io.BufferedWriter(raw) as f:
+        for payload in payloads:
+            f.write(payload)
+    return raw.writes
+
+def write_per_row(payloads, path, buffer_size):
+    """
+    Write every row with its own unbuffered call, the worst case for a network filesystem.
+    """
+    raw = CountingFile(io.FileIO(path, 'w'))
+    with raw:
+        for payload in payloads:
+            for line in payload.splitlines(keepends=True):
+                raw.write(line)
+    return raw.writes
+
+def write_atomic(payloads, path, buffer_size):
+    """
+    Write through an AtomicWriter gathering `buffer_size` bytes per write, fsynced and renamed on close.
+    """
+    writer = AtomicWriter(path, buffer_size)
+    writer.f = CountingFile(writer.f)
+    with writer:
+        for payload in payloads:
+            writer.write(payload)
+    return writer.f.writes
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure output writers on a workload of many small rows.')
+    parser.add_argument('--rows', type=int, default=1000000, help='number of synthetic rows')
+    parser.add_argument('--columns', type=int, default=2, help='columns of the generated spec, few for small rows')
+    parser.add_argument('--chunk-size', type=int, default=100, help='rows per encoded chunk')
+    parser.add_argument('--buffer-sizes', type=float, nargs='+', default=[0, 0.0625, 1, 4, 16], metavar='MB',
+                        help='AtomicWriter buffer sizes to measure')
+    parser.add_argument('--dir', help='directory to write to, e.g. on a network filesystem (default: a temp dir)')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per writer, the best one is kept')
+    args = parser.parse_args()
+
+    with TemporaryDirectory() as temp_dir, TemporaryDirectory(dir=args.dir) as output_dir:
+        generate_spec(os.path.join(temp_dir, 'small.csv'), args.columns, 1, 6, DEFAULT_MIX, 0)
+        data_path = os.path.join(temp_dir, 'small_2000-01-01.txt')
+        generate_data_file('small.csv', temp_dir, data_path, args.rows)
+
+        decoder = compile_decoder(get_specs_dict('small.csv', temp_dir))
+        serializer = get_serializer('template', decoder.columns)
+        with open(data_path, 'r') as f:
+            payloads = [serializer.encode_chunk(decoder.decode_chunk(chunk)) for chunk in iter_chunks(f, args.chunk_size)]
+        size = sum(map(len, payloads))
+        print(f'{args.rows} rows, {len(payloads)} chunks of {args.chunk_size} rows, {size / 1e6:.1f} MB of NDJSON')
+
+        writers = [('per-row', write_per_row, 0), ('direct', write_direct, 0)] + [
+            (f'atomic {buffer_size:g} MB', write_atomic, int(buffer_size * (1 << 20))) for buffer_size in args.buffer_sizes
+        ]
+        path = os.path.join(output_dir, 'out.ndjson')
+        for name, write, buffer_size in writers:
+            best = None
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                writes = write(payloads, path, buffer_size)
+                elapsed = time.perf_counter() - started
+                best = min(best or elapsed, elapsed)
+                os.remove(path)
+            print(f'{name:>16}: {args.rows / best:12,.0f} rows/sec {size / 1e6 / best:8.1f} MB/sec {writes:>9} writes')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+import argparse
+import os
+import random
+import string
+from datetime import date, timedelta
+from utils.datatypes import get_datatype
+from utils.decoder import get_columns
+from utils.file_utils import get_specs_dict
+
+# Datatypes of generated specs and their default weights
+DEFAULT_MIX = {'TEXT': 1, 'INTEGER': 1, 'BOOLEAN': 1}
+
+# Generated dates fall within this many days of the first one, like the dates of a single drop
+FIRST_DATE = date(2021, 7, 1)
+DATE_RANGE = 31
+
+def parse_mix(values):
+    """
+    Parse a datatype mix given on the command line.
+
+    Args:
+        values (list): Items formatted as `DATATYPE=WEIGHT`, e.g. `integer=3`.
+
+    Returns:
+        dict: Dictionary mapping uppercase datatypes to weights.
+    """
+    mix = {}
+    for value in values:
+        datatype, _, weight = value.partition('=')
+        mix[datatype.upper()] = float(weight or 1)
+    return mix
+
+def generate_spec(spec_path, columns, min_width=1, max_width=12, mix=None, seed=0):
+    """
+    Write a synthetic spec file.
+
+    Boolean columns are always one character wide, like in the example specs,
+    and date columns eight characters wide.
+
+    Args:
+        spec_path (str): Path of the spec file to write.
+        columns (int): Number of columns.
+        min_width (int): Minimum width of text and integer columns.
+        max_width (int): Maximum width of text and integer columns.
+        mix (dict): Dictionary mapping datatypes to relative weights, defaults to DEFAULT_MIX.
+        seed (int): Seed for the random number generator.
+
+    Returns:
+        int: Width of a record in characters.
+    """
+    rng = random.Random(seed)
+    mix = mix or DEFAULT_MIX
+    datatypes = rng.choices(list(mix), weights=list(mix.values()), k=columns)
+    record_length = 0
+
+    with open(spec_path, 'w') as f:
+        f.write('column name,width,datatype\n')
+        for index, datatype in enumerate(datatypes):
+            width = {'BOOLEAN': 1, 'DATE': 8}.get(datatype) or rng.randint(min_width, max_width)
+            record_length += width
+            f.write(f'column{index},{width},{datatype}\n')
+
+    return record_length
+
+def generate_value(width, datatype, rng, invalid_rate=0.0):
+    """
+    Generate a random fixed-width field for a datatype.
+
+    Args:
+        width (int): Width of the field in characters.
+        datatype (str): Lowercase datatype of the column.
+        rng (random.Random): Random number generator.
+        invalid_rate (float): Probability of a field of a nullable datatype,
+            such as INTEGER or DATE, holding letters instead of a value.
+
+    Returns:
+        str: Field value padded to exactly `width` characters.
+    """
+    kind = get_datatype(datatype).kind
+    if kind == 'boolean':
+        value = rng.choice('01')
+    elif kind != 'text' and invalid_rate and rng.random() < invalid_rate:
+        value = ''.join(rng.choices(string.ascii_letters, k=rng.randint(1, width)))
+    elif kind == 'date':
+        value = (FIRST_DATE + timedelta(days=rng.randrange(DATE_RANGE))).strftime('%Y%m%d')
+    elif datatype in ['float', 'decimal'] and width > 2:
+        # Explicit decimal point, anywhere but the first and last characters
+        digits = str(rng.randrange(10 ** (width - 2)))
+        point = rng.randint(1, len(digits) - 1) if len(digits) > 1 else 1
+        value = (digits[:point] + '.' + digits[point:]).rjust(width - 1, '0')
+    elif kind in ['integer', 'float', 'decimal']:
+        value = str(rng.randrange(-10 ** (width - 1) + 1, 10 ** width))
+    else:
+        length = rng.randint(1, width)
+        value = ''.join(rng.choices(string.ascii_letters, k=length))
+    return value[:width].ljust(width)
+
+def generate_data_file(spec_file, specs_dir, output_path, rows, seed=0, invalid_rate=0.0):
+    """
+    Write a synthetic fixed-width data file matching a spec.
+
+    Args:
+        spec_file (str): File name of the spec file.
+        specs_dir (str): Path to the specs directory.
+        output_path (str): Path of the data file to write.
+        rows (int): Number of lines to generate.
+        seed (int): Seed for the random number generator.
+        invalid_rate (float): Probability of an integer field holding letters instead of a number.
+
+    Returns:
+        int: Size of the generated file in bytes.
+    """
+    rng = random.Random(seed)
+    columns = get_columns(get_specs_dict(spec_file, specs_dir))
+
+    # Generate a pool of lines and cycle through it to keep generation cheap
+    pool = [
+        ''.join(generate_value(end - start, datatype, rng, invalid_rate) for _, start, end, datatype in columns) + '\n'
+        for _ in range(min(rows, 10000))
+    ]
+
+    with open(output_path, 'w') as f:
+        for offset in range(0, rows, len(pool)):
+            f.writelines(pool[:rows - offset])
+
+    return os.path.getsize(output_path)
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic fixed-width data file, optionally with its spec.')
+    parser.add_argument('output', help='path of the data file to write')
+    parser.add_argument('--rows', type=int, default=1000000, help='number of lines')
+    parser.add_argument('--specs-dir', default='specs', help='directory of the spec file')
+    parser.add_argument('--spec', default='testformat1.csv',
+                        help='spec file in the specs directory, written first when --columns is given')
+    parser.add_argument('--columns', type=int, help='generate a spec with this many columns')
+    parser.add_argument('--widths', type=int, nargs=2, default=[1, 12], metavar=('MIN', 'MAX'),
+                        help='range of widths of generated text and integer columns')
+    parser.add_argument('--mix', nargs='+', default=[], metavar='DATATYPE=WEIGHT',
+                        help='datatype weights of generated columns, e.g. integer=3 text=1')
+    parser.add_argument('--invalid-rate', type=float, default=0.0,
+                        help='fraction of integer fields holding letters instead of a number')
+    parser.add_argument('--seed', type=int, default=0, help='random seed')
+    args = parser.parse_args()
+
+    if args.columns:
+        generate_spec(os.path.join(args.specs_dir, args.spec), args.columns, *args.widths, parse_mix(args.mix),
+                      args.seed)
+    size = generate_data_file(args.spec, args.specs_dir, args.output, args.rows, args.seed, args.invalid_rate)
+    print(f'{args.output}: {args.rows} rows, {size / 1e6:.1f} MB')
+
+if __name__ == '__main__':
+    main()
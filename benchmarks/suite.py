@@ -0,0 +1,251 @@
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from tempfile import TemporaryDirectory
+from benchmarks.generate import DEFAULT_MIX, generate_data_file, generate_spec, parse_mix
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SPECS_DIR = os.path.join(BASE_DIR, 'specs')
+
+def bench_spec_parsing(workload):
+    """
+    Read, validate and compile the spec file repeatedly, one "row" per spec.
+    """
+    from utils.decoder import compile_decoder
+    from utils.file_utils import get_specs_dict, is_valid_spec
+
+    spec_file, specs_dir = workload['spec_file'], workload['specs_dir']
+    repeats = workload['spec_repeats']
+    started = time.perf_counter()
+    for _ in range(repeats):
+        if is_valid_spec(spec_file, specs_dir):
+            compile_decoder(get_specs_dict(spec_file, specs_dir))
+    elapsed = time.perf_counter() - started
+    return repeats, repeats * os.path.getsize(os.path.join(specs_dir, spec_file)), elapsed
+
+def bench_get_output_line(workload):
+    """
+    Convert every line with the reference per-line function, get_output_line.
+    """
+    from app import get_output_line
+    from utils.file_utils import get_specs_dict
+
+    dict_specs = get_specs_dict(workload['spec_file'], workload['specs_dir'])
+    with open(workload['data_path'], 'r') as f:
+        lines = f.readlines()
+
+    started = time.perf_counter()
+    for line in lines:
+        get_output_line(line, dict_specs)
+    elapsed = time.perf_counter() - started
+    return len(lines), os.path.getsize(workload['data_path']), elapsed
+
+def bench_serialization(workload):
+    """
+    Encode already decoded rows as NDJSON with the selected serializer.
+    """
+    from app import DEFAULT_CHUNK_SIZE
+    from utils.decoder import compile_decoder
+    from utils.file_utils import get_specs_dict, iter_chunks
+    from utils.serializers import get_serializer
+
+    decoder = compile_decoder(get_specs_dict(workload['spec_file'], workload['specs_dir']))
+    serializer = get_serializer(workload['serializer'], decoder.columns)
+    with open(workload['data_path'], 'r') as f:
+        chunks = [decoder.decode_chunk(chunk) for chunk in iter_chunks(f, DEFAULT_CHUNK_SIZE)]
+
+    started = time.perf_counter()
+    rows = sum(len(serializer.encode_chunk(chunk)) and len(chunk) for chunk in chunks)
+    elapsed = time.perf_counter() - started
+    return rows, os.path.getsize(workload['data_path']), elapsed
+
+def bench_process_data(workload):
+    """
+    Convert the data file end to end with process_data and the selected engine, serializer and format.
+    """
+    from app import process_data
+
+    with TemporaryDirectory() as output_dir:
+        started = time.perf_counter()
+        [result] = process_data(workload['specs_dir'], os.path.dirname(workload['data_path']), output_dir,
+                                [workload['spec_file']], [os.path.basename(workload['data_path'])],
+                                engine=workload['engine'], serializer=workload['serializer'],
+                                output_format=workload['output_format'])
+        elapsed = time.perf_counter() - started
+
+    if result['error']:
+        raise RuntimeError(result['error'])
+    return result['rows'], os.path.getsize(workload['data_path']), elapsed
+
+# Scenarios, each returning the rows handled, the input bytes they came from and the elapsed seconds
+SCENARIOS = {
+    'spec_parsing': bench_spec_parsing,
+    'get_output_line': bench_get_output_line,
+    'serialization': bench_serialization,
+    'process_data': bench_process_data,
+}
+
+def run_child(scenario, workload_json):
+    """
+    Run one scenario `repeat` times and print its best timing and the peak RSS of this process as JSON.
+    """
+    workload = json.loads(workload_json)
+    runs = [SCENARIOS[scenario](workload) for _ in range(workload['repeat'])]
+    rows, size, seconds = min(runs, key=lambda run: run[2])
+    print(json.dumps({
+        'rows': rows,
+        'bytes': size,
+        'seconds': seconds,
+        'rows_per_sec': rows / seconds if seconds else None,
+        'mb_per_sec': size / 1e6 / seconds if seconds else None,
+        'peak_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }))
+
+def run_scenario(scenario, workload):
+    """
+    Run a scenario in a fresh interpreter, so its peak RSS is not inflated by earlier scenarios.
+
+    Args:
+        scenario (str): Name of the scenario, one of SCENARIOS.
+        workload (dict): Description of the generated workload and the options to benchmark.
+
+    Returns:
+        dict: Rows, bytes, best seconds, rows/sec, MB/sec and peak RSS in KB of the scenario.
+    """
+    result = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.suite', '--child', scenario, json.dumps(workload)],
+        cwd=BASE_DIR, check=True, capture_output=True, text=True
+    )
+    return json.loads(result.stdout.splitlines()[-1])
+
+def compare_results(baseline, current, tolerance):
+    """
+    Compare the throughput of two suite runs.
+
+    Args:
+        baseline (dict): Results of the reference run, as saved by this suite.
+        current (dict): Results of the new run.
+        tolerance (float): Fraction of rows/sec a scenario may lose before it counts as a regression.
+
+    Returns:
+        list: One (scenario, baseline rows/sec, current rows/sec, relative change, regressed)
+            tuple per scenario present in both runs.
+    """
+    comparison = []
+    for scenario, result in current['scenarios'].items():
+        reference = baseline['scenarios'].get(scenario)
+        if not reference or not reference['rows_per_sec'] or not result['rows_per_sec']:
+            continue
+        change = result['rows_per_sec'] / reference['rows_per_sec'] - 1
+        comparison.append((scenario, reference['rows_per_sec'], result['rows_per_sec'], change, change < -tolerance))
+    return comparison
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the benchmark scenarios on a synthetic workload.')
+    parser.add_argument('--spec', default='testformat4.csv', help='spec file in specs/, unless --columns is given')
+    parser.add_argument('--columns', type=int, help='generate a spec with this many columns instead')
+    parser.add_argument('--widths', type=int, nargs=2, default=[1, 12], metavar=('MIN', 'MAX'),
+                        help='range of widths of generated text and integer columns')
+    parser.add_argument('--mix', nargs='+', default=[], metavar='DATATYPE=WEIGHT',
+                        help='datatype weights of generated columns, e.g. integer=3 text=1')
+    parser.add_argument('--invalid-rate', type=float, default=0.0,
+                        help='fraction of integer fields holding letters instead of a number')
+    parser.add_argument('--rows', type=int, default=200000, help='number of synthetic rows')
+    parser.add_argument('--seed', type=int, default=0, help='random seed')
+    parser.add_argument('--scenarios', nargs='+', choices=list(SCENARIOS), default=list(SCENARIOS),
+                        help='scenarios to run')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per scenario, the best one is kept')
+    parser.add_argument('--spec-repeats', type=int, default=2000, help='spec parses per spec_parsing run')
+    parser.add_argument('--engine', default='text', help='engine used by process_data')
+    parser.add_argument('--serializer', default='template', help='serializer used by serialization and process_data')
+    parser.add_argument('--format', default='ndjson', dest='output_format', help='output format used by process_data')
+    parser.add_argument('--output', help='write the results to this JSON file')
+    parser.add_argument('--compare', help='JSON results of a previous run to compare rows/sec against')
+    parser.add_argument('--tolerance', type=float, default=0.1,
+                        help='slowdown tolerated before a scenario counts as a regression (default: 0.1)')
+    parser.add_argument('--child', nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(*args.child)
+        return
+
+    with TemporaryDirectory() as temp_dir:
+        specs_dir = SPECS_DIR
+        spec_file = args.spec
+        if args.columns:
+            specs_dir = os.path.join(temp_dir, 'specs')
+            spec_file = 'workload.csv'
+            os.makedirs(specs_dir)
+            generate_spec(os.path.join(specs_dir, spec_file), args.columns, *args.widths,
+                          parse_mix(args.mix) or DEFAULT_MIX, args.seed)
+
+        data_dir = os.path.join(temp_dir, 'data')
+        os.makedirs(data_dir)
+        data_path = os.path.join(data_dir, f'{os.path.splitext(spec_file)[0]}_2000-01-01.txt')
+        size = generate_data_file(spec_file, specs_dir, data_path, args.rows, args.seed, args.invalid_rate)
+        print(f'{spec_file}: {args.rows} rows, {size / 1e6:.1f} MB')
+
+        workload = {
+            'spec_file': spec_file,
+            'specs_dir': specs_dir,
+            'data_path': data_path,
+            'repeat': args.repeat,
+            'spec_repeats': args.spec_repeats,
+            'engine': args.engine,
+            'serializer': args.serializer,
+            'output_format': args.output_format,
+        }
+
+        results = {
+            'workload': {
+                'spec': args.spec if not args.columns else None,
+                'columns': args.columns,
+                'widths': args.widths if args.columns else None,
+                'mix': parse_mix(args.mix) if args.columns else None,
+                'invalid_rate': args.invalid_rate,
+                'rows': args.rows,
+                'bytes': size,
+                'seed': args.seed,
+                'engine': args.engine,
+                'serializer': args.serializer,
+                'output_format': args.output_format,
+            },
+            'environment': {
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'cpus': os.cpu_count(),
+            },
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'scenarios': {},
+        }
+
+        for scenario in args.scenarios:
+            result = run_scenario(scenario, workload)
+            results['scenarios'][scenario] = result
+            print(f"{scenario:>16}: {result['rows_per_sec']:12,.0f} rows/sec {result['mb_per_sec']:8.1f} MB/sec "
+                  f"peak RSS {result['peak_rss_kb'] / 1024:8.1f} MB")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)
+        if baseline['workload'] != results['workload']:
+            print('warning: the baseline was run on a different workload')
+        comparison = compare_results(baseline, results, args.tolerance)
+        for scenario, before, after, change, regressed in comparison:
+            print(f"{scenario:>16}: {before:12,.0f} -> {after:12,.0f} rows/sec {change:+7.1%}"
+                  f"{'  REGRESSION' if regressed else ''}")
+        if any(regressed for *_, regressed in comparison):
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
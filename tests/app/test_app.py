@@ -1,8 +1,19 @@
+import asyncio
+import importlib.util
 import os
 import shutil
+import sys
 import unittest
-from app import process_data, get_output_line
+from datetime import date
+from decimal import Decimal
+from app import process_data, get_output_line, watch
+from utils.formatter import process_file
+from utils.manifest import OUTPUT_VERSION
+from utils.metrics import Metrics
+from utils.query import Query
+from utils.registry import SpecRegistry
 from tempfile import TemporaryDirectory
+from unittest.mock import patch
 from parameterized import parameterized
 
 class TestProcessData(unittest.TestCase):
@@ -64,8 +75,335 @@ class TestProcessData(unittest.TestCase):
         with open(os.path.join(self.output_dir, 'spec1_data.ndjson'), 'r') as f:
             output = f.readlines()
             self.assertEqual(len(output), 2)
-            self.assertEqual(output[0], '{"name": "John", "age": 25, "valid": True}\n')
-            self.assertEqual(output[1], '{"name": "Jane", "age": 30, "valid": False}\n')
+            self.assertEqual(output[0], '{"name": "John", "age": 25, "valid": true}\n')
+            self.assertEqual(output[1], '{"name": "Jane", "age": 30, "valid": false}\n')
+
+    def test_process_data_small_chunks(self):
+        # Output must not depend on how lines are batched
+        spec_file = 'spec1.csv'
+        with open(os.path.join(self.specs_dir, spec_file), 'w') as f:
+            f.write("column name,width,datatype\n")
+            f.write("name,10,text\n")
+            f.write("age,3,integer\n")
+
+        data_file = 'spec1_data.txt'
+        with open(os.path.join(self.data_dir, data_file), 'w') as f:
+            for i in range(7):
+                f.write(f"Person{i}   {i:>3}\n")
+
+        process_data(self.specs_dir, self.data_dir, self.output_dir, [spec_file], [data_file], chunk_size=3)
+
+        with open(os.path.join(self.output_dir, 'spec1_data.ndjson'), 'r') as f:
+            output = f.readlines()
+            self.assertEqual(len(output), 7)
+            self.assertEqual(output[6], '{"name": "Person6", "age": 6}\n')
+
+    def write_spec1_files(self, data_files):
+        spec_file = 'spec1.csv'
+        with open(os.path.join(self.specs_dir, spec_file), 'w') as f:
+            f.write("column name,width,datatype\n")
+            f.write("name,10,text\n")
+            f.write("age,3,integer\n")
+
+        for data_file in data_files:
+            with open(os.path.join(self.data_dir, data_file), 'w') as f:
+                f.write(f"{data_file[:10]:<10} 25\n")
+        return spec_file
+
+    def test_process_data_parallel(self):
+        # Parallel processing produces the same files and results order as sequential processing
+        data_files = [f'spec1_2021-01-0{i}.txt' for i in range(1, 5)]
+        spec_file = self.write_spec1_files(data_files)
+
+        results = process_data(self.specs_dir, self.data_dir, self.output_dir, [spec_file], data_files, workers=2)
+
+        self.assertEqual([result['data_file'] for result in results], data_files)
+        self.assertTrue(all(result['error'] is None and result['rows'] == 1 for result in results))
+        for data_file in data_files:
+            with open(os.path.join(self.output_dir, data_file.replace('.txt', '.ndjson')), 'r') as f:
+                self.assertEqual(f.read(), f'{{"name": "{data_file[:10]}", "age": 25}}\n')
+
+    @parameterized.expand([(1,), (2,)])
+    def test_process_data_isolates_failures(self, workers):
+        # A data file that cannot be read is reported without stopping the other files
+        data_files = ['spec1_2021-01-01.txt', 'spec1_2021-01-02.txt']
+        spec_file = self.write_spec1_files(data_files[1:])
+
+        with patch('builtins.print'):
+            results = process_data(self.specs_dir, self.data_dir, self.output_dir, [spec_file], data_files, workers=workers)
+
+        self.assertIn('FileNotFoundError', results[0]['error'])
+        self.assertIsNone(results[1]['error'])
+        self.assertTrue(os.path.exists(os.path.join(self.output_dir, 'spec1_2021-01-02.ndjson')))
+
+    def test_process_data_leaves_no_partial_output(self):
+        # A file failing half way leaves neither a truncated output nor a temporary file behind
+        data_file = 'spec1_2021-01-01.txt'
+        spec_file = self.write_spec1_files([])
+        with open(os.path.join(self.data_dir, data_file), 'w') as f:
+            f.write("Person0     0\nPerson1     1\n")
+
+        with patch('utils.serializers.Serializer.encode_chunk', side_effect=[b'{}\n', ValueError('bad row')]), \
+                patch('builtins.print'):
+            results = process_data(self.specs_dir, self.data_dir, self.output_dir, [spec_file], [data_file],
+                                   chunk_size=1, buffer_size=0)
+
+        self.assertIn('bad row', results[0]['error'])
+        self.assertEqual(os.listdir(self.output_dir), [])
+
+    @parameterized.expand([(1,), (3,)])
+    def test_process_data_sharded(self, workers):
+        # Splitting a file into byte ranges produces the same single output file in line order
+        data_file = 'spec1_2021-01-01.txt'
+        spec_file = self.write_spec1_files([])
+        with open(os.path.join(self.data_dir, data_file), 'w') as f:
+            for i in range(50):
+                f.write(f"Person{i:<4}{i:>3}\n")
+
+        results = process_data(self.specs_dir, self.data_dir, self.output_dir, [spec_file], [data_file],
+                               workers=workers, shards=4)
+
+        self.assertEqual(results[0]['rows'], 50)
+        self.assertEqual(os.listdir(self.output_dir), ['spec1_2021-01-01.ndjson'])
+        with open(os.path.join(self.output_dir, 'spec1_2021-01-01.ndjson'), 'r') as f:
+            output = f.readlines()
+            self.assertEqual(len(output), 50)
+            self.assertEqual(output[0], '{"name": "Person0", "age": 0}\n')
+            self.assertEqual(output[49], '{"name": "Person49", "age": 49}\n')
+
+    @parameterized.expand([('text', 1), ('mmap', 1), ('text', 3)])
+    def test_process_data_compressed(self, engine, shards):
+        # Compressed data files are decompressed, and outputs compressed, whatever the engine and shards
+        import gzip
+        data_file = 'spec1_2021-01-01.txt.gz'
+        spec_file = self.write_spec1_files([])
+        with gzip.open(os.path.join(self.data_dir, data_file), 'wt') as f:
+            for i in range(50):
+                f.write(f"Person{i:<4}{i:>3}\n")
+
+        results = process_data(self.specs_dir, self.data_dir, self.output_dir, [spec_file], [data_file],
+                               engine=engine, shards=shards, compression='gzip')
+
+        self.assertEqual(results[0]['rows'], 50)
+        self.assertEqual(results[0]['output_file'], os.path.join(self.output_dir, 'spec1_2021-01-01.ndjson.gz'))
+        with gzip.open(results[0]['output_file'], 'rt') as f:
+            output = f.readlines()
+        self.assertEqual(len(output), 50)
+        self.assertEqual(output[49], '{"name": "Person49", "age": 49}\n')
+
+    def test_process_data_reuses_compiled_specs(self):
+        # Runs sharing a registry reuse the decoders and serializers compiled by the first one
+        data_files = ['spec1_2021-01-01.txt']
+        spec_file = self.write_spec1_files(data_files)
+        registry = SpecRegistry()
+        process_data(self.specs_dir, self.data_dir, self.output_dir, [spec_file], data_files, registry=registry)
+        # One lookup per spec, reading the file once
+        self.assertEqual((registry.stats['hits'], registry.stats['misses']), (0, 1))
+        formatter = registry.get_formatter(os.path.join(self.specs_dir, spec_file))
+
+        with patch('app.process_file', wraps=process_file) as mock_process_file:
+            process_data(self.specs_dir, self.data_dir, self.output_dir, [spec_file], data_files, registry=registry)
+        decoder, serializer = mock_process_file.call_args.args[:2]
+        self.assertIs(decoder, formatter.get_decoder())
+        self.assertIs(serializer, formatter.get_serializer())
+
+    def test_process_data_missing_codec(self):
+        # A codec whose package is missing fails the run before any output file is created
+        data_files = ['spec1_2021-01-01.txt']
+        spec_file = self.write_spec1_files(data_files)
+
+        with patch.dict(sys.modules, {'zstandard': None}):
+            with self.assertRaises(ImportError):
+                process_data(self.specs_dir, self.data_dir, self.output_dir, [spec_file], data_files,
+                             compression='zstd')
+        self.assertEqual(os.listdir(self.output_dir), [])
+
+    def test_process_data_compressed_columnar_output(self):
+        with self.assertRaises(ValueError):
+            process_data(self.specs_dir, self.data_dir, self.output_dir, [], [], output_format='arrow',
+                         compression='gzip')
+
+    @parameterized.expand([
+        (engine, shards) for engine in ['text', 'mmap', 'numpy'] for shards in [1, 3]
+        if engine != 'numpy' or importlib.util.find_spec('numpy')
+    ])
+    def test_process_data_query(self, engine, shards):
+        # Only selected columns of the rows meeting every condition are written, whatever the engine and shards
+        data_file = 'spec1_2021-01-01.txt'
+        spec_file = self.write_spec1_files([])
+        with open(os.path.join(self.data_dir, data_file), 'w') as f:
+            for i in range(50):
+                f.write(f"Person{i:<4}{i:>3}\n")
+
+        query = Query(['age'], ['age >= 40', 'name != "Person45"'])
+        results = process_data(self.specs_dir, self.data_dir, self.output_dir, [spec_file], [data_file],
+                               engine=engine, shards=shards, query=query)
+
+        self.assertIsNone(results[0]['error'])
+        self.assertEqual(results[0]['rows'], 9)
+        with open(results[0]['output_file'], 'r') as f:
+            output = f.readlines()
+        self.assertEqual(output, [f'{{"age": {i}}}\n' for i in range(40, 50) if i != 45])
+
+    @parameterized.expand([
+        (engine,) for engine in ['text', 'mmap', 'numpy'] if engine != 'numpy' or importlib.util.find_spec('numpy')
+    ])
+    def test_process_data_query_metrics(self, engine):
+        # Metrics count the rows written, not the lines read
+        data_file = 'spec1_2021-01-01.txt'
+        spec_file = self.write_spec1_files([])
+        with open(os.path.join(self.data_dir, data_file), 'w') as f:
+            for i in range(50):
+                f.write(f"Person{i:<4}{i:>3}\n")
+
+        metrics = Metrics()
+        results = process_data(self.specs_dir, self.data_dir, self.output_dir, [spec_file], [data_file], chunk_size=7,
+                               engine=engine, query=Query(['name'], ['age > 99']), metrics=metrics)
+
+        self.assertEqual(results[0]['rows'], 0)
+        self.assertEqual(metrics.rows, 0)
+
+    def test_process_data_query_skips_specs_lacking_columns(self):
+        data_files = ['spec1_2021-01-01.txt', 'spec2_2021-01-01.txt']
+        spec_file = self.write_spec1_files(data_files[:1])
+        with open(os.path.join(self.specs_dir, 'spec2.csv'), 'w') as f:
+            f.write("column name,width,datatype\n")
+            f.write("name,10,text\n")
+        with open(os.path.join(self.data_dir, data_files[1]), 'w') as f:
+            f.write("Jane\n")
+
+        with patch('builtins.print') as mock_print:
+            results = process_data(self.specs_dir, self.data_dir, self.output_dir, [spec_file, 'spec2.csv'],
+                                   data_files, query=Query(['name'], ['age > 1']))
+
+        self.assertEqual([result['data_file'] for result in results], data_files[:1])
+        messages = [call.args[0] for call in mock_print.call_args_list]
+        self.assertEqual(messages, ["Skipping spec2.csv because the query does not apply: it has no column 'age'"])
+
+    def test_process_data_incremental_query(self):
+        # Changing the query makes outputs out of date
+        data_files = ['spec1_2021-01-01.txt']
+        spec_file = self.write_spec1_files(data_files)
+
+        def run(query):
+            results = process_data(self.specs_dir, self.data_dir, self.output_dir, [spec_file], data_files,
+                                   incremental=True, query=query)
+            return [result['skipped'] for result in results]
+
+        self.assertEqual(run(Query(['name'])), [False])
+        self.assertEqual(run(Query(['name'])), [True])
+        self.assertEqual(run(Query(['name'], ['age > 30'])), [False])
+        self.assertEqual(run(None), [False])
+        with open(os.path.join(self.output_dir, 'spec1_2021-01-01.ndjson'), 'r') as f:
+            self.assertEqual(f.read(), '{"name": "spec1_2021", "age": 25}\n')
+
+    @unittest.skipUnless(importlib.util.find_spec('pyarrow'), 'pyarrow is not installed')
+    def test_process_data_parquet_output(self):
+        import pyarrow.parquet as pq
+        data_file = 'spec1_2021-01-01.txt'
+        spec_file = self.write_spec1_files([data_file])
+
+        results = process_data(self.specs_dir, self.data_dir, self.output_dir, [spec_file], [data_file],
+                               output_format='parquet', shards=2)
+
+        self.assertEqual(results[0]['output_file'], os.path.join(self.output_dir, 'spec1_2021-01-01.parquet'))
+        self.assertEqual(pq.read_table(results[0]['output_file']).to_pylist(), [{'name': 'spec1_2021', 'age': 25}])
+
+    def test_process_data_incremental(self):
+        # A second run skips outputs whose data file, spec and settings are unchanged
+        data_files = ['spec1_2021-01-01.txt', 'spec1_2021-01-02.txt']
+        spec_file = self.write_spec1_files(data_files)
+
+        def run(**kwargs):
+            results = process_data(self.specs_dir, self.data_dir, self.output_dir, [spec_file], data_files,
+                                   incremental=True, **kwargs)
+            return [result['skipped'] for result in results]
+
+        self.assertEqual(run(), [False, False])
+        self.assertTrue(os.path.exists(os.path.join(self.output_dir, '.manifest.json')))
+        self.assertEqual(run(), [True, True])
+        self.assertEqual(run(force=True), [False, False])
+        self.assertEqual(run(serializer='json'), [False, False])
+
+        with open(os.path.join(self.data_dir, data_files[1]), 'a') as f:
+            f.write("Jane       30\n")
+        self.assertEqual(run(serializer='json'), [True, False])
+
+        os.remove(os.path.join(self.output_dir, 'spec1_2021-01-01.ndjson'))
+        self.assertEqual(run(serializer='json'), [False, True])
+
+        with open(os.path.join(self.specs_dir, spec_file), 'a') as f:
+            f.write("valid,1,boolean\n")
+        self.assertEqual(run(serializer='json'), [False, False])
+
+        # Upgrading to a release that converts differently reprocesses everything
+        self.assertEqual(run(serializer='json'), [True, True])
+        with patch('utils.manifest.OUTPUT_VERSION', OUTPUT_VERSION + 1):
+            self.assertEqual(run(serializer='json'), [False, False])
+
+    def test_process_data_spec_names_with_underscores(self):
+        # Data files go to the longest matching spec name and orphans are reported
+        for spec_name in ['my', 'my_format']:
+            with open(os.path.join(self.specs_dir, f'{spec_name}.csv'), 'w') as f:
+                f.write("column name,width,datatype\n")
+                f.write(f"{spec_name},3,integer\n")
+
+        data_files = ['my_format_2021-01-01.txt', 'my_2021-01-01.txt', 'other_2021-01-01.txt']
+        for data_file in data_files:
+            with open(os.path.join(self.data_dir, data_file), 'w') as f:
+                f.write(" 42\n")
+
+        with patch('builtins.print') as mock_print:
+            results = process_data(self.specs_dir, self.data_dir, self.output_dir, ['my.csv', 'my_format.csv'],
+                                   data_files)
+
+        self.assertEqual([result['data_file'] for result in results], data_files[1::-1])
+        mock_print.assert_called_once_with("Skipping other_2021-01-01.txt because no spec matches its name")
+        with open(os.path.join(self.output_dir, 'my_format_2021-01-01.ndjson'), 'r') as f:
+            self.assertEqual(f.read(), '{"my_format": 42}\n')
+
+    @parameterized.expand([('text', 1, 1), ('mmap', 2, 1), ('text', 1, 3)])
+    def test_process_data_metrics(self, engine, workers, shards):
+        # Metrics count rows, bytes and integer values that fell back to null, per file and in total
+        data_files = ['spec1_2021-01-01.txt', 'spec1_2021-01-02.txt']
+        spec_file = self.write_spec1_files([])
+        for data_file in data_files:
+            with open(os.path.join(self.data_dir, data_file), 'w') as f:
+                f.write("John       25\nJane      abc\nJim          \n")
+
+        metrics = Metrics(profile_dir=os.path.join(self.BASE_DIR, 'profile'))
+        process_data(self.specs_dir, self.data_dir, self.output_dir, [spec_file], data_files, chunk_size=2,
+                     workers=workers, shards=shards, engine=engine, metrics=metrics)
+
+        self.assertEqual(list(metrics.files), data_files)
+        self.assertEqual(metrics.rows, 6)
+        self.assertEqual(metrics.failures, {'age': 4})
+        self.assertEqual(metrics.files[data_files[0]].failures, {'age': 2})
+        self.assertEqual(metrics.bytes_in, 84)
+        self.assertEqual(metrics.bytes_out, sum(
+            os.path.getsize(os.path.join(self.output_dir, data_file.replace('.txt', '.ndjson')))
+            for data_file in data_files
+        ))
+        self.assertTrue(all(metrics.stages[stage] > 0 for stage in ['read', 'decode', 'encode', 'write']))
+        self.assertTrue(os.listdir(os.path.join(self.BASE_DIR, 'profile')))
+
+    def test_process_data_without_metrics(self):
+        data_files = ['spec1_2021-01-01.txt']
+        spec_file = self.write_spec1_files(data_files)
+        results = process_data(self.specs_dir, self.data_dir, self.output_dir, [spec_file], data_files)
+        self.assertIsNone(results[0]['metrics'])
+
+    def test_process_data_unknown_output_format(self):
+        with self.assertRaises(ValueError):
+            process_data(self.specs_dir, self.data_dir, self.output_dir, [], [], output_format='csv')
+
+    def test_process_data_unknown_engine(self):
+        with self.assertRaises(ValueError):
+            process_data(self.specs_dir, self.data_dir, self.output_dir, [], [], engine='unknown')
+
+    def test_process_data_unknown_serializer(self):
+        with self.assertRaises(ValueError):
+            process_data(self.specs_dir, self.data_dir, self.output_dir, [], [], serializer='unknown')
 
     @staticmethod
     def parametrize_test_data():
@@ -89,11 +427,26 @@ class TestProcessData(unittest.TestCase):
                 "testformat4.csv",
                 "testformat4_2022-06-30.txt",
                 "testformat4_2022-06-30.ndjson",
+            ),
+            (
+                "testformat5.csv",
+                "testformat5_2021-08-02.txt",
+                "testformat5_2021-08-02.ndjson",
             )
         ]
 
+    @parameterized.expand([
+        (*case, engine) for case in parametrize_test_data() for engine in ['text', 'mmap']
+    ])
+    def test_process_data_parametrized(self, spec_filename, data_filename, expected_output_filename, engine):
+        self.check_process_data(spec_filename, data_filename, expected_output_filename, engine)
+
     @parameterized.expand(parametrize_test_data())
-    def test_process_data_parametrized(self, spec_filename, data_filename, expected_output_filename):
+    @unittest.skipUnless(importlib.util.find_spec('numpy'), 'numpy is not installed')
+    def test_process_data_numpy_engine(self, spec_filename, data_filename, expected_output_filename):
+        self.check_process_data(spec_filename, data_filename, expected_output_filename, 'numpy')
+
+    def check_process_data(self, spec_filename, data_filename, expected_output_filename, engine):
         # Get current directory and test data files
         base_dir = os.path.dirname(os.path.abspath(__file__))  
         spec_file = os.path.join(base_dir, 'data', spec_filename)
@@ -105,7 +458,7 @@ class TestProcessData(unittest.TestCase):
         shutil.copy(data_file, self.data_dir)
             
         # Process the data
-        process_data(self.specs_dir, self.data_dir, self.output_dir, [spec_filename], [data_filename])
+        process_data(self.specs_dir, self.data_dir, self.output_dir, [spec_filename], [data_filename], engine=engine)
         
         # Check if the output file exists
         output_file_path = os.path.join(self.output_dir, expected_output_filename)
@@ -119,6 +472,95 @@ class TestProcessData(unittest.TestCase):
                 self.assertEqual(output_data, expected_output_data)
 
 
+class TestWatch(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.specs_dir = os.path.join(self.temp_dir.name, 'specs')
+        self.data_dir = os.path.join(self.temp_dir.name, 'data')
+        self.output_dir = os.path.join(self.temp_dir.name, 'output')
+        for directory in [self.specs_dir, self.data_dir, self.output_dir]:
+            os.makedirs(directory)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write(self, directory, name, content):
+        with open(os.path.join(directory, name), 'w') as f:
+            f.write(content)
+
+    def read_output(self, name):
+        with open(os.path.join(self.output_dir, name), 'r') as f:
+            return f.read()
+
+    def run_watch(self, steps):
+        # Run watch while each step writes files and waits for the outputs it expects
+        results = []
+
+        async def wait_for(count):
+            for _ in range(200):
+                if len(results) >= count:
+                    return
+                await asyncio.sleep(0.05)
+            self.fail(f'Expected {count} results, got {results}')
+
+        async def run():
+            stop = asyncio.Event()
+            task = asyncio.create_task(watch(self.specs_dir, self.data_dir, self.output_dir, poll_interval=0.02,
+                                             on_result=results.append, stop=stop))
+            try:
+                for step, count in steps:
+                    step()
+                    await wait_for(count)
+            finally:
+                stop.set()
+                await task
+
+        with patch('builtins.print'):
+            asyncio.run(run())
+        return results
+
+    def test_watch_converts_files_as_they_land(self):
+        self.write(self.specs_dir, 'spec1.csv', "column name,width,datatype\nname,10,text\nage,3,integer\n")
+        self.write(self.data_dir, 'spec1_2021-01-01.txt', "John       25\n")
+
+        results = self.run_watch([
+            (lambda: None, 1),
+            (lambda: self.write(self.data_dir, 'spec1_2021-01-02.txt', "Jane       30\n"), 2),
+        ])
+
+        self.assertEqual([result['data_file'] for result in results], ['spec1_2021-01-01.txt', 'spec1_2021-01-02.txt'])
+        self.assertTrue(all(result['error'] is None and result['latency'] < 5 for result in results))
+        self.assertEqual(self.read_output('spec1_2021-01-02.ndjson'), '{"name": "Jane", "age": 30}\n')
+        self.assertTrue(os.path.exists(os.path.join(self.output_dir, '.manifest.json')))
+
+        # Outputs recorded in the manifest are not converted again
+        results = self.run_watch([(lambda: self.write(self.data_dir, 'spec1_2021-01-03.txt', "Jim        40\n"), 1)])
+        self.assertEqual([result['data_file'] for result in results], ['spec1_2021-01-03.txt'])
+
+    def test_watch_reloads_changed_specs(self):
+        self.write(self.specs_dir, 'spec1.csv', "column name,width,datatype\nname,10,text\n")
+        self.write(self.data_dir, 'spec1_2021-01-01.txt', "John       25\n")
+
+        def change_spec():
+            self.write(self.specs_dir, 'spec1.csv', "column name,width,datatype\nname,10,text\nage,3,integer\n")
+
+        results = self.run_watch([(lambda: None, 1), (change_spec, 2)])
+
+        self.assertEqual([result['data_file'] for result in results], ['spec1_2021-01-01.txt'] * 2)
+        self.assertEqual(self.read_output('spec1_2021-01-01.ndjson'), '{"name": "John", "age": 25}\n')
+
+    def test_watch_picks_up_orphans_when_their_spec_lands(self):
+        self.write(self.data_dir, 'spec1_2021-01-01.txt', "John       25\n")
+
+        def add_spec():
+            self.write(self.specs_dir, 'spec1.csv', "column name,width,datatype\nname,10,text\n")
+
+        results = self.run_watch([(add_spec, 1)])
+
+        self.assertEqual(results[0]['data_file'], 'spec1_2021-01-01.txt')
+        self.assertEqual(self.read_output('spec1_2021-01-01.ndjson'), '{"name": "John"}\n')
+
+
 class TestGetOutputLine(unittest.TestCase):
     @staticmethod
     def test_data():
@@ -158,6 +600,26 @@ class TestGetOutputLine(unittest.TestCase):
                 },
                 'Stroke    1122',
                 {'name': 'Stroke', 'valid': True, 'count': 122}
+            ),
+            (
+                {
+                    'day': {'width': '8', 'datatype': 'DATE'},
+                    'amount': {'width': '6', 'datatype': 'DECIMAL'},
+                    'price': {'width': '5', 'datatype': 'V99'},
+                    'ratio': {'width': '4', 'datatype': 'FLOAT'}
+                },
+                '20210706 12.5 01999 0.5',
+                {'day': date(2021, 7, 6), 'amount': Decimal('12.5'), 'price': Decimal('19.99'), 'ratio': 0.5}
+            ),
+            (
+                {
+                    'day': {'width': '8', 'datatype': 'DATE'},
+                    'amount': {'width': '6', 'datatype': 'DECIMAL'},
+                    'price': {'width': '5', 'datatype': 'V99'},
+                    'ratio': {'width': '4', 'datatype': 'FLOAT'}
+                },
+                '20211341   abc19.99 inf',
+                {'day': None, 'amount': None, 'price': None, 'ratio': None}
             )
         ]
     
@@ -0,0 +1,127 @@
+import importlib.util
+import io
+import os
+import unittest
+from tempfile import TemporaryDirectory
+from parameterized import parameterized
+from utils.compression import (
+    ThreadedReader, ThreadedWriter, detect_codec, get_codec_extension, open_compressed, open_decompressed,
+    strip_codec_extension
+)
+from utils.mmap_reader import open_mmap_file
+from utils.sharding import get_shard_ranges, open_data_file
+
+DATA = b''.join(b'Person%-4d%3d\n' % (i, i % 1000) for i in range(20000))
+
+# Codecs whose package is installed, gzip being in the standard library
+AVAILABLE_CODECS = [
+    codec for codec, module in [('gzip', 'gzip'), ('zstd', 'zstandard'), ('lz4', 'lz4')]
+    if importlib.util.find_spec(module)
+]
+
+class FailingFile(io.RawIOBase):
+    def readable(self):
+        return True
+
+    def writable(self):
+        return True
+
+    def read(self, size=-1):
+        raise OSError('corrupt stream')
+
+    def write(self, b):
+        raise OSError('disk full')
+
+
+class TestCompression(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_get_codec_extension(self):
+        self.assertEqual(get_codec_extension('gzip'), '.gz')
+        self.assertEqual(get_codec_extension(None), '')
+        with self.assertRaises(ValueError):
+            get_codec_extension('bz2')
+
+    @parameterized.expand([
+        ('data_2021-07-06.txt.gz', 'gzip', 'data_2021-07-06.txt'),
+        ('data.txt.zst', 'zstd', 'data.txt'),
+        ('data.txt.lz4', 'lz4', 'data.txt'),
+        ('data.txt', None, 'data.txt'),
+        ('data.gz.txt', None, 'data.gz.txt'),
+    ])
+    def test_detect_codec(self, path, codec, stripped):
+        self.assertEqual(detect_codec(path), codec)
+        self.assertEqual(strip_codec_extension(path), stripped)
+
+    @parameterized.expand([
+        (codec, threaded) for codec in AVAILABLE_CODECS for threaded in [False, True]
+    ])
+    def test_round_trip(self, codec, threaded):
+        path = os.path.join(self.temp_dir.name, f'data.txt{get_codec_extension(codec)}')
+        with open_compressed(path, codec, threaded=threaded) as f:
+            for start in range(0, len(DATA), 7000):
+                f.write(DATA[start:start + 7000])
+
+        self.assertLess(os.path.getsize(path), len(DATA))
+        with open_decompressed(path, threaded=threaded) as f:
+            self.assertEqual(f.read(), DATA)
+
+    @parameterized.expand([(codec,) for codec in AVAILABLE_CODECS])
+    def test_concatenated_streams(self, codec):
+        # Sharded outputs are joined by concatenating compressed parts
+        path = os.path.join(self.temp_dir.name, f'data.txt{get_codec_extension(codec)}')
+        parts = []
+        for index, part in enumerate([DATA[:1000], DATA[1000:]]):
+            parts.append(f'{path}.part{index}')
+            with open_compressed(parts[-1], codec) as f:
+                f.write(part)
+        with open(path, 'wb') as f:
+            for part in parts:
+                with open(part, 'rb') as part_file:
+                    f.write(part_file.read())
+
+        with open_decompressed(path) as f:
+            self.assertEqual(f.read(), DATA)
+
+    def test_threaded_reader_reads_in_blocks(self):
+        with io.BufferedReader(ThreadedReader(io.BytesIO(DATA), block_size=1000, depth=2)) as f:
+            self.assertEqual(f.readline(), DATA[:DATA.index(b'\n') + 1])
+            self.assertEqual(len(f.read()) + DATA.index(b'\n') + 1, len(DATA))
+
+    def test_threaded_reader_raises_errors(self):
+        with self.assertRaises(OSError):
+            with io.BufferedReader(ThreadedReader(FailingFile())) as f:
+                f.read()
+
+    def test_threaded_reader_closes_early(self):
+        reader = ThreadedReader(io.BytesIO(DATA), block_size=10, depth=1)
+        reader.close()
+        self.assertFalse(reader.thread.is_alive())
+
+    def test_threaded_writer_raises_errors(self):
+        writer = ThreadedWriter(FailingFile())
+        writer.write(b'lost')
+        with self.assertRaises(OSError):
+            writer.close()
+
+    def test_open_data_file(self):
+        import gzip
+        path = os.path.join(self.temp_dir.name, 'data.txt.gz')
+        with gzip.open(path, 'wb') as f:
+            f.write(DATA)
+
+        self.assertEqual(get_shard_ranges(path, 4), [(0, None)])
+        with open_data_file(path) as f:
+            self.assertEqual(f.read(), DATA.decode())
+        with open_mmap_file(path) as f:
+            self.assertEqual(b''.join(f), DATA)
+        for open_lines in [open_data_file, open_mmap_file]:
+            with self.assertRaises(ValueError):
+                open_lines(path, 0, 100)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+import random
+import unittest
+from datetime import date
+from decimal import Decimal
+from parameterized import parameterized
+from app import get_output_line
+from utils.datatypes import (
+    DATATYPES, Datatype, convert_date, date_cache, get_datatype, parse_date, parse_implied_scale, register_datatype
+)
+from utils.decoder import compile_decoder
+
+class TestDatatypes(unittest.TestCase):
+    @parameterized.expand([
+        ('TEXT', 'text'),
+        ('Boolean', 'boolean'),
+        ('integer', 'integer'),
+        ('FLOAT', 'float'),
+        ('DECIMAL', 'decimal'),
+        ('DATE', 'date'),
+        ('V99', 'decimal'),
+        ('S9(5)V99', 'decimal'),
+        ('string', 'text'),
+        ('9(5)', 'text'),
+    ])
+    def test_get_datatype(self, name, kind):
+        self.assertEqual(get_datatype(name).kind, kind)
+
+    def test_get_datatype_is_cached(self):
+        self.assertIs(get_datatype('S9(3)V9(4)'), get_datatype('s9(3)v9(4)'))
+
+    @parameterized.expand([
+        ('v99', 2),
+        ('9(5)v99', 2),
+        ('s9(7)v9(3)', 3),
+        ('s99v9(2)9', 3),
+        ('v', None),
+        ('9(5)', None),
+        ('decimal', None),
+    ])
+    def test_parse_implied_scale(self, name, scale):
+        self.assertEqual(parse_implied_scale(name), scale)
+
+    @parameterized.expand([
+        ('INTEGER', '-14', -14),
+        ('INTEGER', '1.5', None),
+        ('FLOAT', '1.5', 1.5),
+        ('FLOAT', '-2e3', -2000.0),
+        ('FLOAT', 'nan', None),
+        ('FLOAT', 'inf', None),
+        ('FLOAT', 'abc', None),
+        ('DECIMAL', '0012.50', Decimal('12.50')),
+        ('DECIMAL', '-0.5', Decimal('-0.5')),
+        ('DECIMAL', '+7', Decimal('7')),
+        ('DECIMAL', 'NaN', None),
+        ('DECIMAL', '1,5', None),
+        ('DECIMAL', '1E+5', None),
+        ('DECIMAL', '1e-9', None),
+        ('DECIMAL', '1_000', None),
+        ('DECIMAL', '.5', None),
+        ('DECIMAL', '1.2.3', None),
+        ('DECIMAL', '\u0663', None),
+        ('V99', '0012345', Decimal('123.45')),
+        ('S9(5)V99', '-0012345', Decimal('-123.45')),
+        ('V99', '123.45', None),
+        ('DATE', '20210706', date(2021, 7, 6)),
+        ('DATE', '20210230', None),
+        ('DATE', '2021076', None),
+        ('DATE', '2021-7-6', None),
+        ('DATE', '', None),
+    ])
+    def test_convert(self, name, value, expected):
+        self.assertEqual(get_datatype(name).convert(value), expected)
+
+    def test_implied_decimal_keeps_scale(self):
+        self.assertEqual(str(get_datatype('V99').convert('100')), '1.00')
+
+    def test_date_is_cached(self):
+        self.assertEqual(parse_date(b'20210706 '), date(2021, 7, 6))
+        self.assertEqual(date_cache[b'20210706 '], date(2021, 7, 6))
+        self.assertIs(convert_date(' 20210707'), convert_date(' 20210707'))
+        self.assertEqual(parse_date(b'\x1f20210708\x1c'), date(2021, 7, 8))
+
+    @parameterized.expand([(False,), (True,)])
+    def test_decode(self, binary):
+        dict_specs = {
+            'amount': {'width': '8', 'datatype': 'DECIMAL'},
+            'ratio': {'width': '6', 'datatype': 'FLOAT'},
+            'price': {'width': '7', 'datatype': 'S9(5)V99'},
+            'day': {'width': '8', 'datatype': 'DATE'},
+        }
+        line = ' 1234.50  0.25-00123420210706\n'
+        decoder = compile_decoder(dict_specs, binary=binary)
+        self.assertEqual(decoder(line.encode() if binary else line), {
+            'amount': Decimal('1234.50'), 'ratio': 0.25, 'price': Decimal('-12.34'), 'day': date(2021, 7, 6)
+        })
+        self.assertEqual(decoder(b'x' if binary else 'x'), {'amount': None, 'ratio': None, 'price': None, 'day': None})
+
+    @parameterized.expand([(False,), (True,)])
+    def test_decode_decimal_rejects_exponents(self, binary):
+        decoder = compile_decoder({'amount': {'width': '6', 'datatype': 'DECIMAL'}}, binary=binary)
+        lines = ['  1E+5', '1e-9  ', ' 12.50']
+        output = decoder.decode_chunk([line.encode() for line in lines] if binary else lines)
+        self.assertEqual(output, [{'amount': None}, {'amount': None}, {'amount': Decimal('12.50')}])
+
+    @parameterized.expand([('INTEGER', '\x1f12\x1f', 12), ('FLOAT', '\x1f2.5\x1c', 2.5)])
+    def test_decode_strips_like_get_output_line(self, name, line, expected):
+        # str.strip() removes separators float() and int() reject
+        dict_specs = {'value': {'width': str(len(line)), 'datatype': name}}
+        self.assertEqual(compile_decoder(dict_specs)(line), {'value': expected})
+        self.assertEqual(get_output_line(line, dict_specs), {'value': expected})
+
+    @parameterized.expand([('FLOAT',), ('DECIMAL',), ('V99',), ('DATE',)])
+    def test_decoders_match_convert(self, name):
+        rng = random.Random(0)
+        alphabet = ' 0123456789-+._e2\t'
+        fields = [''.join(rng.choices(alphabet, k=rng.randint(0, 10))).ljust(10) for _ in range(2000)]
+        fields += ['20210706  ', '  20210706', 'nan       ', '-inf      ', '   12.5e-3']
+        dict_specs = {'value': {'width': '10', 'datatype': name}}
+        convert = get_datatype(name).convert
+
+        expected = [{'value': convert(field.strip())} for field in fields]
+        self.assertEqual(compile_decoder(dict_specs).decode_chunk(fields), expected)
+        self.assertEqual(compile_decoder(dict_specs, binary=True).decode_chunk([f.encode() for f in fields]), expected)
+
+    def test_register_datatype(self):
+        register_datatype(Datatype('yesno', 'boolean', lambda value: value in ['Y', 'YES']))
+        self.addCleanup(DATATYPES.pop, 'yesno')
+        dict_specs = {'answer': {'width': '3', 'datatype': 'YESNO'}, 'count': {'width': '2', 'datatype': 'INTEGER'}}
+
+        self.assertEqual(compile_decoder(dict_specs)('YES 7'), {'answer': True, 'count': 7})
+        self.assertEqual(compile_decoder(dict_specs, binary=True)(b'N  x7'), {'answer': False, 'count': None})
+
+if __name__ == '__main__':
+    unittest.main()
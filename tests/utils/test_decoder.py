@@ -0,0 +1,117 @@
+import pickle
+import unittest
+from parameterized import parameterized
+from utils.decoder import compile_decoder, get_columns
+from utils.query import Query
+
+DICT_SPECS = {
+    'name': {'width': '10', 'datatype': 'TEXT'},
+    'valid': {'width': '1', 'datatype': 'BOOLEAN'},
+    'count': {'width': '3', 'datatype': 'INTEGER'}
+}
+
+class TestDecoder(unittest.TestCase):
+    def test_get_columns(self):
+        self.assertEqual(get_columns(DICT_SPECS), [
+            ('name', 0, 10, 'text'),
+            ('valid', 10, 11, 'boolean'),
+            ('count', 11, 14, 'integer')
+        ])
+
+    @parameterized.expand([
+        ('Diabetes  1  1\n', {'name': 'Diabetes', 'valid': True, 'count': 1}),
+        ('Asthma    0-14\n', {'name': 'Asthma', 'valid': False, 'count': -14}),
+        ('Stroke    1122', {'name': 'Stroke', 'valid': True, 'count': 122}),
+        ('Unknown   1abc', {'name': 'Unknown', 'valid': True, 'count': None}),
+        ('Short', {'name': 'Short', 'valid': False, 'count': None}),
+    ])
+    def test_decode(self, line, expected_output):
+        self.assertEqual(compile_decoder(DICT_SPECS)(line), expected_output)
+
+    def test_decode_preserves_column_order(self):
+        output = compile_decoder(DICT_SPECS)('Diabetes  1  1')
+        self.assertEqual(list(output), ['name', 'valid', 'count'])
+
+    def test_decode_unknown_datatype_as_text(self):
+        decoder = compile_decoder({'code': {'width': '4', 'datatype': 'string'}})
+        self.assertEqual(decoder(' ab \n'), {'code': 'ab'})
+
+    def test_decode_quoted_column_name(self):
+        decoder = compile_decoder({"it's": {'width': '2', 'datatype': 'TEXT'}})
+        self.assertEqual(decoder('ok'), {"it's": 'ok'})
+
+    @parameterized.expand([
+        (b'Diabetes  1  1\n', {'name': 'Diabetes', 'valid': True, 'count': 1}),
+        (b'Asthma    0-14\r\n', {'name': 'Asthma', 'valid': False, 'count': -14}),
+        (b'Caf\xe9      1abc', {'name': 'Caf\xe9', 'valid': True, 'count': None}),
+        (b'Short', {'name': 'Short', 'valid': False, 'count': None}),
+    ])
+    def test_decode_binary(self, line, expected_output):
+        self.assertEqual(compile_decoder(DICT_SPECS, binary=True)(line), expected_output)
+
+    def test_decode_binary_wide_boolean(self):
+        decoder = compile_decoder({'flag': {'width': '3', 'datatype': 'BOOLEAN'}}, binary=True)
+        self.assertEqual(decoder(b' 1 '), {'flag': True})
+
+    def test_decode_chunk(self):
+        decoder = compile_decoder(DICT_SPECS)
+        self.assertEqual(decoder.decode_chunk(['Diabetes  1  1', 'Stroke    1122']), [
+            {'name': 'Diabetes', 'valid': True, 'count': 1},
+            {'name': 'Stroke', 'valid': True, 'count': 122}
+        ])
+
+    def test_decoder_pickles(self):
+        decoder = pickle.loads(pickle.dumps(compile_decoder(DICT_SPECS)))
+        self.assertEqual(decoder('Asthma    0-14'), {'name': 'Asthma', 'valid': False, 'count': -14})
+
+        decoder = pickle.loads(pickle.dumps(compile_decoder(DICT_SPECS, binary=True)))
+        self.assertEqual(decoder(b'Asthma    0-14'), {'name': 'Asthma', 'valid': False, 'count': -14})
+
+    @parameterized.expand([(False, 'Unknown   1abc'), (True, b'Unknown   1abc')])
+    def test_decode_compact(self, binary, line):
+        decoder = compile_decoder(DICT_SPECS, binary=binary, compact=True)
+        record = decoder(line)
+        self.assertEqual(record, ('Unknown', True, None))
+        self.assertEqual(record.to_dict(), {'name': 'Unknown', 'valid': True, 'count': None})
+        self.assertIs(type(decoder(line)), decoder.record_type)
+
+    def test_compact_decoder_pickles(self):
+        decoder = pickle.loads(pickle.dumps(compile_decoder(DICT_SPECS, compact=True)))
+        self.assertEqual(decoder('Asthma    0-14'), ('Asthma', False, -14))
+
+    @parameterized.expand([(False,), (True,)])
+    def test_decode_query(self, binary):
+        decoder = compile_decoder(DICT_SPECS, binary=binary, query=Query(['count', 'name'], ['valid == true']))
+        lines = ['Diabetes  1  1', 'Asthma    0-14', 'Stroke    1122']
+        lines = [line.encode() for line in lines] if binary else lines
+        self.assertEqual(decoder.columns, [('count', 11, 14, 'integer'), ('name', 0, 10, 'text')])
+        self.assertEqual(decoder.decode_chunk(lines), [{'count': 1, 'name': 'Diabetes'}, {'count': 122, 'name': 'Stroke'}])
+        self.assertIsNone(decoder(lines[1]))
+
+    @parameterized.expand([
+        ('count > 0', ['Diabetes', 'Stroke']),
+        ('count != 1', ['Asthma', 'Stroke']),
+        ('count == null', ['Unknown']),
+        ('count != null', ['Diabetes', 'Asthma', 'Stroke']),
+        ('name >= "S"', ['Stroke', 'Unknown']),
+    ])
+    def test_decode_predicates(self, condition, expected_names):
+        # Null integers only match comparisons with null
+        decoder = compile_decoder(DICT_SPECS, query=Query(['name'], [condition]))
+        rows = decoder.decode_chunk(['Diabetes  1  1', 'Asthma    0-14', 'Stroke    1122', 'Unknown   1abc'])
+        self.assertEqual([row['name'] for row in rows], expected_names)
+
+    def test_decode_query_skips_unselected_columns(self):
+        decoder = compile_decoder(DICT_SPECS, query=Query(['name'], ['count > 5']))
+        self.assertNotIn('[10:11]', decoder.source)
+        # The predicate is tested before the selected columns are sliced
+        self.assertLess(decoder.source.index('return None'), decoder.source.index('[0:10]'))
+
+    def test_compact_query_decoder_pickles(self):
+        decoder = compile_decoder(DICT_SPECS, compact=True, query=Query(['name'], ['valid == false']))
+        decoder = pickle.loads(pickle.dumps(decoder))
+        self.assertEqual(decoder.decode_chunk(['Diabetes  1  1', 'Asthma    0-14']), [('Asthma',)])
+        self.assertEqual(decoder.record_type.names, ('name',))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,157 @@
+import importlib.util
+import os
+import subprocess
+import sys
+import unittest
+from tempfile import TemporaryDirectory
+from parameterized import parameterized
+from utils.formatter import Formatter, Spec
+from utils.query import Query
+
+SPEC_TEXT = "column name,width,datatype\nname,10,TEXT\nvalid,1,BOOLEAN\ncount,3,INTEGER\n"
+DATA_TEXT = "Diabetes  1  1\nAsthma    0-14\nStroke    1122\n"
+RECORDS = [
+    {'name': 'Diabetes', 'valid': True, 'count': 1},
+    {'name': 'Asthma', 'valid': False, 'count': -14},
+    {'name': 'Stroke', 'valid': True, 'count': 122},
+]
+
+class TestSpec(unittest.TestCase):
+    def test_from_string(self):
+        spec = Spec.from_string(SPEC_TEXT, 'testformat1')
+        self.assertEqual(spec.name, 'testformat1')
+        self.assertEqual(spec.names, ['name', 'valid', 'count'])
+        self.assertEqual(spec.columns[2], ('count', 11, 14, 'integer'))
+
+    def test_from_lines_skips_blank_lines(self):
+        spec = Spec.from_lines(SPEC_TEXT.splitlines() + ['', '  '])
+        self.assertEqual(spec.names, ['name', 'valid', 'count'])
+
+    def test_from_path(self):
+        with TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'testformat1.csv')
+            with open(path, 'w') as f:
+                f.write(SPEC_TEXT)
+            spec = Spec.from_path(path)
+        self.assertEqual(spec.name, 'testformat1')
+        self.assertEqual(spec.dict_specs['name'], {'width': '10', 'datatype': 'TEXT'})
+
+    @parameterized.expand([
+        ("name,10,TEXT\n",),
+        ("column name,width,datatype\nname,10\n",),
+        ("column name,width,datatype\nname,ten,TEXT\n",),
+        ("",),
+    ])
+    def test_invalid_spec(self, text):
+        with self.assertRaises(ValueError):
+            Spec.from_string(text)
+
+
+class TestFormatter(unittest.TestCase):
+    def setUp(self):
+        self.formatter = Formatter(Spec.from_string(SPEC_TEXT), chunk_size=2)
+
+    def test_parse_string(self):
+        self.assertEqual(list(self.formatter.parse_string(DATA_TEXT)), RECORDS)
+
+    def test_parse_lines_is_lazy(self):
+        lines = iter(DATA_TEXT.splitlines(keepends=True))
+        records = self.formatter.parse_lines(lines)
+        self.assertEqual(next(records), RECORDS[0])
+        self.assertEqual(next(lines), DATA_TEXT.splitlines(keepends=True)[2])
+
+    @parameterized.expand([
+        (engine,) for engine in ['text', 'mmap', 'numpy']
+        if engine != 'numpy' or importlib.util.find_spec('numpy')
+    ])
+    def test_parse_path(self, engine):
+        with TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'data.txt')
+            with open(path, 'w') as f:
+                f.write(DATA_TEXT)
+            formatter = Formatter(self.formatter.spec, engine=engine, chunk_size=2)
+            self.assertEqual(list(formatter.parse_path(path)), RECORDS)
+
+    def test_parse_records(self):
+        records = list(self.formatter.parse_records(DATA_TEXT.splitlines()))
+        self.assertEqual([record.to_dict() for record in records], RECORDS)
+        self.assertEqual(records[1]['count'], -14)
+
+    @parameterized.expand([
+        (engine,) for engine in ['text', 'mmap', 'numpy']
+        if engine != 'numpy' or importlib.util.find_spec('numpy')
+    ])
+    def test_parse_batches(self, engine):
+        with TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'data.txt')
+            with open(path, 'w') as f:
+                f.write(DATA_TEXT)
+            formatter = Formatter(self.formatter.spec, engine=engine, chunk_size=2)
+            batches = list(formatter.parse_batches(path))
+
+        self.assertEqual([len(batch) for batch in batches], [2, 1])
+        self.assertEqual([record for batch in batches for record in batch.iter_dicts()], RECORDS)
+        self.assertEqual(b''.join(batch.to_ndjson(formatter.get_serializer()) for batch in batches).decode(),
+                         formatter.dumps(RECORDS))
+
+    def test_dumps(self):
+        self.assertEqual(self.formatter.dumps(RECORDS[:1]), '{"name": "Diabetes", "valid": true, "count": 1}\n')
+
+    def test_write(self):
+        with TemporaryDirectory() as temp_dir:
+            data_path = os.path.join(temp_dir, 'data.txt')
+            output_path = os.path.join(temp_dir, 'data.ndjson')
+            with open(data_path, 'w') as f:
+                f.write(DATA_TEXT)
+
+            self.assertEqual(self.formatter.write(data_path, output_path), 3)
+            with open(output_path, 'r') as f:
+                self.assertEqual(f.read(), self.formatter.dumps(RECORDS))
+
+    @parameterized.expand([
+        (engine,) for engine in ['text', 'mmap', 'numpy']
+        if engine != 'numpy' or importlib.util.find_spec('numpy')
+    ])
+    def test_query(self, engine):
+        formatter = Formatter(self.formatter.spec, engine, query=Query(['count', 'name'], ['count > 0']))
+        expected = [{'count': 1, 'name': 'Diabetes'}, {'count': 122, 'name': 'Stroke'}]
+        self.assertEqual(list(formatter.parse_string(DATA_TEXT)), expected)
+        self.assertEqual(formatter.dumps(expected[:1]), '{"count": 1, "name": "Diabetes"}\n')
+
+        with TemporaryDirectory() as temp_dir:
+            data_path = os.path.join(temp_dir, 'data.txt')
+            with open(data_path, 'w') as f:
+                f.write(DATA_TEXT)
+            self.assertEqual(list(formatter.parse_path(data_path)), expected)
+            [batch] = formatter.parse_batches(data_path)
+            self.assertEqual(list(batch.iter_dicts()), expected)
+
+    def test_query_unknown_column(self):
+        with self.assertRaises(ValueError):
+            Formatter(self.formatter.spec, query=Query(['missing']))
+
+    def test_unknown_engine(self):
+        with self.assertRaises(ValueError):
+            Formatter(self.formatter.spec, engine='unknown')
+
+    def test_compiles_lazily(self):
+        formatter = Formatter(self.formatter.spec, serializer='unknown')
+        self.assertEqual(list(formatter.parse_string(DATA_TEXT)), RECORDS)
+        with self.assertRaises(ValueError):
+            formatter.dumps(RECORDS)
+
+
+class TestImport(unittest.TestCase):
+    def test_import_loads_no_heavy_modules(self):
+        # Importing the library must not process anything nor load optional or heavy modules
+        heavy = [
+            'numpy', 'pyarrow', 'orjson', 'asyncio', 'concurrent.futures', 'argparse', 'json', 'cProfile', 'decimal',
+            'datetime'
+        ]
+        code = f"import app, sys; print([name for name in {heavy!r} if name in sys.modules])"
+        root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        output = subprocess.run([sys.executable, '-c', code], cwd=root, check=True, capture_output=True, text=True)
+        self.assertEqual(output.stdout.strip(), '[]')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import os
+import unittest
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+from utils.manifest import MANIFEST_FILENAME, OUTPUT_VERSION, is_up_to_date, load_manifest, make_entry, save_manifest
+
+class TestManifest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.data_path = os.path.join(self.temp_dir.name, 'spec1_data.txt')
+        self.output_path = os.path.join(self.temp_dir.name, 'spec1_data.ndjson')
+        with open(self.data_path, 'w') as f:
+            f.write("John      25\n")
+        with open(self.output_path, 'w') as f:
+            f.write('{"name": "John", "age": 25}\n')
+        self.settings = {'serializer': 'template', 'output_format': 'ndjson'}
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_load_manifest_missing_or_corrupt(self):
+        self.assertEqual(load_manifest(self.temp_dir.name), {})
+        with open(os.path.join(self.temp_dir.name, MANIFEST_FILENAME), 'w') as f:
+            f.write('{not json')
+        self.assertEqual(load_manifest(self.temp_dir.name), {})
+
+    def test_save_and_load_manifest(self):
+        manifest = {'spec1_data.ndjson': make_entry(self.data_path, 'abc', self.settings)}
+        save_manifest(self.temp_dir.name, manifest)
+        self.assertEqual(load_manifest(self.temp_dir.name), manifest)
+        self.assertFalse(os.path.exists(os.path.join(self.temp_dir.name, f'{MANIFEST_FILENAME}.tmp')))
+
+    def test_make_entry_reuses_hash_of_unchanged_file(self):
+        previous = make_entry(self.data_path, 'abc', self.settings)
+        with patch('utils.manifest.hash_file') as hash_file:
+            entry = make_entry(self.data_path, 'abc', self.settings, previous)
+        hash_file.assert_not_called()
+        self.assertEqual(entry, previous)
+
+    def test_is_up_to_date(self):
+        previous = make_entry(self.data_path, 'abc', self.settings)
+        self.assertTrue(is_up_to_date(previous, make_entry(self.data_path, 'abc', self.settings, previous),
+                                      self.output_path))
+        self.assertFalse(is_up_to_date(None, previous, self.output_path))
+        self.assertFalse(is_up_to_date(previous, make_entry(self.data_path, 'def', self.settings), self.output_path))
+        self.assertFalse(is_up_to_date(previous, make_entry(self.data_path, 'abc', {'serializer': 'json'}),
+                                       self.output_path))
+
+        os.remove(self.output_path)
+        self.assertFalse(is_up_to_date(previous, previous, self.output_path))
+
+    def test_is_up_to_date_after_upgrade(self):
+        # Outputs of a release converting differently, or of one recording no version, are out of date
+        previous = make_entry(self.data_path, 'abc', self.settings)
+        with patch('utils.manifest.OUTPUT_VERSION', OUTPUT_VERSION + 1):
+            self.assertFalse(is_up_to_date(previous, make_entry(self.data_path, 'abc', self.settings, previous),
+                                           self.output_path))
+
+        del previous['output_version']
+        self.assertFalse(is_up_to_date(previous, make_entry(self.data_path, 'abc', self.settings, previous),
+                                       self.output_path))
+
+    def test_is_up_to_date_after_content_change(self):
+        previous = make_entry(self.data_path, 'abc', self.settings)
+        with open(self.data_path, 'w') as f:
+            f.write("Jane      30\n")
+        self.assertFalse(is_up_to_date(previous, make_entry(self.data_path, 'abc', self.settings, previous),
+                                       self.output_path))
+
+    def test_is_up_to_date_after_touch(self):
+        # A new modification time with the same content is still up to date
+        previous = make_entry(self.data_path, 'abc', self.settings)
+        os.utime(self.data_path, ns=(0, previous['mtime_ns'] + 10 ** 9))
+        entry = make_entry(self.data_path, 'abc', self.settings, previous)
+        self.assertNotEqual(entry['mtime_ns'], previous['mtime_ns'])
+        self.assertTrue(is_up_to_date(previous, entry, self.output_path))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import json
+import unittest
+from utils.metrics import Metrics, format_labels
+
+class TestMetrics(unittest.TestCase):
+    def make_file_metrics(self, rows, failures):
+        metrics = Metrics()
+        metrics.rows = rows
+        metrics.bytes_in = rows * 10
+        metrics.bytes_out = rows * 30
+        metrics.seconds = 0.5
+        metrics.stages['decode'] = 0.25
+        for column_name, count in failures.items():
+            metrics.add_failures(column_name, count)
+        return metrics
+
+    def test_add_failures_ignores_zero(self):
+        metrics = Metrics()
+        metrics.add_failures('count', 0)
+        metrics.add_failures('count', 2)
+        metrics.add_failures('count', 1)
+        self.assertEqual(metrics.failures, {'count': 3})
+
+    def test_add_file_sums_totals(self):
+        metrics = Metrics()
+        metrics.add_file('a.txt', self.make_file_metrics(2, {'count': 1}))
+        metrics.add_file('b.txt', self.make_file_metrics(3, {'count': 2, 'age': 1}))
+
+        self.assertEqual(metrics.rows, 5)
+        self.assertEqual(metrics.bytes_in, 50)
+        self.assertEqual(metrics.bytes_out, 150)
+        self.assertEqual(metrics.seconds, 1.0)
+        self.assertEqual(metrics.stages['decode'], 0.5)
+        self.assertEqual(metrics.failures, {'count': 3, 'age': 1})
+        self.assertEqual(list(metrics.files), ['a.txt', 'b.txt'])
+
+    def test_to_json(self):
+        metrics = Metrics()
+        metrics.add_file('a.txt', self.make_file_metrics(2, {'count': 1}))
+        data = json.loads(metrics.to_json())
+
+        self.assertEqual(data['rows'], 2)
+        self.assertEqual(data['failures'], {'count': 1})
+        self.assertEqual(data['files']['a.txt']['bytes_out'], 60)
+        self.assertNotIn('files', data['files']['a.txt'])
+
+    def test_to_prometheus(self):
+        metrics = Metrics()
+        metrics.add_file('a.txt', self.make_file_metrics(2, {'count': 1}))
+        lines = metrics.to_prometheus().splitlines()
+
+        self.assertIn('# TYPE formatter_rows_total counter', lines)
+        self.assertIn('formatter_rows_total{file="a.txt"} 2', lines)
+        self.assertIn('formatter_stage_seconds_total{file="a.txt",stage="decode"} 0.25', lines)
+        self.assertIn('formatter_conversion_failures_total{file="a.txt",column="count"} 1', lines)
+
+    def test_to_prometheus_without_files(self):
+        lines = self.make_file_metrics(2, {}).to_prometheus(prefix='test').splitlines()
+        self.assertIn('test_rows_total 2', lines)
+
+    def test_format_labels_escapes_values(self):
+        self.assertEqual(format_labels({'file': 'a"b\\c'}), '{file="a\\"b\\\\c"}')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+import os
+import unittest
+from tempfile import TemporaryDirectory
+from utils.mmap_reader import open_mmap_file
+
+class TestMmapReader(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, 'data.txt')
+        with open(self.path, 'wb') as f:
+            f.write(b'first\nsecond\nthird')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_open_mmap_file_reads_lines(self):
+        with open_mmap_file(self.path) as lines:
+            self.assertEqual(list(lines), [b'first\n', b'second\n', b'third'])
+
+    def test_open_mmap_file_reads_range(self):
+        with open_mmap_file(self.path, 6, 13) as lines:
+            self.assertEqual(list(lines), [b'second\n'])
+        with open_mmap_file(self.path, 13, None) as lines:
+            self.assertEqual(list(lines), [b'third'])
+
+    def test_open_mmap_file_empty_file(self):
+        open(self.path, 'wb').close()
+        with open_mmap_file(self.path) as lines:
+            self.assertEqual(list(lines), [])
+
+    def test_open_mmap_file_missing_file(self):
+        with self.assertRaises(FileNotFoundError):
+            open_mmap_file(os.path.join(self.temp_dir.name, 'missing.txt'))
+
+if __name__ == '__main__':
+    unittest.main()
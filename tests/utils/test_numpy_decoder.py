@@ -0,0 +1,119 @@
+import random
+import unittest
+from decimal import Decimal
+from parameterized import parameterized
+from app import get_output_line
+from utils.decoder import compile_decoder
+from utils.query import Query
+
+try:
+    from utils.numpy_decoder import compile_numpy_decoder
+except ImportError:
+    compile_numpy_decoder = None
+
+DICT_SPECS = {
+    'name': {'width': '10', 'datatype': 'TEXT'},
+    'valid': {'width': '1', 'datatype': 'BOOLEAN'},
+    'count': {'width': '3', 'datatype': 'INTEGER'}
+}
+
+@unittest.skipIf(compile_numpy_decoder is None, 'numpy is not installed')
+class TestNumpyDecoder(unittest.TestCase):
+    @parameterized.expand([
+        (b'Diabetes  1  1\n', {'name': 'Diabetes', 'valid': True, 'count': 1}),
+        (b'Asthma    0-14\n', {'name': 'Asthma', 'valid': False, 'count': -14}),
+        (b'Stroke    1122', {'name': 'Stroke', 'valid': True, 'count': 122}),
+        (b'Unknown   1abc', {'name': 'Unknown', 'valid': True, 'count': None}),
+        (b'Blank     1   \n', {'name': 'Blank', 'valid': True, 'count': None}),
+        (b'Sign      1 -\n', {'name': 'Sign', 'valid': True, 'count': None}),
+        (b'Plus      1+7 ', {'name': 'Plus', 'valid': True, 'count': 7}),
+        (b'Short', {'name': 'Short', 'valid': False, 'count': None}),
+    ])
+    def test_decode_chunk(self, line, expected_output):
+        # Decode alongside another line so the chunk is padded
+        lines = [line, b'Padding   0  0 trailing\n']
+        self.assertEqual(compile_numpy_decoder(DICT_SPECS).decode_chunk(lines)[0], expected_output)
+
+    def test_decode_columns(self):
+        columns = compile_numpy_decoder(DICT_SPECS).decode_columns([b'Diabetes  1  1\n', b'Asthma    0-14\n'])
+        self.assertEqual(columns, {'name': ['Diabetes', 'Asthma'], 'valid': [True, False], 'count': [1, -14]})
+
+    def test_decode_empty_chunk(self):
+        self.assertEqual(compile_numpy_decoder(DICT_SPECS).decode_chunk([]), [])
+
+    def test_matches_line_decoder(self):
+        dict_specs = {
+            'small': {'width': '4', 'datatype': 'INTEGER'},
+            'flag': {'width': '3', 'datatype': 'BOOLEAN'},
+            'code': {'width': '3', 'datatype': 'TEXT'},
+            'large': {'width': '20', 'datatype': 'INTEGER'},
+        }
+        rng = random.Random(0)
+        alphabet = b' 0123456789-+_1a\t\r'
+        lines = [bytes(rng.choices(alphabet, k=rng.randint(0, 35))) + b'\n' for _ in range(5000)]
+
+        expected = compile_decoder(dict_specs, binary=True).decode_chunk(lines)
+        self.assertEqual(compile_numpy_decoder(dict_specs).decode_chunk(lines), expected)
+
+    @parameterized.expand([
+        (['code', 'small'], ['flag == true']),
+        (['large'], ['small >= 10', 'code != "1"']),
+        (['flag'], ['large == null']),
+        (['small'], ['code < "5"', 'flag == false']),
+    ])
+    def test_query_matches_line_decoder(self, columns, where):
+        dict_specs = {
+            'small': {'width': '4', 'datatype': 'INTEGER'},
+            'flag': {'width': '3', 'datatype': 'BOOLEAN'},
+            'code': {'width': '3', 'datatype': 'TEXT'},
+            'large': {'width': '20', 'datatype': 'INTEGER'},
+        }
+        rng = random.Random(0)
+        alphabet = b' 0123456789-+_1a\t\r'
+        lines = [bytes(rng.choices(alphabet, k=rng.randint(0, 35))) + b'\n' for _ in range(5000)]
+        query = Query(columns, where)
+
+        expected = compile_decoder(dict_specs, binary=True, query=query).decode_chunk(lines)
+        self.assertTrue(0 < len(expected) < len(lines))
+        self.assertEqual(compile_numpy_decoder(dict_specs, query).decode_chunk(lines), expected)
+
+    def test_strips_like_text_decoder(self):
+        # str.strip() removes the ASCII separators 28-31, which bytes.strip(), int() and float() keep
+        dict_specs = {
+            'n': {'width': '4', 'datatype': 'INTEGER'},
+            'f': {'width': '5', 'datatype': 'FLOAT'},
+            'b': {'width': '3', 'datatype': 'BOOLEAN'},
+        }
+        line = '\x1f12\x1f1.5\x1c\x1c\x1e1\x1d'
+        expected = {'n': 12, 'f': 1.5, 'b': True}
+        lines = [line.encode(), b'Padding to a longer line\n']
+
+        self.assertEqual(get_output_line(line, dict_specs), expected)
+        self.assertEqual(compile_decoder(dict_specs)(line), expected)
+        self.assertEqual(compile_decoder(dict_specs, binary=True)(line.encode()), expected)
+        self.assertEqual(compile_numpy_decoder(dict_specs).decode_chunk(lines)[0], expected)
+
+    def test_decimal_rejects_exponents(self):
+        decoder = compile_numpy_decoder({'amount': {'width': '6', 'datatype': 'DECIMAL'}})
+        columns = decoder.decode_columns([b'  1E+5\n', b'1e-9  \n', b' 12.50\n'])
+        self.assertEqual(columns, {'amount': [None, None, Decimal('12.50')]})
+
+    @parameterized.expand([(None,), (Query(['amount', 'day'], ['day >= 2021-07-15', 'price < 5']),)])
+    def test_datatypes_match_line_decoder(self, query):
+        dict_specs = {
+            'amount': {'width': '6', 'datatype': 'DECIMAL'},
+            'ratio': {'width': '5', 'datatype': 'FLOAT'},
+            'price': {'width': '5', 'datatype': 'V99'},
+            'day': {'width': '8', 'datatype': 'DATE'},
+        }
+        rng = random.Random(0)
+        lines = []
+        for _ in range(5000):
+            day = f'202107{rng.randint(0, 35):02}'.encode()
+            lines.append(bytes(rng.choices(b' 0123456789-.', k=16)) + day + b'\n')
+
+        expected = compile_decoder(dict_specs, binary=True, query=query).decode_chunk(lines)
+        self.assertEqual(compile_numpy_decoder(dict_specs, query).decode_chunk(lines), expected)
+
+if __name__ == '__main__':
+    unittest.main()
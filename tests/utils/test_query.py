@@ -0,0 +1,81 @@
+import unittest
+from datetime import date
+from decimal import Decimal
+from parameterized import parameterized
+from utils.decoder import get_columns
+from utils.query import Query, parse_condition, parse_value
+
+COLUMNS = get_columns({
+    'name': {'width': '10', 'datatype': 'TEXT'},
+    'valid': {'width': '1', 'datatype': 'BOOLEAN'},
+    'count': {'width': '3', 'datatype': 'INTEGER'}
+})
+
+class TestQuery(unittest.TestCase):
+    @parameterized.expand([
+        ('valid == true', ('valid', '==', 'true')),
+        ('count>=10', ('count', '>=', '10')),
+        ('count < -3', ('count', '<', '-3')),
+        ("name != 'a == b'", ('name', '!=', "'a == b'")),
+    ])
+    def test_parse_condition(self, text, expected_output):
+        self.assertEqual(parse_condition(text), expected_output)
+
+    @parameterized.expand([('valid',), ('== true',), ('valid ==',), ('count = 1',)])
+    def test_parse_invalid_condition(self, text):
+        with self.assertRaises(ValueError):
+            parse_condition(text)
+
+    @parameterized.expand([
+        ('42', 'integer', 42),
+        ('NULL', 'integer', None),
+        ('true', 'boolean', True),
+        ('0', 'boolean', False),
+        ('"Doe"', 'text', 'Doe'),
+        ('007', 'text', '007'),
+        ('-2.5', 'float', -2.5),
+        ('12.50', 'decimal', Decimal('12.50')),
+        ('5', 's9(5)v99', Decimal('5')),
+        ('2021-07-06', 'date', date(2021, 7, 6)),
+        ("'20210706'", 'date', date(2021, 7, 6)),
+    ])
+    def test_parse_value(self, text, datatype, expected_output):
+        self.assertEqual(parse_value(text, datatype), expected_output)
+
+    @parameterized.expand([
+        ('1.5', 'integer'),
+        ('nan', 'float'),
+        ('1,5', 'decimal'),
+        ('2021-02-30', 'date'),
+        ('yes', 'boolean'),
+    ])
+    def test_parse_invalid_value(self, text, datatype):
+        with self.assertRaises(ValueError):
+            parse_value(text, datatype)
+
+    def test_resolve(self):
+        columns, predicates = Query(['count', 'name'], ['valid == 1', ('count', '>', 5)]).resolve(COLUMNS)
+        self.assertEqual(columns, [COLUMNS[2], COLUMNS[0]])
+        self.assertEqual(predicates, [(COLUMNS[1], '==', True), (COLUMNS[2], '>', 5)])
+
+    def test_resolve_keeps_every_column_by_default(self):
+        self.assertEqual(Query().resolve(COLUMNS), (COLUMNS, []))
+
+    @parameterized.expand([
+        (['missing'], []),
+        ([], []),
+        (None, ['missing == 1']),
+        (None, ['count == many']),
+        (None, ['valid > false']),
+        (None, ['count < null']),
+    ])
+    def test_resolve_invalid_query(self, columns, where):
+        with self.assertRaises(ValueError):
+            Query(columns, where).resolve(COLUMNS)
+
+    def test_describe(self):
+        self.assertEqual(Query(['name'], ['count >= 10']).describe(), "select name where count >= '10'")
+        self.assertEqual(Query().describe(), 'select *')
+
+if __name__ == '__main__':
+    unittest.main()
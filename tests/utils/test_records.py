@@ -0,0 +1,107 @@
+import unittest
+from datetime import date
+from decimal import Decimal
+from parameterized import parameterized
+from utils.decoder import get_columns
+from utils.records import (
+    BooleanColumn, FloatColumn, IntegerColumn, ObjectColumn, RecordBatch, TextColumn, make_column, make_record_type,
+    pack_bits, unpack_bits
+)
+
+DICT_SPECS = {
+    'name': {'width': '10', 'datatype': 'TEXT'},
+    'valid': {'width': '1', 'datatype': 'BOOLEAN'},
+    'count': {'width': '3', 'datatype': 'INTEGER'}
+}
+ROWS = [('Diabetes', True, 1), ('Asthma', False, None), ('', True, -14)]
+
+class TestRecord(unittest.TestCase):
+    def setUp(self):
+        self.record_type = make_record_type(get_columns(DICT_SPECS))
+
+    def test_record(self):
+        record = self.record_type(ROWS[0])
+        self.assertEqual(record, ('Diabetes', True, 1))
+        self.assertEqual(record[2], 1)
+        self.assertEqual(record['count'], 1)
+        self.assertEqual(record.get('count'), 1)
+        self.assertIsNone(record.get('unknown'))
+        self.assertEqual(record.keys(), ['name', 'valid', 'count'])
+        self.assertEqual(record.to_dict(), {'name': 'Diabetes', 'valid': True, 'count': 1})
+        self.assertEqual(repr(record), "Record(name='Diabetes', valid=True, count=1)")
+
+    def test_record_has_no_dict(self):
+        with self.assertRaises(AttributeError):
+            self.record_type(ROWS[0]).__dict__
+
+    def test_record_types_do_not_share_names(self):
+        other_type = make_record_type(get_columns({'id': {'width': '5', 'datatype': 'INTEGER'}}))
+        self.assertEqual(other_type.names, ('id',))
+        self.assertEqual(self.record_type.names, ('name', 'valid', 'count'))
+
+
+class TestColumns(unittest.TestCase):
+    @parameterized.expand([(0,), (1,), (8,), (9,), (100,)])
+    def test_pack_bits(self, length):
+        flags = [index % 3 == 0 for index in range(length)]
+        bitmap = pack_bits(flags)
+        self.assertEqual(len(bitmap), (length + 7) // 8)
+        self.assertEqual(unpack_bits(bitmap, length), flags)
+
+    @parameterized.expand([
+        ('integer', [1, None, -14, 0], IntegerColumn),
+        ('integer', [1, 2, 3], IntegerColumn),
+        ('integer', [10 ** 30, None], ObjectColumn),
+        ('boolean', [True, False, True], BooleanColumn),
+        ('boolean', [True, None], ObjectColumn),
+        ('text', ['Diabetes', '', 'Caf\xe9'], TextColumn),
+        ('text', ['Diabetes', None], ObjectColumn),
+        ('unknown', ['ab'], TextColumn),
+        ('integer', [], IntegerColumn),
+        ('float', [0.25, None, -1e300], FloatColumn),
+        ('decimal', [Decimal('1.50'), None], ObjectColumn),
+        ('V99', [Decimal('-0.01')], ObjectColumn),
+        ('date', [date(2021, 7, 6), None], ObjectColumn),
+    ])
+    def test_make_column(self, datatype, values, column_type):
+        column = make_column(datatype, values)
+        self.assertIsInstance(column, column_type)
+        self.assertEqual(len(column), len(values))
+        self.assertEqual(column.to_list(), values)
+        self.assertEqual([column[index] for index in range(len(values))], values)
+
+
+class TestRecordBatch(unittest.TestCase):
+    def setUp(self):
+        self.record_type = make_record_type(get_columns(DICT_SPECS))
+        self.batch = RecordBatch.from_rows(self.record_type, ROWS)
+
+    def test_from_rows(self):
+        self.assertEqual(len(self.batch), 3)
+        self.assertEqual([type(column) for column in self.batch.columns], [TextColumn, BooleanColumn, IntegerColumn])
+        self.assertEqual(list(self.batch), ROWS)
+        self.assertEqual(self.batch[1], ROWS[1])
+        self.assertEqual(self.batch[-1]['count'], -14)
+        with self.assertRaises(IndexError):
+            self.batch[3]
+
+    def test_from_columns(self):
+        batch = RecordBatch.from_columns(self.record_type, [list(values) for values in zip(*ROWS)])
+        self.assertEqual(list(batch), ROWS)
+        self.assertEqual(batch.column('count'), [1, None, -14])
+
+    def test_empty(self):
+        batch = RecordBatch.from_rows(self.record_type, [])
+        self.assertEqual(len(batch), 0)
+        self.assertEqual(list(batch.iter_dicts()), [])
+
+    def test_no_columns(self):
+        batch = RecordBatch.from_rows(make_record_type([]), [(), ()])
+        self.assertEqual(len(batch), 2)
+        self.assertEqual(list(batch.iter_dicts()), [{}, {}])
+
+    def test_iter_dicts(self):
+        self.assertEqual(list(self.batch.iter_dicts()), [dict(zip(['name', 'valid', 'count'], row)) for row in ROWS])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+import os
+import unittest
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+from utils.formatter import Spec
+from utils.query import Query
+from utils.registry import SpecRegistry, read_spec
+
+SPEC_TEXT = "column name,width,datatype\nname,10,TEXT\ncount,3,INTEGER\n"
+
+class TestRegistry(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.paths = [os.path.join(self.temp_dir.name, f'spec{index}.csv') for index in range(3)]
+        for path in self.paths:
+            self.write(path, SPEC_TEXT)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write(self, path, content, mtime_ns=None):
+        with open(path, 'w') as f:
+            f.write(content)
+        if mtime_ns is not None:
+            os.utime(path, ns=(mtime_ns, mtime_ns))
+
+    def test_read_spec(self):
+        sha256, spec = read_spec(self.paths[0])
+        self.assertEqual(len(sha256), 64)
+        self.assertEqual(spec.name, 'spec0')
+        self.assertEqual(spec.names, ['name', 'count'])
+
+        self.write(self.paths[1], "name,10,TEXT\n")
+        self.assertEqual(read_spec(self.paths[1])[1], "the first line is not 'column name,width,datatype'")
+
+    def test_get_reads_each_spec_once(self):
+        registry = SpecRegistry()
+        with patch('utils.registry.read_spec', wraps=read_spec) as mock_read_spec:
+            spec = registry.get(self.paths[0])
+            self.assertIs(registry.get(self.paths[0]), spec)
+            registry.get_hash(self.paths[0])
+        mock_read_spec.assert_called_once()
+        self.assertEqual(registry.get_stats(), {'hits': 2, 'disk_hits': 0, 'misses': 1, 'evictions': 0, 'size': 1})
+
+    def test_get_reads_changed_spec_again(self):
+        registry = SpecRegistry()
+        registry.get(self.paths[0])
+        self.write(self.paths[0], SPEC_TEXT + "valid,1,BOOLEAN\n", mtime_ns=10 ** 18)
+        self.assertEqual(registry.get(self.paths[0]).names, ['name', 'count', 'valid'])
+        self.assertEqual(registry.get_stats()['misses'], 2)
+
+    def test_touched_spec_keeps_formatters(self):
+        registry = SpecRegistry()
+        formatter = registry.get_formatter(self.paths[0])
+        os.utime(self.paths[0], ns=(10 ** 18, 10 ** 18))
+        self.assertIs(registry.get_formatter(self.paths[0]), formatter)
+        self.assertIsNot(registry.get_formatter(self.paths[0], engine='mmap'), formatter)
+
+    def test_formatters_per_query(self):
+        registry = SpecRegistry()
+        formatter = registry.get_formatter(self.paths[0], query=Query(['name'], ['count > 1']))
+        self.assertIs(registry.get_formatter(self.paths[0], query=Query(['name'], ['count > 1'])), formatter)
+        self.assertEqual(formatter.columns, [('name', 0, 10, 'text')])
+        self.assertIsNot(registry.get_formatter(self.paths[0], query=Query(['name'])), formatter)
+        self.assertIsNot(registry.get_formatter(self.paths[0]), formatter)
+
+    def test_invalid_spec_is_cached(self):
+        registry = SpecRegistry()
+        self.write(self.paths[0], "column name,width,datatype\nname,ten,TEXT\n")
+        for _ in range(2):
+            with self.assertRaises(ValueError):
+                registry.get(self.paths[0])
+        self.assertEqual(registry.get_stats()['misses'], 1)
+
+    def test_lru_eviction(self):
+        registry = SpecRegistry(max_size=2)
+        registry.get(self.paths[0])
+        registry.get(self.paths[1])
+        registry.get(self.paths[0])
+        registry.get(self.paths[2])
+
+        self.assertEqual(len(registry), 2)
+        self.assertEqual(registry.get_stats()['evictions'], 1)
+        registry.get(self.paths[0])
+        self.assertEqual(registry.get_stats()['hits'], 2)
+
+    def test_disk_cache(self):
+        cache_path = os.path.join(self.temp_dir.name, 'specs.pickle')
+        registry = SpecRegistry(cache_path=cache_path)
+        registry.get(self.paths[0])
+        registry.save()
+
+        # A new registry serves unchanged specs from the cache without reading them
+        registry = SpecRegistry(cache_path=cache_path)
+        with patch('utils.registry.read_spec') as mock_read_spec:
+            spec = registry.get(self.paths[0])
+        mock_read_spec.assert_not_called()
+        self.assertIsInstance(spec, Spec)
+        self.assertEqual(spec.names, ['name', 'count'])
+        self.assertEqual(registry.get_stats()['disk_hits'], 1)
+
+        # Changed specs are read again
+        self.write(self.paths[0], SPEC_TEXT + "valid,1,BOOLEAN\n", mtime_ns=10 ** 18)
+        self.assertEqual(len(registry.get(self.paths[0]).names), 3)
+
+    def test_corrupt_disk_cache_is_ignored(self):
+        cache_path = os.path.join(self.temp_dir.name, 'specs.pickle')
+        self.write(cache_path, 'not a pickle')
+        registry = SpecRegistry(cache_path=cache_path)
+        self.assertEqual(registry.get(self.paths[0]).names, ['name', 'count'])
+
+if __name__ == '__main__':
+    unittest.main()
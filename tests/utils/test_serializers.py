@@ -0,0 +1,113 @@
+import json
+import unittest
+from datetime import date
+from decimal import Decimal
+from utils.decoder import compile_decoder, get_columns
+from utils.serializers import get_serializer, load_orjson
+
+COLUMNS = get_columns({
+    'name': {'width': '10', 'datatype': 'TEXT'},
+    'valid': {'width': '1', 'datatype': 'BOOLEAN'},
+    'count': {'width': '3', 'datatype': 'INTEGER'}
+})
+
+ROWS = [
+    {'name': 'Diabetes', 'valid': True, 'count': 1},
+    {'name': 'Asthma', 'valid': False, 'count': -14},
+    {'name': 'It\'s "ok"', 'valid': True, 'count': None},
+    {'name': 'Café\\', 'valid': False, 'count': 0}
+]
+
+class TestSerializers(unittest.TestCase):
+    def test_template_serializer(self):
+        output = get_serializer('template', COLUMNS).encode_chunk(ROWS[:3])
+        self.assertEqual(output, (
+            b'{"name": "Diabetes", "valid": true, "count": 1}\n'
+            b'{"name": "Asthma", "valid": false, "count": -14}\n'
+            b'{"name": "It\'s \\"ok\\"", "valid": true, "count": null}\n'
+        ))
+
+    def test_template_matches_json(self):
+        self.assertEqual(
+            get_serializer('template', COLUMNS).encode_chunk(ROWS),
+            get_serializer('json', COLUMNS).encode_chunk(ROWS)
+        )
+
+    def test_decimal_and_date_are_strings(self):
+        columns = get_columns({
+            'amount': {'width': '8', 'datatype': 'DECIMAL'},
+            'price': {'width': '7', 'datatype': 'S9(5)V99'},
+            'ratio': {'width': '6', 'datatype': 'FLOAT'},
+            'day': {'width': '8', 'datatype': 'DATE'}
+        })
+        rows = [
+            {'amount': Decimal('1234.50'), 'price': Decimal('-0.01'), 'ratio': 0.25, 'day': date(2021, 7, 6)},
+            {'amount': None, 'price': None, 'ratio': None, 'day': None}
+        ]
+        output = get_serializer('template', columns).encode_chunk(rows)
+        self.assertEqual(output.splitlines()[0],
+                         b'{"amount": "1234.50", "price": "-0.01", "ratio": 0.25, "day": "2021-07-06"}')
+        self.assertEqual(output, get_serializer('json', columns).encode_chunk(rows))
+        if load_orjson():
+            output = get_serializer('orjson', columns).encode_chunk(rows)
+            self.assertEqual(output.splitlines()[0],
+                             b'{"amount":"1234.50","price":"-0.01","ratio":0.25,"day":"2021-07-06"}')
+
+    def test_decimals_are_fixed_point(self):
+        # Small and zero Decimals print with exponents, e.g. 1E-7 and 0E-7, unless formatted as fixed-point
+        dict_specs = {'amount': {'width': '9', 'datatype': 'DECIMAL'}, 'rate': {'width': '8', 'datatype': 'V9(7)'}}
+        row = compile_decoder(dict_specs)('0.00000010000000')
+        self.assertEqual(row, {'amount': Decimal('1E-7'), 'rate': Decimal('0E-7')})
+
+        columns = get_columns(dict_specs)
+        expected = {'amount': '0.0000001', 'rate': '0.0000000'}
+        names = ['template', 'json', 'orjson'] if load_orjson() else ['template', 'json']
+        for name in names:
+            output = get_serializer(name, columns).encode_chunk([row])
+            self.assertEqual(json.loads(output), expected)
+
+    def test_template_escapes_column_names(self):
+        columns = get_columns({'a "{b}"': {'width': '1', 'datatype': 'BOOLEAN'}})
+        output = get_serializer('template', columns).encode_chunk([{'a "{b}"': True}])
+        self.assertEqual(json.loads(output), {'a "{b}"': True})
+
+    def test_output_is_valid_json(self):
+        for name in ['template', 'json', 'auto']:
+            output = get_serializer(name, COLUMNS).encode_chunk(ROWS)
+            self.assertEqual([json.loads(line) for line in output.splitlines()], ROWS)
+
+    @unittest.skipUnless(load_orjson(), 'orjson is not installed')
+    def test_orjson_serializer(self):
+        output = get_serializer('orjson', COLUMNS).encode_chunk(ROWS)
+        self.assertEqual(output.splitlines()[0], b'{"name":"Diabetes","valid":true,"count":1}')
+        self.assertEqual([json.loads(line) for line in output.splitlines()], ROWS)
+
+    @unittest.skipUnless(load_orjson(), 'orjson is not installed')
+    def test_orjson_serializer_wide_integers(self):
+        # orjson only writes 64-bit integers, wider INTEGER columns are written the same way without it
+        columns = get_columns({
+            'id': {'width': '22', 'datatype': 'INTEGER'},
+            'name': {'width': '5', 'datatype': 'TEXT'}
+        })
+        rows = [{'id': 1234567890123456789012, 'name': 'Café'}, {'id': None, 'name': ''}]
+        for name in ['orjson', 'auto']:
+            output = get_serializer(name, columns).encode_chunk(rows)
+            self.assertEqual(output, '{"id":1234567890123456789012,"name":"Café"}\n{"id":null,"name":""}\n'.encode())
+        output = get_serializer('template', columns).encode_chunk(rows)
+        self.assertEqual([json.loads(line) for line in output.splitlines()], rows)
+
+    def test_encode_columns(self):
+        columns = [[row[name] for row in ROWS] for name in ['name', 'valid', 'count']]
+        for name in ['template', 'json', 'auto']:
+            serializer = get_serializer(name, COLUMNS)
+            self.assertEqual(serializer.encode_columns(columns), serializer.encode_chunk(ROWS))
+
+    def test_empty_chunk(self):
+        self.assertEqual(get_serializer('template', COLUMNS).encode_chunk([]), b'')
+
+    def test_unknown_serializer(self):
+        with self.assertRaises(ValueError):
+            get_serializer('unknown', COLUMNS)
+
+if __name__ == '__main__':
+    unittest.main()
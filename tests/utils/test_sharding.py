@@ -0,0 +1,61 @@
+import os
+import unittest
+from tempfile import TemporaryDirectory
+from utils.sharding import concat_files, get_shard_ranges, open_data_file
+
+class TestSharding(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, 'data.txt')
+        self.lines = [f'line{i:03}\n' for i in range(100)]
+        with open(self.path, 'w') as f:
+            f.writelines(self.lines)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def read_ranges(self, ranges):
+        lines = []
+        for start, end in ranges:
+            with open_data_file(self.path, start, end) as f:
+                lines.extend(f)
+        return lines
+
+    def test_get_shard_ranges_cover_file_on_line_boundaries(self):
+        for shards in [1, 2, 3, 7, 16]:
+            ranges = get_shard_ranges(self.path, shards)
+            self.assertEqual(len(ranges), shards)
+            self.assertEqual(ranges[0][0], 0)
+            self.assertEqual(ranges[-1][1], os.path.getsize(self.path))
+            self.assertTrue(all(start % 8 == 0 for start, _ in ranges))
+            self.assertEqual(self.read_ranges(ranges), self.lines)
+
+    def test_get_shard_ranges_more_shards_than_lines(self):
+        ranges = get_shard_ranges(self.path, 1000)
+        self.assertEqual(len(ranges), 100)
+        self.assertEqual(self.read_ranges(ranges), self.lines)
+
+    def test_get_shard_ranges_empty_file(self):
+        open(self.path, 'w').close()
+        self.assertEqual(get_shard_ranges(self.path, 4), [(0, 0)])
+
+    def test_get_shard_ranges_missing_file(self):
+        with self.assertRaises(FileNotFoundError):
+            get_shard_ranges(os.path.join(self.temp_dir.name, 'missing.txt'), 2)
+
+    def test_concat_files(self):
+        paths = []
+        for index in range(3):
+            paths.append(os.path.join(self.temp_dir.name, f'part{index}'))
+            with open(paths[-1], 'w') as f:
+                f.write(f'{index}\n')
+
+        output_path = os.path.join(self.temp_dir.name, 'out')
+        concat_files(paths, output_path)
+
+        with open(output_path, 'r') as f:
+            self.assertEqual(f.read(), '0\n1\n2\n')
+        self.assertFalse(any(os.path.exists(path) for path in paths))
+
+if __name__ == '__main__':
+    unittest.main()
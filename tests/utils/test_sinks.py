@@ -0,0 +1,170 @@
+import importlib.util
+import os
+import sys
+import unittest
+from datetime import date
+from decimal import Decimal
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+from parameterized import parameterized
+from utils.decoder import get_columns
+from utils.serializers import get_serializer
+from utils.sinks import get_extension, merge_outputs, open_sink
+
+COLUMNS = get_columns({
+    'name': {'width': '10', 'datatype': 'TEXT'},
+    'valid': {'width': '1', 'datatype': 'BOOLEAN'},
+    'count': {'width': '3', 'datatype': 'INTEGER'}
+})
+
+ROWS = [
+    {'name': 'Diabetes', 'valid': True, 'count': 1},
+    {'name': 'Asthma', 'valid': False, 'count': None}
+]
+
+def read_table(output_format, path):
+    import pyarrow as pa
+    if output_format == 'parquet':
+        import pyarrow.parquet as pq
+        return pq.read_table(path)
+    with pa.memory_map(path) as source:
+        return pa.ipc.open_file(source).read_all()
+
+class TestSinks(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_get_extension(self):
+        self.assertEqual(get_extension('ndjson'), '.ndjson')
+        self.assertEqual(get_extension('parquet'), '.parquet')
+        with self.assertRaises(ValueError):
+            get_extension('csv')
+
+    def test_get_extension_compressed(self):
+        self.assertEqual(get_extension('ndjson', 'zstd'), '.ndjson.zst')
+        for output_format, compression in [('ndjson', 'bz2'), ('parquet', 'gzip')]:
+            with self.assertRaises(ValueError):
+                get_extension(output_format, compression)
+
+    def test_sink_discards_output_on_error(self):
+        path = os.path.join(self.temp_dir.name, 'out.ndjson')
+        with self.assertRaises(ValueError):
+            with open_sink('ndjson', path, COLUMNS, get_serializer('template', COLUMNS), buffer_size=0) as sink:
+                sink.write_rows(ROWS[:1])
+                raise ValueError('bad chunk')
+        self.assertEqual(os.listdir(self.temp_dir.name), [])
+
+    def test_ndjson_sink_compressed(self):
+        import gzip
+        path = os.path.join(self.temp_dir.name, 'out.ndjson.gz')
+        with open_sink('ndjson', path, COLUMNS, get_serializer('template', COLUMNS), 'gzip') as sink:
+            sink.write_rows(ROWS[:1])
+
+        with gzip.open(path, 'rt') as f:
+            self.assertEqual(f.read(), '{"name": "Diabetes", "valid": true, "count": 1}\n')
+
+    def test_ndjson_sink_missing_codec(self):
+        path = os.path.join(self.temp_dir.name, 'out.ndjson.zst')
+        with patch.dict(sys.modules, {'zstandard': None}):
+            with self.assertRaises(ImportError):
+                open_sink('ndjson', path, COLUMNS, get_serializer('template', COLUMNS), 'zstd')
+        self.assertEqual(os.listdir(self.temp_dir.name), [])
+
+    def test_ndjson_sink(self):
+        path = os.path.join(self.temp_dir.name, 'out.ndjson')
+        with open_sink('ndjson', path, COLUMNS, get_serializer('template', COLUMNS)) as sink:
+            sink.write_rows(ROWS[:1])
+            sink.write_columns([['Asthma'], [False], [None]])
+
+        with open(path, 'r') as f:
+            self.assertEqual(f.read(), (
+                '{"name": "Diabetes", "valid": true, "count": 1}\n'
+                '{"name": "Asthma", "valid": false, "count": null}\n'
+            ))
+
+    @parameterized.expand([('arrow',), ('feather',), ('parquet',)])
+    @unittest.skipUnless(importlib.util.find_spec('pyarrow'), 'pyarrow is not installed')
+    def test_columnar_sink(self, output_format):
+        import pyarrow as pa
+        path = os.path.join(self.temp_dir.name, f'out{get_extension(output_format)}')
+        with open_sink(output_format, path, COLUMNS, None) as sink:
+            sink.write_rows(ROWS[:1])
+            sink.write_columns([['Asthma'], [False], [None]])
+
+        table = read_table(output_format, path)
+        self.assertEqual(table.schema, pa.schema([('name', pa.string()), ('valid', pa.bool_()), ('count', pa.int64())]))
+        self.assertEqual(table.to_pylist(), ROWS)
+
+    @parameterized.expand([('arrow',), ('parquet',)])
+    @unittest.skipUnless(importlib.util.find_spec('pyarrow'), 'pyarrow is not installed')
+    def test_columnar_sink_datatypes(self, output_format):
+        import pyarrow as pa
+        columns = get_columns({
+            'amount': {'width': '8', 'datatype': 'DECIMAL'},
+            'price': {'width': '7', 'datatype': 'S9(5)V99'},
+            'ratio': {'width': '6', 'datatype': 'FLOAT'},
+            'day': {'width': '8', 'datatype': 'DATE'}
+        })
+        rows = [
+            {'amount': Decimal('1234.50'), 'price': Decimal('-0.01'), 'ratio': 0.25, 'day': date(2021, 7, 6)},
+            {'amount': None, 'price': None, 'ratio': None, 'day': None}
+        ]
+        path = os.path.join(self.temp_dir.name, f'out{get_extension(output_format)}')
+        with open_sink(output_format, path, columns, None) as sink:
+            sink.write_rows(rows)
+
+        table = read_table(output_format, path)
+        self.assertEqual(table.schema, pa.schema([
+            ('amount', pa.decimal128(15, 7)), ('price', pa.decimal128(7, 2)), ('ratio', pa.float64()),
+            ('day', pa.date32())
+        ]))
+        self.assertEqual(table.to_pylist(), rows)
+
+    @parameterized.expand([('arrow',), ('parquet',)])
+    @unittest.skipUnless(importlib.util.find_spec('pyarrow'), 'pyarrow is not installed')
+    def test_columnar_sink_wide_integers(self, output_format):
+        # INTEGER columns wider than int64 holds are decimals without a scale
+        import pyarrow as pa
+        columns = get_columns({'id': {'width': '22', 'datatype': 'INTEGER'}})
+        path = os.path.join(self.temp_dir.name, f'out{get_extension(output_format)}')
+        with open_sink(output_format, path, columns, None) as sink:
+            sink.write_columns([[1234567890123456789012, -123456789012345678901, None]])
+
+        table = read_table(output_format, path)
+        self.assertEqual(table.schema, pa.schema([('id', pa.decimal128(22, 0))]))
+        self.assertEqual(table.column('id').to_pylist(), [1234567890123456789012, -123456789012345678901, None])
+
+    @unittest.skipUnless(importlib.util.find_spec('pyarrow'), 'pyarrow is not installed')
+    def test_columnar_sink_too_wide(self):
+        columns = get_columns({'id': {'width': '80', 'datatype': 'INTEGER'}})
+        path = os.path.join(self.temp_dir.name, 'out.arrow')
+        with self.assertRaisesRegex(ValueError, "Column 'id' of width 80"):
+            open_sink('arrow', path, columns, None)
+        self.assertEqual(os.listdir(self.temp_dir.name), [])
+
+    @parameterized.expand([('ndjson',), ('arrow',), ('parquet',)])
+    def test_merge_outputs(self, output_format):
+        if output_format != 'ndjson' and not importlib.util.find_spec('pyarrow'):
+            self.skipTest('pyarrow is not installed')
+
+        part_paths = []
+        for index, row in enumerate(ROWS):
+            part_paths.append(os.path.join(self.temp_dir.name, f'part{index}'))
+            with open_sink(output_format, part_paths[-1], COLUMNS, get_serializer('template', COLUMNS)) as sink:
+                sink.write_rows([row])
+
+        path = os.path.join(self.temp_dir.name, 'out')
+        merge_outputs(output_format, part_paths, path)
+
+        self.assertFalse(any(os.path.exists(part_path) for part_path in part_paths))
+        if output_format == 'ndjson':
+            with open(path, 'r') as f:
+                self.assertEqual(len(f.readlines()), 2)
+        else:
+            self.assertEqual(read_table(output_format, path).to_pylist(), ROWS)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,9 @@
 import os
 import unittest
 from tempfile import TemporaryDirectory
-from utils.file_utils import get_dirs, get_files_in_dir, get_specs_dict, is_valid_spec
+from utils.file_utils import get_dirs, get_files_in_dir, get_specs_dict, index_data_files, is_valid_spec, iter_chunks, \
+    match_spec_name, scan_files
+from parameterized import parameterized
 
 class TestUtils(unittest.TestCase):
     def setUp(self):
@@ -106,6 +108,41 @@ class TestUtils(unittest.TestCase):
         self.assertEqual(get_files_in_dir(data_dir), ['test_data.txt'])
         self.assertEqual(get_files_in_dir(output_dir), ['test_output.txt'])
         
+    def test_scan_files(self):
+        os.makedirs(os.path.join(self.base_dir, 'subdir'))
+        for name in ['b.txt', 'a.txt']:
+            with open(os.path.join(self.base_dir, name), 'w') as f:
+                f.write('abc')
+
+        files = scan_files(self.base_dir)
+        self.assertEqual(list(files), ['a.txt', 'b.txt'])
+        self.assertEqual(files['a.txt'].st_size, 3)
+
+    def test_scan_files_raises_error_for_empty_directory(self):
+        with self.assertRaises(FileNotFoundError):
+            scan_files(self.base_dir)
+
+    @parameterized.expand([
+        ('testformat1_2021-07-06.txt', 'testformat1'),
+        ('testformat1.txt', 'testformat1'),
+        ('my_format_2021-07-06.txt', 'my_format'),
+        ('my_format_extra_2021-07-06.txt', 'my_format_extra'),
+        ('my_2021-07-06.txt', 'my'),
+        ('other_2021-07-06.txt', None),
+        ('_2021-07-06.txt', None),
+        ('testformat1_2021-07-06.txt.gz', 'testformat1'),
+        ('testformat1.txt.zst', 'testformat1'),
+    ])
+    def test_match_spec_name(self, data_file, expected):
+        spec_names = {'testformat1', 'my', 'my_format', 'my_format_extra'}
+        self.assertEqual(match_spec_name(data_file, spec_names), expected)
+
+    def test_index_data_files(self):
+        data_files = ['a_1.txt', 'b_c_1.txt', 'a_2.txt', 'd_1.txt']
+        index, orphans = index_data_files(data_files, {'a', 'b_c'})
+        self.assertEqual(index, {'a': ['a_1.txt', 'a_2.txt'], 'b_c': ['b_c_1.txt']})
+        self.assertEqual(orphans, ['d_1.txt'])
+
     def test_is_valid_spec_non_csv_file(self):
         # Case 1: The file is not a .csv file, and the function should return False
         [specs_dir, _, _] = get_dirs(self. base_dir)
@@ -170,5 +207,19 @@ class TestUtils(unittest.TestCase):
         with self.assertRaises(IndexError):
             get_specs_dict(test_file, specs_dir)
 
+    def test_iter_chunks(self):
+        # Case 1: Lines are grouped into chunks of at most chunk_size, the last one may be shorter
+        lines = (f'line {i}\n' for i in range(5))
+        self.assertEqual([len(chunk) for chunk in iter_chunks(lines, 2)], [2, 2, 1])
+
+    def test_iter_chunks_empty(self):
+        # Case 2: An empty iterable yields no chunks
+        self.assertEqual(list(iter_chunks([], 3)), [])
+
+    def test_iter_chunks_invalid_size(self):
+        # Case 3: A chunk size below 1 raises a ValueError
+        with self.assertRaises(ValueError):
+            list(iter_chunks(['line\n'], 0))
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,64 @@
+import os
+import unittest
+from tempfile import TemporaryDirectory
+from utils.watcher import DirectoryWatcher, scan_stats
+
+class TestWatcher(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.directory = self.temp_dir.name
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write(self, name, content):
+        with open(os.path.join(self.directory, name), 'w') as f:
+            f.write(content)
+
+    def test_scan_stats(self):
+        self.write('a.txt', 'abc')
+        os.makedirs(os.path.join(self.directory, 'subdir'))
+        stats = scan_stats(self.directory)
+        self.assertEqual(list(stats), ['a.txt'])
+        self.assertEqual(stats['a.txt'][0], 3)
+
+    def test_scan_stats_missing_directory(self):
+        self.assertEqual(scan_stats(os.path.join(self.directory, 'missing')), {})
+
+    def test_poll_reports_settled_files_once(self):
+        watcher = DirectoryWatcher(self.directory)
+        self.write('a.txt', 'abc')
+
+        # Reported once unchanged over two polls
+        self.assertEqual(watcher.poll(), ([], []))
+        changed, removed = watcher.poll()
+        self.assertEqual([name for name, _ in changed], ['a.txt'])
+        self.assertEqual(watcher.poll(), ([], []))
+
+    def test_poll_waits_for_growing_files(self):
+        watcher = DirectoryWatcher(self.directory)
+        self.write('a.txt', 'abc')
+        watcher.poll()
+        with open(os.path.join(self.directory, 'a.txt'), 'a') as f:
+            f.write('def')
+
+        self.assertEqual(watcher.poll(), ([], []))
+        changed, _ = watcher.poll()
+        self.assertEqual(changed[0][1][0], 6)
+
+    def test_poll_reports_modified_and_removed_files(self):
+        watcher = DirectoryWatcher(self.directory, full_scan_interval=0)
+        self.write('a.txt', 'abc')
+        watcher.poll()
+        watcher.poll()
+
+        self.write('a.txt', 'abcdef')
+        watcher.poll()
+        changed, _ = watcher.poll()
+        self.assertEqual([name for name, _ in changed], ['a.txt'])
+
+        os.remove(os.path.join(self.directory, 'a.txt'))
+        self.assertEqual(watcher.poll(), ([], ['a.txt']))
+
+if __name__ == '__main__':
+    unittest.main()
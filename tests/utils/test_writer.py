@@ -0,0 +1,102 @@
+import os
+import unittest
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+from utils.writer import AtomicWriter
+
+class PartialFile:
+    """
+    File whose writes take at most 3 bytes, like a raw file interrupted by a signal.
+    """
+
+    def __init__(self, f):
+        self.f = f
+        self.writes = 0
+
+    def write(self, b):
+        self.writes += 1
+        return self.f.write(bytes(b[:3]))
+
+    def fileno(self):
+        return self.f.fileno()
+
+    def close(self):
+        self.f.close()
+
+
+class TestAtomicWriter(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, 'out.ndjson')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def read(self):
+        with open(self.path, 'rb') as f:
+            return f.read()
+
+    def test_renames_once_closed(self):
+        writer = AtomicWriter(self.path, buffer_size=10)
+        writer.write(b'{"a": 1}\n')
+        self.assertFalse(os.path.exists(self.path))
+        self.assertEqual(writer.tell(), 9)
+
+        with patch('os.fsync', wraps=os.fsync) as mock_fsync:
+            writer.close()
+        self.assertEqual(self.read(), b'{"a": 1}\n')
+        self.assertEqual(os.listdir(self.temp_dir.name), ['out.ndjson'])
+        self.assertGreaterEqual(mock_fsync.call_count, 1)
+
+    def test_gathers_small_writes(self):
+        with AtomicWriter(self.path, buffer_size=100) as writer:
+            for _ in range(30):
+                writer.write(b'row\n')
+            # 120 bytes were written as one buffer of 100 or more, the rest is still buffered
+            self.assertEqual(os.path.getsize(writer.temp_path), 100)
+            self.assertEqual(writer.buffered, 20)
+        self.assertEqual(self.read(), b'row\n' * 30)
+
+    def test_writes_large_writes_through(self):
+        with AtomicWriter(self.path, buffer_size=10) as writer:
+            writer.write(memoryview(b'x' * 50))
+            self.assertEqual(writer.buffer, [])
+            self.assertEqual(os.path.getsize(writer.temp_path), 50)
+        self.assertEqual(self.read(), b'x' * 50)
+
+    def test_retries_partial_writes(self):
+        writer = AtomicWriter(self.path, buffer_size=0)
+        writer.f = PartialFile(writer.f)
+        writer.write(b'0123456789')
+        self.assertEqual(writer.f.writes, 4)
+        writer.close()
+        self.assertEqual(self.read(), b'0123456789')
+
+    def test_abort_keeps_previous_file(self):
+        with open(self.path, 'wb') as f:
+            f.write(b'previous\n')
+
+        with self.assertRaises(KeyError):
+            with AtomicWriter(self.path) as writer:
+                writer.write(b'partial')
+                raise KeyError('crash')
+
+        self.assertEqual(self.read(), b'previous\n')
+        self.assertEqual(os.listdir(self.temp_dir.name), ['out.ndjson'])
+
+    def test_failed_flush_discards_file(self):
+        writer = AtomicWriter(self.path)
+        writer.write(b'lost')
+        with patch('os.fsync', side_effect=OSError('disk full')):
+            with self.assertRaises(OSError):
+                writer.close()
+        self.assertEqual(os.listdir(self.temp_dir.name), [])
+
+    def test_unclosed_writer_discards_file(self):
+        writer = AtomicWriter(self.path)
+        writer.write(b'partial')
+        del writer
+        self.assertEqual(os.listdir(self.temp_dir.name), [])
+
+if __name__ == '__main__':
+    unittest.main()
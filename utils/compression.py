@@ -0,0 +1,285 @@
+import io
+import os
+
+# Blocks handed between the (de)compressing thread and the converting thread, and how many may wait
+BLOCK_SIZE = 1 << 20
+QUEUE_DEPTH = 4
+
+def get_codec_extension(codec):
+    """
+    Get the file extension of a compression codec.
+
+    Args:
+        codec (str): Name of the codec, one of CODECS, or None for no compression.
+
+    Returns:
+        str: Extension including the leading dot, empty without compression.
+
+    Raises:
+        ValueError: If no codec has that name.
+    """
+    if codec is None:
+        return ''
+    try:
+        return CODECS[codec]
+    except KeyError:
+        raise ValueError(f"Unknown compression {codec!r}, expected one of {', '.join(CODECS)}") from None
+
+def detect_codec(path):
+    """
+    Detect the compression codec of a file from its extension.
+
+    Args:
+        path (str): Path or name of the file.
+
+    Returns:
+        str: Name of the codec, or None if the file is not compressed.
+    """
+    extension = os.path.splitext(path)[1]
+    return next((codec for codec, codec_extension in CODECS.items() if codec_extension == extension), None)
+
+def strip_codec_extension(path):
+    """
+    Remove the compression extension of a file name, if any.
+
+    Args:
+        path (str): Path or name of the file, e.g. `testformat1_2021-07-06.txt.gz`.
+
+    Returns:
+        str: Path without the compression extension, e.g. `testformat1_2021-07-06.txt`.
+    """
+    return os.path.splitext(path)[0] if detect_codec(path) else path
+
+def load_codec_module(codec):
+    """
+    Import the package implementing a codec.
+
+    Args:
+        codec (str): Name of the codec, one of CODECS.
+
+    Returns:
+        module: The gzip, zstandard or lz4.frame module.
+
+    Raises:
+        ImportError: If the package is not installed.
+    """
+    if codec == 'gzip':
+        import gzip
+        return gzip
+
+    try:
+        if codec == 'zstd':
+            import zstandard
+            return zstandard
+        import lz4.frame
+        return lz4.frame
+    except ImportError as e:
+        package = 'zstandard' if codec == 'zstd' else 'lz4'
+        raise ImportError(f"{codec} compression requires the {package} package") from e
+
+def open_codec(path, codec, mode):
+    """
+    Open a compressed file as a binary file object, compressing or decompressing on the calling thread.
+
+    Args:
+        path (str): Path of the file, or a binary file object to read or write,
+            which is not closed with the returned file.
+        codec (str): Name of the codec, one of CODECS.
+        mode (str): 'rb' or 'wb'.
+
+    Returns:
+        file: Binary file object.
+    """
+    module = load_codec_module(codec)
+    if codec == 'gzip':
+        # Level 6 is gzip's own default, much faster to write than the module's 9
+        return module.open(path, mode, compresslevel=6)
+    if codec == 'lz4':
+        return module.open(path, mode)
+
+    owned = isinstance(path, str)
+    f = open(path, mode) if owned else path
+    # Sharded outputs are joined by concatenating frames, so read across frames
+    if mode == 'rb':
+        return module.ZstdDecompressor().stream_reader(f, read_across_frames=True, closefd=owned)
+    return module.ZstdCompressor().stream_writer(f, closefd=owned)
+
+def use_thread(threaded):
+    """
+    Decide whether to (de)compress in a background thread, which only pays off with a spare CPU.
+
+    Args:
+        threaded (bool): Explicit choice, or None to use a thread when there is more than one CPU.
+
+    Returns:
+        bool: Whether to use a thread.
+    """
+    return threaded if threaded is not None else (os.cpu_count() or 1) > 1
+
+def open_decompressed(path, codec=None, threaded=None):
+    """
+    Open a compressed data file for reading its decompressed bytes.
+
+    Args:
+        path (str): Path of the data file.
+        codec (str): Name of the codec, detected from the extension if None.
+        threaded (bool): Decompress in a background thread, a few blocks ahead
+            of the reader, so decompression overlaps with parsing. None, the
+            default, does so when there is more than one CPU.
+
+    Returns:
+        io.BufferedReader: Buffered binary file, iterating over `bytes` lines.
+    """
+    f = open_codec(path, codec or detect_codec(path), 'rb')
+    return io.BufferedReader(ThreadedReader(f) if use_thread(threaded) else f, BLOCK_SIZE)
+
+def open_compressed(path, codec, threaded=None):
+    """
+    Open a file for writing bytes compressed with a codec.
+
+    Args:
+        path (str): Path of the file to write, or a binary file object, which
+            is not closed with the returned file.
+        codec (str): Name of the codec, one of CODECS.
+        threaded (bool): Compress in a background thread, so compression
+            overlaps with encoding the next chunks. None, the default, does so
+            when there is more than one CPU.
+
+    Returns:
+        file: Binary file object; closing it waits for compression to finish.
+    """
+    f = open_codec(path, codec, 'wb')
+    return ThreadedWriter(f) if use_thread(threaded) else f
+
+
+class ThreadedReader(io.RawIOBase):
+    """
+    Raw binary reader reading blocks of a file object in a background thread.
+
+    The gzip, zstd and lz4 decompressors release the GIL, so the thread
+    decompresses the next blocks while the reader parses the current one.
+    Errors of the thread are raised by the next read.
+    """
+
+    def __init__(self, f, block_size=BLOCK_SIZE, depth=QUEUE_DEPTH):
+        import queue
+        import threading
+
+        self.f = f
+        self.block_size = block_size
+        self.blocks = queue.Queue(depth)
+        self.stopped = threading.Event()
+        self.pending = memoryview(b'')
+        self.eof = False
+        self.thread = threading.Thread(target=self.fill, daemon=True)
+        self.thread.start()
+
+    def fill(self):
+        try:
+            while not self.stopped.is_set():
+                block = self.f.read(self.block_size)
+                self.put(block)
+                if not block:
+                    return
+        except Exception as e:
+            self.put(e)
+
+    def put(self, item):
+        import queue
+
+        # Give up once the reader is closed, rather than block on a full queue forever
+        while not self.stopped.is_set():
+            try:
+                self.blocks.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if not self.pending:
+            if self.eof:
+                return 0
+            block = self.blocks.get()
+            if isinstance(block, Exception):
+                self.eof = True
+                raise block
+            if not block:
+                self.eof = True
+                return 0
+            self.pending = memoryview(block)
+
+        size = min(len(buffer), len(self.pending))
+        buffer[:size] = self.pending[:size]
+        self.pending = self.pending[size:]
+        return size
+
+    def close(self):
+        if not self.closed:
+            self.stopped.set()
+            self.thread.join()
+            self.f.close()
+        super().close()
+
+
+class ThreadedWriter(io.RawIOBase):
+    """
+    Raw binary writer handing blocks to a file object written in a background thread.
+
+    Writes return once the block is queued, so compression overlaps with
+    encoding the next chunks. An error of the thread is raised by the next
+    write, or when closing.
+    """
+
+    def __init__(self, f, depth=QUEUE_DEPTH):
+        import queue
+        import threading
+
+        self.f = f
+        self.blocks = queue.Queue(depth)
+        self.error = None
+        self.thread = threading.Thread(target=self.drain, daemon=True)
+        self.thread.start()
+
+    def drain(self):
+        while True:
+            block = self.blocks.get()
+            if block is None:
+                return
+            # Keep draining after an error so writers never block on a full queue
+            if self.error is None:
+                try:
+                    self.f.write(block)
+                except Exception as e:
+                    self.error = e
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        if self.error is not None:
+            raise self.error
+        self.blocks.put(bytes(b))
+        return len(b)
+
+    def close(self):
+        if not self.closed:
+            self.blocks.put(None)
+            self.thread.join()
+            try:
+                self.f.close()
+            finally:
+                super().close()
+            if self.error is not None:
+                raise self.error
+        super().close()
+
+
+# Compression codecs and the extension of the files they write
+CODECS = {
+    'gzip': '.gz',
+    'zstd': '.zst',
+    'lz4': '.lz4',
+}
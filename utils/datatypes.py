@@ -0,0 +1,318 @@
+# Encoding of text columns when decoding bytes lines, one byte per character
+ENCODING = 'latin-1'
+
+# ASCII characters str.strip() removes, which bytes.strip(), int() and float() keep, among them the separators 28-31
+BYTES_WHITESPACE = b' \t\n\r\x0b\x0c\x1c\x1d\x1e\x1f'
+
+# Kinds of values datatypes convert fields into, deciding how values are serialized, stored, written and compared
+KINDS = ['text', 'boolean', 'integer', 'float', 'decimal', 'date']
+
+# Widest INTEGER field whose digits always fit in an int64, the limit of NumPy, orjson and Arrow integers
+MAX_INTEGER_WIDTH = 18
+
+# DECIMAL fields, once stripped: fixed-width sources write digits with an optional point, never exponents
+DECIMAL_PATTERN = r'[+-]?[0-9]+(?:\.[0-9]+)?'
+
+# Fields remembered by parse_date; a drop spans few distinct dates, so nearly every field is a cache hit
+DATE_CACHE_SIZE = 100000
+
+# Fields converted by parse_date, `str` and `bytes` alike, shared by every decoder
+date_cache = {}
+
+def parse_date(field):
+    """
+    Convert a YYYYMMDD field to a date, remembering the result for the next identical field.
+
+    Args:
+        field (str): Field, as `str` or `bytes`, optionally padded with whitespace.
+
+    Returns:
+        datetime.date: The date, or None if the field is not a valid date.
+    """
+    from datetime import date
+
+    digits = field.strip(BYTES_WHITESPACE) if isinstance(field, bytes) else field.strip()
+    value = None
+    if len(digits) == 8 and digits.isdigit():
+        try:
+            value = date(int(digits[:4]), int(digits[4:6]), int(digits[6:]))
+        except ValueError:
+            pass
+    if len(date_cache) < DATE_CACHE_SIZE:
+        date_cache[field] = value
+    return value
+
+def convert_date(value):
+    try:
+        return date_cache[value]
+    except KeyError:
+        return parse_date(value)
+
+def convert_integer(value):
+    try:
+        return int(value)
+    except ValueError:
+        return None
+
+def convert_float(value):
+    try:
+        value = float(value)
+    except ValueError:
+        return None
+    # NaN and infinities have no JSON representation
+    return None if value - value else value
+
+def load_convert_decimal():
+    # decimal takes longer to import than this whole package, so only import it once DECIMAL is used
+    from decimal import Decimal
+
+    match_decimal = load_decimal_namespace()['match_decimal']
+
+    def convert_decimal(value):
+        # Decimal would also take exponents, NaN, infinities, underscores and non-ASCII digits
+        return Decimal(value) if match_decimal(value) else None
+
+    return convert_decimal
+
+def generate_text(start, end, variable, binary):
+    if binary:
+        return [], f'line[{start}:{end}].decode({ENCODING!r}).strip()'
+    return [], f'line[{start}:{end}].strip()'
+
+def generate_boolean(start, end, variable, binary):
+    if binary:
+        # One-byte slices are cached objects, so only wider fields need stripping
+        field = f'line[{start}:{end}]' if end - start == 1 else f'line[{start}:{end}].strip({BYTES_WHITESPACE!r})'
+        return [], f'{field} == b\'1\''
+    return [], f'line[{start}:{end}].strip() == \'1\''
+
+def generate_parse(statement, variable, check=None):
+    """
+    Generate statements running `statement`, setting `variable` to None if it raises ValueError or fails `check`.
+    """
+    statements = ['    try:', f'        {statement}', '    except ValueError:', f'        {variable} = None']
+    if check is not None:
+        statements += ['    else:', f'        if {check}:', f'            {variable} = None']
+    return statements
+
+def generate_stripped(start, end, binary):
+    # Strip bytes of the same ASCII characters as str, which int() and float() do not all skip
+    return f'line[{start}:{end}].strip({BYTES_WHITESPACE!r})' if binary else f'line[{start}:{end}].strip()'
+
+def generate_integer(start, end, variable, binary):
+    return generate_parse(f'{variable} = int({generate_stripped(start, end, binary)})', variable), variable
+
+def generate_float(start, end, variable, binary):
+    # NaN and infinities have no JSON representation
+    field = generate_stripped(start, end, binary)
+    return generate_parse(f'{variable} = float({field})', variable, check=f'{variable} - {variable}'), variable
+
+def generate_decimal(start, end, variable, binary):
+    _, field = generate_text(start, end, variable, binary)
+    statements = [
+        f'    {variable} = {field}',
+        f'    {variable} = Decimal({variable}) if match_decimal({variable}) else None',
+    ]
+    return statements, variable
+
+def generate_date(start, end, variable, binary):
+    statements = [
+        f'    {variable} = line[{start}:{end}]',
+        '    try:',
+        f'        {variable} = date_cache[{variable}]',
+        '    except KeyError:',
+        f'        {variable} = parse_date({variable})',
+    ]
+    return statements, variable
+
+def load_decimal_namespace():
+    import re
+    from decimal import Decimal
+    return {'Decimal': Decimal, 'match_decimal': re.compile(DECIMAL_PATTERN).fullmatch}
+
+def load_date_namespace():
+    return {'date_cache': date_cache, 'parse_date': parse_date}
+
+def parse_implied_scale(name):
+    """
+    Read the digits after the implied decimal point of a COBOL-style picture such as `V99`, `9(5)V99` or `S9(7)V9(3)`.
+
+    Args:
+        name (str): Lowercase datatype name.
+
+    Returns:
+        int: Number of digits after the implied point, or None if the name is not such a picture.
+    """
+    import re
+
+    match = re.fullmatch(r's?(?:9+|9\(\d+\))*v((?:9+|9\(\d+\))+)', name)
+    if match is None:
+        return None
+    return sum(int(group[2:-1]) if group.startswith('9(') else len(group)
+               for group in re.findall(r'9\(\d+\)|9+', match.group(1)))
+
+def make_implied_decimal(name, scale):
+    """
+    Build the datatype of integer fields with an implied decimal point, e.g. `0012345` read as `123.45` with `V99`.
+
+    Args:
+        name (str): Lowercase datatype name.
+        scale (int): Number of digits after the implied point.
+
+    Returns:
+        Datatype: Datatype converting fields into Decimals with exactly `scale` decimal places.
+    """
+    from decimal import Decimal
+
+    unit = f'unit_{scale}'
+    unit_value = Decimal(1).scaleb(-scale)
+
+    def convert(value):
+        value = convert_integer(value)
+        return None if value is None else Decimal(value) * unit_value
+
+    def generate(start, end, variable, binary):
+        statements, _ = generate_integer(start, end, variable, binary)
+        # Multiplying by a Decimal unit is about twice as fast as Decimal.scaleb
+        statements += ['    else:', f'        {variable} = Decimal({variable}) * {unit}']
+        return statements, variable
+
+    def load_namespace():
+        return {'Decimal': Decimal, unit: unit_value}
+
+    return Datatype(name, 'decimal', convert, generate, load_namespace, scale)
+
+def get_datatype(name):
+    """
+    Look up the datatype of a spec column.
+
+    Besides the registered datatypes, COBOL-style pictures with an implied
+    decimal point, such as `V99` or `S9(5)V99`, are implied decimals. Other
+    names are text, so fields of unknown datatypes are kept as strings.
+
+    Args:
+        name (str): Datatype as written in the spec, in any case.
+
+    Returns:
+        Datatype: The datatype.
+    """
+    name = name.lower()
+    datatype = DATATYPES.get(name)
+    if datatype is None:
+        datatype = unregistered_datatypes.get(name)
+    if datatype is None:
+        scale = parse_implied_scale(name)
+        datatype = make_implied_decimal(name, scale) if scale is not None else DATATYPES['text']
+        unregistered_datatypes[name] = datatype
+    return datatype
+
+def register_datatype(datatype):
+    """
+    Make a datatype available to specs, replacing any datatype of the same name.
+
+    Worker processes only know the datatypes registered when they start, so
+    register datatypes when importing a module rather than at run time.
+
+    Args:
+        datatype (Datatype): Datatype to register.
+    """
+    DATATYPES[datatype.name] = datatype
+
+
+class Datatype:
+    """
+    A datatype of spec columns: how fields are converted into values, and what kind of values they are.
+
+    Decoders inline the statements generated by `generate` for every column,
+    so built-in datatypes convert fields without a function call per value.
+    Datatypes without `generate` call `convert` on every field instead.
+
+    Args:
+        name (str): Lowercase name of the datatype in specs.
+        kind (str): Kind of the values, one of KINDS, deciding how they are
+            serialized, stored in RecordBatches, typed in columnar outputs and
+            compared in queries.
+        convert (callable): Function converting a field, as `str` without
+            surrounding whitespace, into a value of that kind or None.
+        generate (callable): Function generating the conversion of a field, see generate_source.
+        load_namespace (callable): Function returning the names the generated statements use.
+        scale (int): Digits after the decimal point of decimal values, None if it varies.
+        load_convert (callable): Function returning `convert`, called on first
+            use, for converters needing modules that are slow to import.
+    """
+
+    def __init__(self, name, kind, convert=None, generate=None, load_namespace=None, scale=None, load_convert=None):
+        self.name = name
+        self.kind = kind
+        self.converter = convert
+        self.generate = generate
+        self.load_namespace = load_namespace
+        self.scale = scale
+        self.load_convert = load_convert
+        self.convert_name = 'convert_' + ''.join(c if c.isalnum() else '_' for c in name)
+
+    @property
+    def convert(self):
+        """
+        Function converting a field, as `str` without surrounding whitespace, into a value.
+        """
+        if self.converter is None:
+            self.converter = self.load_convert()
+        return self.converter
+
+    @property
+    def nullable(self):
+        """
+        Whether values can be None, for fields that do not convert.
+        """
+        return self.kind not in ['text', 'boolean']
+
+    def generate_source(self, start, end, variable, binary=False):
+        """
+        Generate the conversion of the field at `line[start:end]`.
+
+        Args:
+            start (int): Offset of the field in the line.
+            end (int): Offset of the end of the field.
+            variable (str): Name of a variable the statements may set.
+            binary (bool): Convert a `bytes` line instead of a `str` line.
+
+        Returns:
+            tuple: Lines of statements, indented for a function body, and the
+                expression of the value once they have run.
+        """
+        if self.generate is not None:
+            return self.generate(start, end, variable, binary)
+        _, field = generate_text(start, end, variable, binary)
+        return [], f'{self.convert_name}({field})'
+
+    def get_namespace(self):
+        """
+        Get the names the generated conversion uses.
+
+        Returns:
+            dict: Dictionary mapping names to objects.
+        """
+        if self.load_namespace is not None:
+            return self.load_namespace()
+        if self.generate is None:
+            return {self.convert_name: self.convert}
+        return {}
+
+    def __repr__(self):
+        return f'Datatype({self.name!r}, kind={self.kind!r})'
+
+
+# Datatypes of spec columns by lowercase name; DATE fields are YYYYMMDD
+DATATYPES = {
+    'text': Datatype('text', 'text', str, generate_text),
+    'boolean': Datatype('boolean', 'boolean', lambda value: value == '1', generate_boolean),
+    'integer': Datatype('integer', 'integer', convert_integer, generate_integer),
+    'float': Datatype('float', 'float', convert_float, generate_float),
+    'decimal': Datatype('decimal', 'decimal', None, generate_decimal, load_decimal_namespace,
+                        load_convert=load_convert_decimal),
+    'date': Datatype('date', 'date', convert_date, generate_date, load_date_namespace),
+}
+
+# Datatypes get_datatype resolved names that are not registered to, implied decimals or text
+unregistered_datatypes = {}
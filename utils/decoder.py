@@ -0,0 +1,208 @@
+from utils.datatypes import get_datatype
+
+def get_columns(dict_specs):
+    """
+    Resolve column specifications into absolute slice offsets.
+
+    Args:
+        dict_specs (dict): Dictionary containing column specifications.
+
+    Returns:
+        list: List of (column name, start, end, datatype) tuples, in spec order.
+    """
+    columns = []
+    start = 0
+
+    for column_name, column_specs in dict_specs.items():
+        end = start + int(column_specs['width'])
+        columns.append((column_name, start, end, column_specs['datatype'].lower()))
+        start = end
+
+    return columns
+
+def generate_value_source(column, variable, binary=False):
+    """
+    Generate the statements and expression converting one column of a line, as its datatype does.
+
+    Args:
+        column (tuple): Column as returned by get_columns.
+        variable (str): Name of a variable the statements may set.
+        binary (bool): Convert a `bytes` line instead of a `str` line.
+
+    Returns:
+        tuple: Lines of statements to run first, and the expression of the value.
+    """
+    _, start, end, datatype = column
+    return get_datatype(datatype).generate_source(start, end, variable, binary)
+
+def generate_condition_source(variable, datatype, operator, value, constant):
+    """
+    Generate the expression testing a predicate on a converted value.
+
+    Null values only match `== None`, like SQL comparisons never match NULL.
+
+    Args:
+        variable (str): Name of the variable holding the value.
+        datatype (str): Lowercase datatype of the column.
+        operator (str): Comparison operator.
+        value (object): Typed value to compare with.
+        constant (str): Name the value is bound to in the decoder's namespace,
+            used for values without a literal such as Decimals and dates.
+
+    Returns:
+        str: Python expression.
+    """
+    if value is None:
+        return f'{variable} is None' if operator == '==' else f'{variable} is not None'
+    literal = repr(value) if isinstance(value, (bool, int, str)) else constant
+    if get_datatype(datatype).nullable:
+        return f'{variable} is not None and {variable} {operator} {literal}'
+    return f'{variable} {operator} {literal}'
+
+def generate_decoder_source(columns, binary=False, compact=False, predicates=()):
+    """
+    Generate the source of a decode function specialised to the given columns.
+
+    Every column becomes a literal slice of the line followed by the conversion
+    for its datatype, so the generated function does no datatype dispatch.
+    Columns of the predicates are converted and tested first, so a rejected
+    line returns before any other column is sliced.
+
+    Args:
+        columns (list): Columns to output, as returned by get_columns.
+        binary (bool): Generate a function decoding `bytes` lines instead of `str`.
+            Integers are parsed straight from the bytes slice, one-byte booleans
+            are compared against the cached single-byte object and only text
+            columns are decoded to `str`.
+        compact (bool): Return a `Record`, a tuple of the values sharing its
+            column names with every other row, instead of a dictionary.
+        predicates (list): (column, operator, value) tuples every decoded line
+            meets, as returned by Query.resolve; other lines decode to None.
+
+    Returns:
+        str: Python source defining a `decode(line)` function, expecting the
+            names of get_decoder_namespace in its namespace.
+    """
+    body = []
+    values = []
+    tested = {}
+
+    for index, (column, operator, value) in enumerate(predicates):
+        if column not in tested:
+            variable = f'p{len(tested)}'
+            statements, expression = generate_value_source(column, variable, binary)
+            body.extend(statements)
+            if expression != variable:
+                body.append(f'    {variable} = {expression}')
+            tested[column] = variable
+        condition = generate_condition_source(tested[column], column[3], operator, value, f'q{index}')
+        body.append(f'    if not ({condition}):')
+        body.append('        return None')
+
+    for index, column in enumerate(columns):
+        if column in tested:
+            values.append(tested[column])
+        else:
+            statements, expression = generate_value_source(column, f'v{index}', binary)
+            body.extend(statements)
+            values.append(expression)
+
+    if compact:
+        body.append('    return Record((' + ''.join(f'{value}, ' for value in values) + '))')
+    else:
+        fields = [f'{column_name!r}: {value}' for (column_name, *_), value in zip(columns, values)]
+        body.append('    return {' + ', '.join(fields) + '}')
+    return 'def decode(line):\n' + '\n'.join(body) + '\n'
+
+def get_decoder_namespace(columns, predicates=(), record_type=None):
+    """
+    Gather the names a generated decode function uses.
+
+    Args:
+        columns (list): Columns to output, as returned by get_columns.
+        predicates (list): Predicates, as returned by Query.resolve.
+        record_type (type): Record type of compact decoders.
+
+    Returns:
+        dict: Names used by the conversions of the datatypes, the values of
+            the predicates as `q<index>`, and `Record`.
+    """
+    namespace = {'Record': record_type}
+    for _, _, _, datatype in columns + [column for column, _, _ in predicates]:
+        namespace.update(get_datatype(datatype).get_namespace())
+    for index, (_, _, value) in enumerate(predicates):
+        namespace[f'q{index}'] = value
+    return namespace
+
+def compile_decoder(dict_specs, binary=False, compact=False, query=None):
+    """
+    Compile column specifications into a line decoder.
+
+    Args:
+        dict_specs (dict): Dictionary containing column specifications.
+        binary (bool): Decode `bytes` lines instead of `str` lines.
+        compact (bool): Decode lines into Records instead of dictionaries.
+        query (Query): Columns to keep and conditions lines must meet, None keeps everything.
+
+    Returns:
+        Decoder: Decoder producing the same output as get_output_line, or the
+            same values as a Record.
+
+    Raises:
+        ValueError: If the query does not suit the spec.
+    """
+    return Decoder(dict_specs, binary, compact, query)
+
+
+class Decoder:
+    """
+    Precompiled line parser for a single spec.
+
+    The spec is interpreted once: widths are resolved to slice offsets and a
+    function specialised to the spec is generated and compiled, so decoding a
+    line does no per-column spec lookups. Compact decoders return instances of
+    `record_type`, generated for the columns.
+
+    With a query, `columns` only holds the selected columns, and lines failing
+    its conditions decode to None and are left out of decoded chunks.
+    """
+
+    def __init__(self, dict_specs, binary=False, compact=False, query=None):
+        self.dict_specs = dict_specs
+        self.binary = binary
+        self.compact = compact
+        self.query = query
+        self.columns = get_columns(dict_specs)
+        self.predicates = []
+        if query is not None:
+            self.columns, self.predicates = query.resolve(self.columns)
+        self.source = generate_decoder_source(self.columns, binary, compact, self.predicates)
+        self.record_type = None
+        if compact:
+            from utils.records import make_record_type
+            self.record_type = make_record_type(self.columns)
+
+        namespace = get_decoder_namespace(self.columns, self.predicates, self.record_type)
+        exec(compile(self.source, '<decoder>', 'exec'), namespace)
+        self.decode = namespace['decode']
+
+    def __call__(self, line):
+        return self.decode(line)
+
+    def decode_chunk(self, lines):
+        """
+        Decode a chunk of lines.
+
+        Args:
+            lines (list): Lines to decode.
+
+        Returns:
+            list: One dictionary, or Record, per line meeting the conditions of the query.
+        """
+        if self.predicates:
+            return [row for row in map(self.decode, lines) if row is not None]
+        return list(map(self.decode, lines))
+
+    def __reduce__(self):
+        # Generated functions cannot be pickled, so recompile from the spec
+        return (Decoder, (self.dict_specs, self.binary, self.compact, self.query))
@@ -0,0 +1,79 @@
+from utils.decoder import compile_decoder
+from utils.mmap_reader import open_mmap_file
+from utils.sharding import open_data_file
+
+def get_engine(name):
+    """
+    Look up a parsing engine by name.
+
+    Args:
+        name (str): Name of the engine, one of ENGINES.
+
+    Returns:
+        Engine: The engine.
+
+    Raises:
+        ValueError: If no engine has that name.
+    """
+    try:
+        return ENGINES[name]
+    except KeyError:
+        raise ValueError(f"Unknown engine {name!r}, expected one of {', '.join(ENGINES)}") from None
+
+
+def compile_binary_decoder(dict_specs, query=None):
+    """
+    Compile column specifications into a decoder for `bytes` lines.
+    """
+    return compile_decoder(dict_specs, binary=True, query=query)
+
+def compile_numpy_decoder(dict_specs, query=None):
+    """
+    Compile column specifications into a NumPy chunk decoder, importing NumPy on first use.
+
+    Raises:
+        ImportError: If NumPy is not installed.
+    """
+    try:
+        from utils.numpy_decoder import compile_numpy_decoder
+    except ImportError as e:
+        raise ImportError("The 'numpy' engine requires the numpy package") from e
+    return compile_numpy_decoder(dict_specs, query)
+
+
+class Engine:
+    """
+    A way of reading data files paired with decoders for the lines it yields.
+
+    Args:
+        open_lines (callable): Function opening a (path, start, end) byte range of
+            a data file as a context manager iterating over its lines.
+        compile_specs (callable): Function compiling column specifications, and
+            an optional `query` keyword argument, into a decoder for those lines.
+    """
+
+    def __init__(self, open_lines, compile_specs):
+        self.open_lines = open_lines
+        self.compile_specs = compile_specs
+
+    def compile(self, dict_specs, query=None):
+        """
+        Compile column specifications into a decoder for this engine's lines,
+        keeping only the columns and lines a query selects, if any.
+        """
+        return self.compile_specs(dict_specs, query=query)
+
+    def open(self, path, start=0, end=None):
+        """
+        Open a byte range of a data file as an iterable of lines.
+        """
+        return self.open_lines(path, start, end)
+
+
+# Text-mode reading decoding every line, memory-mapped reading decoding only text fields,
+# and memory-mapped reading converting whole chunks column by column with NumPy
+ENGINES = {
+    'text': Engine(open_data_file, compile_decoder),
+    'mmap': Engine(open_mmap_file, compile_binary_decoder),
+    'numpy': Engine(open_mmap_file, compile_numpy_decoder),
+}
@@ -1,4 +1,12 @@
 import os
+from itertools import islice
+from utils.compression import strip_codec_extension
+
+# First line of every spec file
+SPEC_HEADER = 'column name,width,datatype'
+
+# Number of lines converted and written per batch
+DEFAULT_CHUNK_SIZE = 10000
 
 def get_dirs(base_dir):
     """
@@ -39,6 +47,89 @@ def get_files_in_dir(directory):
         raise FileNotFoundError(f"No files found in the {directory} folder")
     return files
 
+def scan_files(directory):
+    """
+    Scan a directory once for its regular files, keeping the stat information of each.
+
+    Args:
+        directory (str): Directory path.
+
+    Returns:
+        dict: Dictionary mapping file names, in sorted order, to their os.stat_result.
+
+    Raises:
+        FileNotFoundError: If no files are found in the directory.
+    """
+    with os.scandir(directory) as entries:
+        files = {entry.name: entry.stat() for entry in entries if entry.is_file()}
+    if len(files) == 0:
+        raise FileNotFoundError(f"No files found in the {directory} folder")
+    return {name: files[name] for name in sorted(files)}
+
+def get_stem(data_file):
+    """
+    Get the name of a data file without its extension, nor its compression extension.
+
+    Args:
+        data_file (str): File name of the data file, e.g. `testformat1_2021-07-06.txt.gz`.
+
+    Returns:
+        str: File name without extensions, e.g. `testformat1_2021-07-06`.
+    """
+    return os.path.splitext(strip_codec_extension(data_file))[0]
+
+def match_spec_name(data_file, spec_names):
+    """
+    Find the spec of a data file named `<spec name>_<anything>.<ext>` or `<spec name>.<ext>`.
+
+    A compression extension, e.g. `.txt.gz`, is ignored.
+
+    Spec names may contain underscores themselves; the longest spec name
+    followed by an underscore wins, so `my_format_2021-07-06.txt` matches the
+    spec `my_format` rather than `my`.
+
+    Args:
+        data_file (str): File name of the data file.
+        spec_names (set): Spec names, without extension; any container supporting `in` works.
+
+    Returns:
+        str: Name of the matching spec, or None if there is none.
+    """
+    stem = get_stem(data_file)
+    if stem in spec_names:
+        return stem
+
+    index = stem.rfind('_')
+    while index > 0:
+        if stem[:index] in spec_names:
+            return stem[:index]
+        index = stem.rfind('_', 0, index)
+    return None
+
+def index_data_files(data_files, spec_names):
+    """
+    Group data files by spec in a single pass.
+
+    Args:
+        data_files (iterable): File names of the data files.
+        spec_names (set): Spec names, without extension.
+
+    Returns:
+        tuple: Dictionary mapping spec names to their data files, in input
+            order, and the list of data files matching no spec.
+    """
+    index = {}
+    orphans = []
+
+    for data_file in data_files:
+        spec_name = match_spec_name(data_file, spec_names)
+        if spec_name is None:
+            orphans.append(data_file)
+        else:
+            index.setdefault(spec_name, []).append(data_file)
+
+    return index, orphans
+
 def is_valid_spec(spec_file, specs):
     """
     Validate if a spec file is a valid CSV specification.
@@ -58,8 +149,8 @@ def is_valid_spec(spec_file, specs):
     # Validate first line format
     with open(os.path.join(specs, spec_file), 'r') as f:
         first_line = f.readline().strip()
-        if first_line != 'column name,width,datatype':
-            print(f"Skipping {spec_file} because the first line is not 'column name,width,datatype'")
+        if first_line != SPEC_HEADER:
+            print(f"Skipping {spec_file} because the first line is not '{SPEC_HEADER}'")
             return False
     
     return True
@@ -75,14 +166,53 @@ def get_specs_dict(spec_file, specs):
     Returns:
         dict: Dictionary containing column specifications.
     """
-    dict_specs = {}
-    
     with open(os.path.join(specs, spec_file), 'r') as f:
-        for line in f.readlines()[1:]:
-            columns = line.strip().split(',')
-            dict_specs[columns[0]] = {
-                'width': columns[1],
-                'datatype': columns[2]
-            }
-
-    return dict_specs
\ No newline at end of file
+        return parse_specs(f.readlines()[1:])
+
+def parse_specs(lines):
+    """
+    Parse the lines of a spec following its header into a dictionary.
+
+    Args:
+        lines (iterable): Lines formatted as `column name,width,datatype`.
+
+    Returns:
+        dict: Dictionary containing column specifications.
+
+    Raises:
+        IndexError: If a line has fewer than three fields.
+    """
+    dict_specs = {}
+
+    for line in lines:
+        columns = line.strip().split(',')
+        dict_specs[columns[0]] = {
+            'width': columns[1],
+            'datatype': columns[2]
+        }
+
+    return dict_specs
+
+def iter_chunks(lines, chunk_size):
+    """
+    Lazily group an iterable of lines into lists of bounded size.
+
+    Args:
+        lines (iterable): Iterable of lines, e.g. an open file.
+        chunk_size (int): Maximum number of lines per chunk.
+
+    Yields:
+        list: The next chunk of at most `chunk_size` lines.
+
+    Raises:
+        ValueError: If chunk_size is less than 1.
+    """
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size must be at least 1, got {chunk_size}")
+
+    lines = iter(lines)
+    while True:
+        chunk = list(islice(lines, chunk_size))
+        if not chunk:
+            return
+        yield chunk
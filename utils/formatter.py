@@ -0,0 +1,427 @@
+import os
+import time
+from utils.datatypes import get_datatype
+from utils.decoder import compile_decoder, get_columns
+from utils.engines import get_engine
+from utils.file_utils import DEFAULT_CHUNK_SIZE, SPEC_HEADER, iter_chunks, parse_specs
+from utils.serializers import get_serializer
+from utils.sinks import open_sink
+from utils.writer import DEFAULT_BUFFER_SIZE
+
+def process_file(decoder, serializer, data_path, output_path, chunk_size=DEFAULT_CHUNK_SIZE, start=0, end=None,
+                 engine='text', output_format='ndjson', metrics=None, compression=None,
+                 buffer_size=DEFAULT_BUFFER_SIZE):
+    """
+    Stream a single data file through a decoder and write output to JSON lines or a columnar format.
+
+    Lines are read lazily and converted in chunks of at most `chunk_size` lines,
+    so memory use does not grow with the size of the data file. Output is
+    gathered into writes of `buffer_size` bytes to a temporary file, which is
+    renamed to `output_path` once complete; if processing fails, no output
+    file is left behind.
+
+    Args:
+        decoder (Decoder): Decoder compiled by `engine` for the data file's spec.
+        serializer (Serializer): Serializer built for the data file's spec, used for NDJSON output.
+        data_path (str): Path of the data file to process.
+        output_path (str): Path of the output file to write.
+        chunk_size (int): Maximum number of lines held in memory at once.
+        start (int): Byte offset of the first line to process.
+        end (int): Byte offset where processing stops, None processes to the end of the file.
+        engine (str): Name of the engine reading the data file.
+        output_format (str): Name of the output format, one of OUTPUT_FORMATS.
+        metrics (Metrics): Metrics to record stage timings, byte counts and
+            conversion failures in, None processes the file without measuring it.
+        compression (str): Name of the codec compressing NDJSON output, one of CODECS, or None.
+        buffer_size (int): Bytes of output gathered before each write to the output file.
+
+    Returns:
+        int: Number of rows written, the lines meeting the conditions of the decoder's query.
+    """
+    rows = 0
+
+    # Column-oriented decoders hand whole columns to the sink without building rows
+    columnar = hasattr(decoder, 'decode_columns') and bool(decoder.columns)
+
+    with get_engine(engine).open(data_path, start, end) as f:
+        with open_sink(output_format, output_path, decoder.columns, serializer, compression, buffer_size) as sink:
+            if metrics is not None:
+                rows = process_chunks_with_metrics(decoder, sink, iter_chunks(f, chunk_size), columnar, metrics,
+                                                   output_path)
+            else:
+                for chunk in iter_chunks(f, chunk_size):
+                    if columnar:
+                        columns = list(decoder.decode_columns(chunk).values())
+                        sink.write_columns(columns)
+                        rows += len(columns[0])
+                    else:
+                        decoded = decoder.decode_chunk(chunk)
+                        sink.write_rows(decoded)
+                        rows += len(decoded)
+
+    if metrics is not None:
+        metrics.rows += rows
+        metrics.bytes_in += (os.path.getsize(data_path) if end is None else end) - start
+        metrics.bytes_out += os.path.getsize(output_path)
+
+    return rows
+
+def process_chunks_with_metrics(decoder, sink, chunks, columnar, metrics, output_path):
+    """
+    Convert and write chunks like process_file does, timing each stage and counting conversion failures.
+
+    Values of nullable datatypes, such as INTEGER or DATE, that are None after
+    decoding are counted as conversion failures of their column. When the metrics have a profile directory, one
+    chunk out of `profile_every` is profiled and the stats are written next to
+    the other output files' stats, named after the output file.
+
+    Args:
+        decoder (Decoder): Decoder compiled for the data file's spec.
+        sink (Sink): Open output sink.
+        chunks (iterator): Chunks of lines.
+        columnar (bool): Whether to decode and write columns rather than rows.
+        metrics (Metrics): Metrics to record into.
+        output_path (str): Path of the output file, naming the stats file.
+
+    Returns:
+        int: Number of rows written.
+    """
+    clock = time.perf_counter
+    stages = metrics.stages
+    checked_columns = [
+        column_name for column_name, _, _, datatype in decoder.columns if get_datatype(datatype).nullable
+    ]
+    profiler = None
+    if metrics.profile_dir:
+        import cProfile
+        profiler = cProfile.Profile()
+    rows = 0
+    index = 0
+
+    while True:
+        started = clock()
+        chunk = next(chunks, None)
+        stages['read'] += clock() - started
+        if chunk is None:
+            break
+
+        profiling = profiler is not None and index % metrics.profile_every == 0
+        if profiling:
+            profiler.enable()
+        started = clock()
+
+        if columnar:
+            decoded = decoder.decode_columns(chunk)
+            decoded_at = clock()
+            payload = sink.encode_columns(list(decoded.values()))
+        else:
+            decoded = decoder.decode_chunk(chunk)
+            decoded_at = clock()
+            payload = sink.encode_rows(decoded)
+        encoded_at = clock()
+        sink.write(payload)
+        written = clock()
+
+        if profiling:
+            profiler.disable()
+
+        stages['decode'] += decoded_at - started
+        stages['encode'] += encoded_at - decoded_at
+        stages['write'] += written - encoded_at
+
+        for column_name in checked_columns:
+            if columnar:
+                metrics.add_failures(column_name, decoded[column_name].count(None))
+            else:
+                metrics.add_failures(column_name, sum(1 for row in decoded if row[column_name] is None))
+
+        rows += len(next(iter(decoded.values()))) if columnar else len(decoded)
+        index += 1
+
+    if profiler is not None:
+        os.makedirs(metrics.profile_dir, exist_ok=True)
+        profiler.dump_stats(os.path.join(metrics.profile_dir, f'{os.path.basename(output_path)}.pstats'))
+
+    return rows
+
+
+class Spec:
+    """
+    Column layout of a fixed-width data format.
+
+    Args:
+        dict_specs (dict): Dictionary containing column specifications, as returned by get_specs_dict.
+        name (str): Name of the format, e.g. the spec file name without extension.
+
+    Raises:
+        ValueError: If a column width is not an integer.
+    """
+
+    def __init__(self, dict_specs, name=None):
+        self.dict_specs = dict_specs
+        self.name = name
+        self.columns = get_columns(dict_specs)
+
+    @classmethod
+    def from_lines(cls, lines, name=None):
+        """
+        Parse a spec from its lines, header included.
+
+        Args:
+            lines (iterable): Lines of the spec, e.g. an open file.
+            name (str): Name of the format.
+
+        Returns:
+            Spec: The parsed spec.
+
+        Raises:
+            ValueError: If the header is not `column name,width,datatype` or a
+                line does not have a name, an integer width and a datatype.
+        """
+        lines = iter(lines)
+        if next(lines, '').strip() != SPEC_HEADER:
+            raise ValueError(f"the first line is not '{SPEC_HEADER}'")
+
+        try:
+            dict_specs = parse_specs(line for line in lines if line.strip())
+        except IndexError:
+            raise ValueError(f"a line is not formatted as '{SPEC_HEADER}'") from None
+
+        try:
+            return cls(dict_specs, name)
+        except ValueError:
+            raise ValueError("a column width is not an integer") from None
+
+    @classmethod
+    def from_string(cls, text, name=None):
+        """
+        Parse a spec from its text, header included.
+
+        Args:
+            text (str): Content of a spec file.
+            name (str): Name of the format.
+
+        Returns:
+            Spec: The parsed spec.
+        """
+        return cls.from_lines(text.splitlines(), name)
+
+    @classmethod
+    def from_path(cls, path):
+        """
+        Read a spec file, named after the file without its extension.
+
+        Args:
+            path (str): Path of the spec file.
+
+        Returns:
+            Spec: The parsed spec.
+        """
+        with open(path, 'r') as f:
+            return cls.from_lines(f, os.path.splitext(os.path.basename(path))[0])
+
+    @property
+    def names(self):
+        return [column_name for column_name, *_ in self.columns]
+
+    def __repr__(self):
+        return f'Spec(name={self.name!r}, columns={self.names!r})'
+
+
+class Formatter:
+    """
+    Convert fixed-width data of one spec into records, NDJSON or output files.
+
+    Decoders and serializers are compiled on first use, and the optional
+    packages behind some engines, serializers and output formats (NumPy,
+    orjson, pyarrow) are only imported when those are first used.
+
+    Args:
+        spec (Spec): Spec of the data.
+        engine (str): Engine reading data files in parse_path and write, one of ENGINES.
+        serializer (str): Serializer of dumps and NDJSON output, one of SERIALIZERS.
+        chunk_size (int): Maximum number of lines held in memory at once.
+        query (Query): Columns to keep and conditions lines must meet, applied
+            by every decoder, None keeps everything.
+
+    Raises:
+        ValueError: If no engine has that name, or the query does not suit the spec.
+    """
+
+    def __init__(self, spec, engine='text', serializer='template', chunk_size=DEFAULT_CHUNK_SIZE, query=None):
+        self.spec = spec
+        self.engine = engine
+        self.serializer = serializer
+        self.chunk_size = chunk_size
+        self.query = query
+        self.columns = query.resolve(spec.columns)[0] if query is not None else spec.columns
+        self.compiled = {}
+        get_engine(engine)
+
+    def get_line_decoder(self):
+        """
+        Get the decoder of `str` lines, compiling it on first use.
+        """
+        if 'lines' not in self.compiled:
+            self.compiled['lines'] = compile_decoder(self.spec.dict_specs, query=self.query)
+        return self.compiled['lines']
+
+    def get_decoder(self):
+        """
+        Get the decoder of the engine's lines, compiling it on first use.
+        """
+        if 'engine' not in self.compiled:
+            self.compiled['engine'] = get_engine(self.engine).compile(self.spec.dict_specs, self.query)
+        return self.compiled['engine']
+
+    def get_record_decoder(self):
+        """
+        Get the decoder of `str` lines into Records, compiling it on first use.
+        """
+        if 'records' not in self.compiled:
+            self.compiled['records'] = compile_decoder(self.spec.dict_specs, compact=True, query=self.query)
+        return self.compiled['records']
+
+    def get_batch_decoder(self):
+        """
+        Get the decoder of the engine's lines used to build RecordBatches, compiling it on first use.
+
+        Returns:
+            tuple: The engine's decoder if it decodes columns, or else a compact
+                decoder for its lines, and the Record type of the batches.
+        """
+        if 'batches' not in self.compiled:
+            from utils.records import make_record_type
+
+            decoder = self.get_decoder()
+            if hasattr(decoder, 'decode_columns'):
+                self.compiled['batches'] = (decoder, make_record_type(self.columns))
+            else:
+                decoder = compile_decoder(self.spec.dict_specs, binary=decoder.binary, compact=True,
+                                          query=self.query)
+                self.compiled['batches'] = (decoder, decoder.record_type)
+        return self.compiled['batches']
+
+    def get_serializer(self):
+        """
+        Get the serializer, building it on first use.
+
+        Raises:
+            ValueError: If no serializer has that name.
+            ImportError: If the serializer needs a package that is not installed.
+        """
+        if 'serializer' not in self.compiled:
+            self.compiled['serializer'] = get_serializer(self.serializer, self.columns)
+        return self.compiled['serializer']
+
+    def parse_lines(self, lines):
+        """
+        Lazily convert lines of data, whatever the engine.
+
+        Args:
+            lines (iterable): `str` lines, with or without their line endings, e.g. an open file.
+
+        Yields:
+            dict: One record per line.
+        """
+        decoder = self.get_line_decoder()
+        for chunk in iter_chunks(lines, self.chunk_size):
+            yield from decoder.decode_chunk(chunk)
+
+    def parse_string(self, text):
+        """
+        Lazily convert the lines of a string of data.
+
+        Args:
+            text (str): Data, one record per line.
+
+        Yields:
+            dict: One record per line.
+        """
+        return self.parse_lines(text.splitlines())
+
+    def parse_path(self, path, start=0, end=None):
+        """
+        Lazily convert a data file, or a byte range of it, read with the engine.
+
+        The file stays open until the generator is exhausted or closed.
+
+        Args:
+            path (str): Path of the data file.
+            start (int): Byte offset of the first line to convert.
+            end (int): Byte offset where conversion stops, None converts to the end of the file.
+
+        Yields:
+            dict: One record per line.
+        """
+        decoder = self.get_decoder()
+        with get_engine(self.engine).open(path, start, end) as f:
+            for chunk in iter_chunks(f, self.chunk_size):
+                yield from decoder.decode_chunk(chunk)
+
+    def parse_records(self, lines):
+        """
+        Lazily convert lines of data into Records, which take far less memory than dictionaries.
+
+        Args:
+            lines (iterable): `str` lines, with or without their line endings, e.g. an open file.
+
+        Yields:
+            Record: One record per line.
+        """
+        decoder = self.get_record_decoder()
+        for chunk in iter_chunks(lines, self.chunk_size):
+            yield from decoder.decode_chunk(chunk)
+
+    def parse_batches(self, path, start=0, end=None):
+        """
+        Lazily convert a data file, or a byte range of it, read with the engine into RecordBatches.
+
+        Args:
+            path (str): Path of the data file.
+            start (int): Byte offset of the first line to convert.
+            end (int): Byte offset where conversion stops, None converts to the end of the file.
+
+        Yields:
+            RecordBatch: One batch per chunk of at most `chunk_size` lines.
+        """
+        from utils.records import RecordBatch
+
+        decoder, record_type = self.get_batch_decoder()
+        columnar = hasattr(decoder, 'decode_columns') and bool(decoder.columns)
+        with get_engine(self.engine).open(path, start, end) as f:
+            for chunk in iter_chunks(f, self.chunk_size):
+                if columnar:
+                    yield RecordBatch.from_columns(record_type, list(decoder.decode_columns(chunk).values()))
+                else:
+                    yield RecordBatch.from_rows(record_type, decoder.decode_chunk(chunk))
+
+    def dumps(self, records):
+        """
+        Encode records as NDJSON with the serializer.
+
+        Args:
+            records (iterable): Records, e.g. from one of the parse methods.
+
+        Returns:
+            str: One JSON object per record, each followed by a newline.
+        """
+        return self.get_serializer().encode_chunk(list(records)).decode('utf-8')
+
+    def write(self, data_path, output_path, output_format='ndjson', metrics=None, compression=None):
+        """
+        Convert a data file into an output file, as process_data does for each data file.
+
+        Args:
+            data_path (str): Path of the data file, decompressed if its extension is one of a codec.
+            output_path (str): Path of the output file to write.
+            output_format (str): Name of the output format, one of OUTPUT_FORMATS.
+            metrics (Metrics): Metrics to record into, None measures nothing.
+            compression (str): Name of the codec compressing NDJSON output, one of CODECS, or None.
+
+        Returns:
+            int: Number of rows written.
+        """
+        return process_file(self.get_decoder(), self.get_serializer(), data_path, output_path, self.chunk_size,
+                            engine=self.engine, output_format=output_format, metrics=metrics,
+                            compression=compression)
@@ -0,0 +1,119 @@
+import os
+
+# Manifest of produced outputs, kept in the output directory
+MANIFEST_FILENAME = '.manifest.json'
+
+# Bumped whenever a release converts the same data and spec differently, so outputs of earlier releases are
+# produced again; entries without a version are version 1, before DATE and DECIMAL columns were converted
+OUTPUT_VERSION = 2
+
+def hash_file(path):
+    """
+    Hash the content of a file.
+
+    Args:
+        path (str): Path of the file.
+
+    Returns:
+        str: Hex SHA-256 digest of the file content.
+    """
+    import hashlib
+
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def load_manifest(output_dir):
+    """
+    Load the manifest of an output directory.
+
+    Args:
+        output_dir (str): Directory where output files are written.
+
+    Returns:
+        dict: Dictionary mapping output file names to their entries, empty if
+            there is no manifest or it cannot be read.
+    """
+    import json
+
+    try:
+        with open(os.path.join(output_dir, MANIFEST_FILENAME), 'r') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return manifest if isinstance(manifest, dict) else {}
+
+def save_manifest(output_dir, manifest):
+    """
+    Write the manifest of an output directory, replacing the previous one atomically.
+
+    Args:
+        output_dir (str): Directory where output files are written.
+        manifest (dict): Dictionary mapping output file names to their entries.
+    """
+    import json
+
+    path = os.path.join(output_dir, MANIFEST_FILENAME)
+    with open(f"{path}.tmp", 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(f"{path}.tmp", path)
+
+def make_entry(data_path, spec_hash, settings, previous=None, stat=None):
+    """
+    Describe the inputs an output file is produced from.
+
+    The content hash of the data file is reused from the previous entry when
+    its size and modification time are unchanged, so unchanged files are not
+    read again.
+
+    Args:
+        data_path (str): Path of the data file.
+        spec_hash (str): Hash of the spec file.
+        settings (dict): Options of the run that change the output.
+        previous (dict): Entry recorded for the output file by a previous run, if any.
+        stat (os.stat_result): Stat of the data file if already known, e.g. from scan_files.
+
+    Returns:
+        dict: Entry with the data file's size, modification time and content
+            hash, the spec hash, the settings and the output version.
+
+    Raises:
+        OSError: If the data file cannot be read.
+    """
+    stat = stat or os.stat(data_path)
+    entry = {
+        'data_file': os.path.basename(data_path),
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'spec_hash': spec_hash,
+        'settings': settings,
+        'output_version': OUTPUT_VERSION
+    }
+
+    if previous and previous.get('size') == entry['size'] and previous.get('mtime_ns') == entry['mtime_ns']:
+        entry['sha256'] = previous.get('sha256')
+    else:
+        entry['sha256'] = hash_file(data_path)
+
+    return entry
+
+def is_up_to_date(previous, entry, output_path):
+    """
+    Check whether an output file was produced from the same inputs.
+
+    Args:
+        previous (dict): Entry recorded for the output file by a previous run, if any.
+        entry (dict): Entry describing the current inputs, as returned by make_entry.
+        output_path (str): Path of the output file.
+
+    Returns:
+        bool: True if the output file exists and its data file content, spec, settings and output version are
+            unchanged.
+    """
+    if not previous or not os.path.exists(output_path):
+        return False
+
+    keys = ['data_file', 'sha256', 'spec_hash', 'settings', 'output_version']
+    return all(previous.get(key) == entry[key] for key in keys)
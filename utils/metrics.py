@@ -0,0 +1,157 @@
+# Stages of converting a chunk, in order; sharded files add a final 'merge' stage
+STAGES = ['read', 'decode', 'encode', 'write']
+
+def format_labels(labels):
+    """
+    Format Prometheus labels.
+
+    Args:
+        labels (dict): Dictionary mapping label names to values.
+
+    Returns:
+        str: Labels between braces, with values escaped.
+    """
+    escaped = {
+        name: str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        for name, value in labels.items()
+    }
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped.items()) + '}'
+
+
+class Metrics:
+    """
+    Counters and timers of a run, or of a single data file.
+
+    A run's metrics hold the totals of its data files and, in `files`, the
+    metrics of each data file. Stage timers are summed over every chunk;
+    `seconds` is the time spent processing files, which exceeds the wall time
+    of a parallel run.
+
+    Args:
+        profile_dir (str): Directory where a cProfile stats file is written per
+            output file, None disables profiling.
+        profile_every (int): Profile one chunk out of this many.
+    """
+
+    def __init__(self, profile_dir=None, profile_every=1):
+        self.profile_dir = profile_dir
+        self.profile_every = profile_every
+        self.rows = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.seconds = 0.0
+        self.wall_seconds = 0.0
+        self.stages = dict.fromkeys(STAGES, 0.0)
+        self.failures = {}
+        self.files = {}
+
+    def get_options(self):
+        """
+        Get the settings workers need to measure jobs, as a picklable dictionary.
+
+        Returns:
+            dict: Keyword arguments creating an empty Metrics with the same settings.
+        """
+        return {'profile_dir': self.profile_dir, 'profile_every': self.profile_every}
+
+    def add_failures(self, column_name, count):
+        """
+        Count values of a column that could not be converted.
+
+        Args:
+            column_name (str): Name of the column.
+            count (int): Number of values that fell back to None.
+        """
+        if count:
+            self.failures[column_name] = self.failures.get(column_name, 0) + count
+
+    def merge(self, other):
+        """
+        Add the counters and timers of other metrics to these.
+
+        Args:
+            other (Metrics): Metrics to add, e.g. those of one shard of a data file.
+        """
+        self.rows += other.rows
+        self.bytes_in += other.bytes_in
+        self.bytes_out += other.bytes_out
+        self.seconds += other.seconds
+        for stage, seconds in other.stages.items():
+            self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+        for column_name, count in other.failures.items():
+            self.add_failures(column_name, count)
+
+    def add_file(self, data_file, metrics):
+        """
+        Record the metrics of a data file and add them to the totals.
+
+        Args:
+            data_file (str): File name of the data file.
+            metrics (Metrics): Metrics of that data file.
+        """
+        self.files[data_file] = metrics
+        self.merge(metrics)
+
+    def to_dict(self):
+        """
+        Get the metrics as plain data.
+
+        Returns:
+            dict: Counters, timers and conversion failures, with the metrics of
+                each data file under 'files'.
+        """
+        data = {
+            'rows': self.rows,
+            'bytes_in': self.bytes_in,
+            'bytes_out': self.bytes_out,
+            'seconds': self.seconds,
+            'stages': dict(self.stages),
+            'failures': dict(self.failures),
+        }
+        if self.files:
+            data['wall_seconds'] = self.wall_seconds
+            data['files'] = {data_file: metrics.to_dict() for data_file, metrics in self.files.items()}
+        return data
+
+    def to_json(self):
+        """
+        Dump the metrics as JSON.
+
+        Returns:
+            str: JSON document of to_dict.
+        """
+        import json
+
+        return json.dumps(self.to_dict(), indent=2)
+
+    def to_prometheus(self, prefix='formatter'):
+        """
+        Dump the metrics in the Prometheus text exposition format, one series per data file.
+
+        Args:
+            prefix (str): Prefix of the metric names.
+
+        Returns:
+            str: Metric families, each with its HELP and TYPE lines.
+        """
+        families = [
+            ('rows_total', 'counter', 'Rows converted.', lambda metrics: [({}, metrics.rows)]),
+            ('input_bytes_total', 'counter', 'Bytes of data read.', lambda metrics: [({}, metrics.bytes_in)]),
+            ('output_bytes_total', 'counter', 'Bytes of output written.', lambda metrics: [({}, metrics.bytes_out)]),
+            ('seconds_total', 'counter', 'Time spent processing the file.', lambda metrics: [({}, metrics.seconds)]),
+            ('stage_seconds_total', 'counter', 'Time spent in each stage of processing.',
+             lambda metrics: [({'stage': stage}, seconds) for stage, seconds in metrics.stages.items()]),
+            ('conversion_failures_total', 'counter', 'Values that could not be converted and fell back to null.',
+             lambda metrics: [({'column': column_name}, count) for column_name, count in metrics.failures.items()]),
+        ]
+        files = self.files or {'': self}
+
+        lines = []
+        for name, metric_type, description, get_samples in families:
+            lines.append(f'# HELP {prefix}_{name} {description}')
+            lines.append(f'# TYPE {prefix}_{name} {metric_type}')
+            for data_file, metrics in files.items():
+                for labels, value in get_samples(metrics):
+                    labels = {'file': data_file, **labels} if data_file else labels
+                    lines.append(f'{prefix}_{name}{format_labels(labels) if labels else ""} {value}')
+        return '\n'.join(lines) + '\n'
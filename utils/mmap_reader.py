@@ -0,0 +1,72 @@
+import mmap
+import os
+from utils.compression import detect_codec, open_decompressed
+from utils.sharding import check_whole_file
+
+def open_mmap_file(path, start=0, end=None):
+    """
+    Open a data file as memory-mapped `bytes` lines, optionally restricted to a byte range.
+
+    Compressed data files cannot be mapped: they are decompressed in a
+    background thread and read whole, still as `bytes` lines.
+
+    Args:
+        path (str): Path of the data file.
+        start (int): Byte offset of the first line to read, must be a line boundary.
+        end (int): Byte offset where reading stops, None reads to the end of the file.
+
+    Returns:
+        MmapLines: Context manager iterating over the lines within the range.
+
+    Raises:
+        ValueError: If a byte range of a compressed data file is requested.
+    """
+    if detect_codec(path):
+        check_whole_file(path, start, end)
+        return open_decompressed(path)
+    return MmapLines(path, start, end)
+
+
+class MmapLines:
+    """
+    Iterate over the lines of a memory-mapped file as `bytes`, newline included.
+
+    Lines are cut directly out of the page cache, so no text decoding happens
+    until a decoder asks for it.
+    """
+
+    def __init__(self, path, start=0, end=None):
+        self.f = open(path, 'rb')
+        size = os.fstat(self.f.fileno()).st_size
+        self.start = start
+        self.end = size if end is None else min(end, size)
+
+        # Empty files cannot be mapped
+        self.mm = mmap.mmap(self.f.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        if self.mm is not None and hasattr(mmap, 'MADV_SEQUENTIAL'):
+            self.mm.madvise(mmap.MADV_SEQUENTIAL)
+
+    def __iter__(self):
+        if self.mm is None or self.start >= self.end:
+            return
+
+        mm = self.mm
+        readline = mm.readline
+        end = self.end
+        mm.seek(self.start)
+
+        # Lines always end on a line boundary, so whole lines can be read up to end
+        while mm.tell() < end:
+            yield readline()
+
+    def close(self):
+        if self.mm is not None:
+            self.mm.close()
+            self.mm = None
+        self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,284 @@
+import operator
+import numpy as np
+from utils.datatypes import BYTES_WHITESPACE, ENCODING, MAX_INTEGER_WIDTH, date_cache, get_datatype, parse_date
+from utils.decoder import compile_decoder, get_columns
+
+# Functions of the comparison operators of predicates
+COMPARISONS = {
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+}
+
+def is_blank(field):
+    """
+    Flag padding bytes: the ASCII characters str.strip() removes and the NUL padding of short lines.
+
+    Args:
+        field (numpy.ndarray): uint8 array.
+
+    Returns:
+        numpy.ndarray: bool array of the same shape.
+    """
+    return (field == 32) | (field == 0) | ((field >= 9) & (field <= 13)) | ((field >= 28) & (field <= 31))
+
+def parse_int_or_none(field):
+    """
+    Parse a single integer field the way the line decoders do.
+
+    Args:
+        field (bytes): Raw field bytes.
+
+    Returns:
+        int: The parsed value, or None if the field is not a valid integer.
+    """
+    try:
+        return int(field.rstrip(b'\0').strip(BYTES_WHITESPACE))
+    except ValueError:
+        return None
+
+def parse_integers(field):
+    """
+    Parse a block of fixed-width integer fields.
+
+    Fields made of optional padding, an optional sign, digits and optional
+    padding are parsed with array operations. Blank fields become None and any
+    other field falls back to int(), so unusual values such as `1_000` are
+    handled exactly like the line decoders handle them.
+
+    Args:
+        field (numpy.ndarray): uint8 array of shape (rows, width).
+
+    Returns:
+        list: One int or None per row.
+    """
+    rows, width = field.shape
+    if width == 0 or width > MAX_INTEGER_WIDTH:
+        return [parse_int_or_none(value.tobytes()) for value in field]
+
+    # Work position by position on contiguous rows of the transposed field
+    positions = np.ascontiguousarray(field.T)
+    digit = (positions >= 48) & (positions <= 57)
+    blank = is_blank(positions)
+    nonblank = ~blank
+
+    # Non-blank bytes must form a single run of digits, optionally led by a sign
+    starts = nonblank.copy()
+    starts[1:] &= blank[:-1]
+    sign = (positions == 45) | (positions == 43)
+    stray = nonblank & ~digit & ~(sign & starts)
+    valid = (starts.sum(axis=0, dtype=np.int8) == 1) & ~stray.any(axis=0) & digit.any(axis=0)
+
+    values = np.zeros(rows, dtype=np.int64)
+    units = positions.astype(np.int64) - 48
+    for position in range(width):
+        values = np.where(digit[position], values * 10 + units[position], values)
+    values = np.where((positions == 45).any(axis=0), -values, values).tolist()
+
+    for row in np.flatnonzero(~valid).tolist():
+        values[row] = parse_int_or_none(field[row].tobytes()) if nonblank[:, row].any() else None
+
+    return values
+
+def parse_booleans(field):
+    """
+    Parse a block of fixed-width boolean fields, true when the field is `1` once padding is removed.
+
+    Args:
+        field (numpy.ndarray): uint8 array of shape (rows, width).
+
+    Returns:
+        list: One bool per row.
+    """
+    if field.shape[1] == 1:
+        return (field[:, 0] == 49).tolist()
+
+    positions = np.ascontiguousarray(field.T)
+    ones = (positions == 49).sum(axis=0, dtype=np.int16)
+    nonblank = (~is_blank(positions)).sum(axis=0, dtype=np.int16)
+    return ((ones == 1) & (nonblank == 1)).tolist()
+
+def parse_text(field):
+    """
+    Decode a block of fixed-width text fields with surrounding whitespace removed.
+
+    Args:
+        field (numpy.ndarray): uint8 array of shape (rows, width).
+
+    Returns:
+        list: One str per row.
+    """
+    if field.shape[1] == 0:
+        return [''] * field.shape[0]
+
+    values = np.ascontiguousarray(field).view(f'S{field.shape[1]}').ravel().tolist()
+    return [value.decode(ENCODING).strip() for value in values]
+
+def parse_dates(field):
+    """
+    Parse a block of fixed-width YYYYMMDD fields through the date cache shared with the line decoders.
+
+    Args:
+        field (numpy.ndarray): uint8 array of shape (rows, width).
+
+    Returns:
+        list: One date or None per row.
+    """
+    if field.shape[1] == 0:
+        return [None] * field.shape[0]
+
+    values = np.ascontiguousarray(field).view(f'S{field.shape[1]}').ravel().tolist()
+    return [date_cache[value] if value in date_cache else parse_date(value) for value in values]
+
+def make_converting_parser(convert):
+    """
+    Make a block parser converting every stripped text field with a datatype's converter.
+
+    Args:
+        convert (callable): Converter of the datatype.
+
+    Returns:
+        callable: Parser of uint8 arrays of shape (rows, width), returning one value per row.
+    """
+    def parse(field):
+        return [convert(value) for value in parse_text(field)]
+    return parse
+
+def get_parser(datatype):
+    """
+    Get the block parser of a column datatype, vectorized for the built-in datatypes that allow it.
+
+    Args:
+        datatype (str): Lowercase datatype of the column.
+
+    Returns:
+        callable: Parser of uint8 arrays of shape (rows, width), returning one value per row.
+    """
+    datatype = get_datatype(datatype)
+    parser = PARSERS.get(datatype.name)
+    if parser is None:
+        parser = make_converting_parser(datatype.convert)
+    return parser
+
+def match_values(values, op, value):
+    """
+    Test a predicate on every value of a column, with the semantics of the line decoders.
+
+    Args:
+        values (list): Parsed values of the column.
+        op (str): Comparison operator.
+        value (object): Typed value to compare with.
+
+    Returns:
+        numpy.ndarray: bool array, true for the rows meeting the predicate.
+    """
+    if value is None:
+        matches = [v is None for v in values]
+        return np.array(matches, dtype=bool) if op == '==' else ~np.array(matches, dtype=bool)
+    compare = COMPARISONS[op]
+    return np.array([v is not None and compare(v, value) for v in values], dtype=bool)
+
+def compile_numpy_decoder(dict_specs, query=None):
+    """
+    Compile column specifications into a vectorized chunk decoder.
+
+    Args:
+        dict_specs (dict): Dictionary containing column specifications.
+        query (Query): Columns to keep and conditions lines must meet, None keeps everything.
+
+    Returns:
+        NumpyDecoder: Decoder for `bytes` lines producing the same output as the binary line decoder.
+    """
+    return NumpyDecoder(dict_specs, query)
+
+
+class NumpyDecoder:
+    """
+    Decode chunks of `bytes` lines column by column with NumPy.
+
+    A chunk is copied into a single (rows, record length) byte array, and each
+    column is converted from its strided view of that array as a whole.
+    Integer and boolean columns gain the most; text columns still need one
+    Python string per value.
+
+    With a query, the columns of its conditions are parsed first and the rows
+    failing them are dropped from the array before the selected columns are
+    parsed.
+    """
+
+    def __init__(self, dict_specs, query=None):
+        self.dict_specs = dict_specs
+        self.query = query
+        spec_columns = get_columns(dict_specs)
+        self.record_length = spec_columns[-1][2] if spec_columns else 0
+        self.columns, self.predicates = query.resolve(spec_columns) if query is not None else (spec_columns, [])
+        self.decode = compile_decoder(dict_specs, binary=True, query=query).decode
+
+        self.parsers = [
+            (column_name, start, end, get_parser(datatype))
+            for column_name, start, end, datatype in self.columns
+        ]
+        self.tests = [
+            (start, end, get_parser(datatype), op, value)
+            for (_, start, end, datatype), op, value in self.predicates
+        ]
+
+    def __call__(self, line):
+        return self.decode(line)
+
+    def decode_columns(self, lines):
+        """
+        Decode a chunk of lines into columns.
+
+        Args:
+            lines (list): `bytes` lines to decode.
+
+        Returns:
+            dict: Dictionary mapping column names to lists of values, in the
+                order of `columns`, for the lines meeting the conditions of the query.
+        """
+        if not lines or not self.record_length:
+            rows = [row for row in map(self.decode, lines) if row is not None]
+            return {column_name: [row[column_name] for row in rows] for column_name, *_ in self.parsers}
+
+        # Lines are truncated or NUL-padded to exactly one record
+        records = np.array(lines, dtype=f'S{self.record_length}')
+        block = records.view(np.uint8).reshape(len(lines), self.record_length)
+
+        # Each condition only parses the rows the previous ones kept
+        for start, end, parse, op, value in self.tests:
+            block = block[match_values(parse(block[:, start:end]), op, value)]
+
+        return {column_name: parse(block[:, start:end]) for column_name, start, end, parse in self.parsers}
+
+    def decode_chunk(self, lines):
+        """
+        Decode a chunk of lines.
+
+        Args:
+            lines (list): `bytes` lines to decode.
+
+        Returns:
+            list: One dictionary per line meeting the conditions of the query.
+        """
+        if not self.columns:
+            return [{} for _ in lines]
+
+        columns = self.decode_columns(lines)
+        names = list(columns)
+        return [dict(zip(names, values)) for values in zip(*columns.values())]
+
+    def __reduce__(self):
+        return (NumpyDecoder, (self.dict_specs, self.query))
+
+
+# Block parsers of built-in datatypes, other datatypes convert their fields one by one
+PARSERS = {
+    'text': parse_text,
+    'boolean': parse_booleans,
+    'integer': parse_integers,
+    'date': parse_dates,
+}
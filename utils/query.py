@@ -0,0 +1,150 @@
+from utils.datatypes import get_datatype
+
+# Comparison operators of conditions, two-character ones first so `<=` is not read as `<`
+OPERATORS = ['==', '!=', '<=', '>=', '<', '>']
+
+# Operators each kind of values supports, other kinds support every operator
+KIND_OPERATORS = {
+    'boolean': ['==', '!='],
+}
+
+def parse_condition(text):
+    """
+    Split a condition such as `active == true` or `last_name >= "M"`.
+
+    Args:
+        text (str): Column name, operator and value.
+
+    Returns:
+        tuple: (column name, operator, value text) tuple; the value is typed
+            later, once the datatype of the column is known.
+
+    Raises:
+        ValueError: If the condition has no operator, column name or value.
+    """
+    for index in range(len(text)):
+        operator = next((operator for operator in OPERATORS if text.startswith(operator, index)), None)
+        if operator is not None:
+            column_name, value = text[:index].strip(), text[index + len(operator):].strip()
+            if column_name and value:
+                return (column_name, operator, value)
+            break
+    raise ValueError(f"the condition {text!r} is not formatted as '<column> <operator> <value>'")
+
+def parse_value(text, datatype):
+    """
+    Convert the value of a condition to the type of its column.
+
+    Args:
+        text (str): Value as written in the condition: `null`, a number,
+            `true` or `false`, a date as `YYYY-MM-DD` or `YYYYMMDD`, or text,
+            optionally between quotes.
+        datatype (str): Lowercase datatype of the column.
+
+    Returns:
+        object: None, or a value of the kind of the datatype: int, bool, float,
+            Decimal, date or str.
+
+    Raises:
+        ValueError: If the value does not suit the datatype.
+    """
+    if text.lower() == 'null':
+        return None
+    kind = get_datatype(datatype).kind
+    if len(text) >= 2 and text[0] == text[-1] and text[0] in '"\'':
+        text = text[1:-1]
+    if kind == 'text':
+        return text
+    if kind == 'boolean':
+        if text.lower() in ['true', '1']:
+            return True
+        if text.lower() in ['false', '0']:
+            return False
+        raise ValueError(f"{text!r} is not a boolean")
+
+    # Built-in datatypes are named after their kind
+    value = get_datatype(kind).convert(text.replace('-', '') if kind == 'date' else text)
+    if value is None:
+        raise ValueError(f"{text!r} is not a valid {kind}")
+    return value
+
+
+class Query:
+    """
+    Columns to keep and conditions rows must meet, pushed down into the decoders.
+
+    Decoders compiled with a query slice and convert the columns of the
+    conditions first, skip a row as soon as one condition fails, and only
+    then convert the kept columns. Conditions compare a column with a value:
+    a null (unparseable) integer only matches `== null`.
+
+    Args:
+        columns (list): Names of the columns to keep, in output order. None keeps every column.
+        where (list): Conditions every kept row meets, as strings such as
+            `active == true`, or as (column name, operator, value) tuples with
+            an already typed value.
+    """
+
+    def __init__(self, columns=None, where=()):
+        self.columns = list(columns) if columns is not None else None
+        self.where = [
+            (*parse_condition(condition), True) if isinstance(condition, str) else (*condition, False)
+            for condition in where
+        ]
+
+    def resolve(self, columns):
+        """
+        Apply the query to the columns of a spec.
+
+        Args:
+            columns (list): Columns as returned by get_columns.
+
+        Returns:
+            tuple: Columns to output, in output order, and predicates as
+                (column, operator, value) tuples with typed values.
+
+        Raises:
+            ValueError: If the spec lacks a column of the query, or a condition
+                does not suit the datatype of its column.
+        """
+        by_name = {column[0]: column for column in columns}
+
+        def get_column(column_name):
+            if column_name not in by_name:
+                raise ValueError(f"it has no column {column_name!r}")
+            return by_name[column_name]
+
+        if self.columns is None:
+            selected = list(columns)
+        elif not self.columns:
+            raise ValueError("the query selects no column")
+        else:
+            selected = [get_column(column_name) for column_name in self.columns]
+
+        predicates = []
+        for column_name, operator, value, written in self.where:
+            column = get_column(column_name)
+            datatype = column[3]
+            if operator not in KIND_OPERATORS.get(get_datatype(datatype).kind, OPERATORS):
+                raise ValueError(f"{datatype} column {column_name!r} cannot be compared with {operator!r}")
+            if written:
+                value = parse_value(value, datatype)
+            if value is None and operator not in ['==', '!=']:
+                raise ValueError("null can only be compared with '==' or '!='")
+            predicates.append((column, operator, value))
+
+        return selected, predicates
+
+    def describe(self):
+        """
+        Describe the query, e.g. to record the settings an output was produced with.
+
+        Returns:
+            str: Selected columns and conditions.
+        """
+        columns = ','.join(self.columns) if self.columns is not None else '*'
+        conditions = ' and '.join(f'{name} {operator} {value!r}' for name, operator, value, _ in self.where)
+        return f'select {columns}' + (f' where {conditions}' if conditions else '')
+
+    def __repr__(self):
+        return f'Query({self.describe()!r})'
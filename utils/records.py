@@ -0,0 +1,342 @@
+from itertools import accumulate, islice
+
+def make_record_type(columns):
+    """
+    Generate the Record type of a spec, holding the column names every row shares.
+
+    Args:
+        columns (list): Columns as returned by get_columns.
+
+    Returns:
+        type: Subclass of Record for those columns.
+    """
+    names = tuple(column_name for column_name, *_ in columns)
+    return type('Record', (Record,), {
+        '__slots__': (),
+        'columns': columns,
+        'names': names,
+        'positions': {column_name: position for position, column_name in enumerate(names)},
+    })
+
+def pack_bits(flags):
+    """
+    Pack truth values into a bitmap, the first value in the lowest bit of the first byte.
+
+    Args:
+        flags (list): Truth values.
+
+    Returns:
+        bytes: One bit per value.
+    """
+    bits = ''.join(['1' if flag else '0' for flag in reversed(flags)])
+    return int(bits or '0', 2).to_bytes((len(flags) + 7) // 8, 'little')
+
+def unpack_bits(bitmap, length):
+    """
+    Unpack the first `length` bits of a bitmap written by pack_bits.
+
+    Returns:
+        list: One bool per bit.
+    """
+    bits = format(int.from_bytes(bitmap, 'little'), f'0{length}b')[::-1]
+    return [bit == '1' for bit in bits[:length]]
+
+def get_bit(bitmap, index):
+    return bool(bitmap[index >> 3] >> (index & 7) & 1)
+
+def make_column(datatype, values):
+    """
+    Store the values of a column in the most compact storage for its datatype.
+
+    Columns holding values their datatype's storage cannot, such as integers
+    beyond 64 bits or None in a text column, are kept as a list.
+
+    Args:
+        datatype (str): Lowercase datatype of the column.
+        values (sequence): Values of the column.
+
+    Returns:
+        Column storage with `__len__`, `__getitem__` and `to_list`.
+    """
+    from utils.datatypes import get_datatype
+
+    try:
+        return COLUMN_TYPES.get(get_datatype(datatype).kind, ObjectColumn).from_values(values)
+    except (OverflowError, TypeError):
+        return ObjectColumn(list(values))
+
+
+class Record(tuple):
+    """
+    Values of one row, in spec order, whose column names are held once by its type.
+
+    Records index like tuples and also by column name, e.g. `record['count']`.
+    Decoders compiled with `compact=True` return them, and make_record_type
+    generates one type per spec.
+    """
+
+    __slots__ = ()
+    columns = []
+    names = ()
+    positions = {}
+
+    def __getitem__(self, key):
+        if key.__class__ is str:
+            key = self.positions[key]
+        return tuple.__getitem__(self, key)
+
+    def get(self, column_name, default=None):
+        position = self.positions.get(column_name)
+        return default if position is None else tuple.__getitem__(self, position)
+
+    def keys(self):
+        return list(self.names)
+
+    def to_dict(self):
+        """
+        Get the record as the dictionary get_output_line would return.
+        """
+        return dict(zip(self.names, self))
+
+    def __repr__(self):
+        return 'Record(' + ', '.join(f'{name}={value!r}' for name, value in zip(self.names, self)) + ')'
+
+
+class IntegerColumn:
+    """
+    Integers stored as int64, with a bitmap flagging None values.
+    """
+
+    typecode = 'q'
+
+    def __init__(self, values, nulls=None):
+        self.values = values
+        self.nulls = nulls
+
+    @classmethod
+    def from_values(cls, values):
+        from array import array
+
+        nulls = None
+        if None in values:
+            nulls = pack_bits([value is None for value in values])
+            values = [0 if value is None else value for value in values]
+        return cls(array(cls.typecode, values), nulls)
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, index):
+        if self.nulls is not None and get_bit(self.nulls, index):
+            return None
+        return self.values[index]
+
+    def to_list(self):
+        values = self.values.tolist()
+        if self.nulls is not None:
+            for index, null in enumerate(unpack_bits(self.nulls, len(values))):
+                if null:
+                    values[index] = None
+        return values
+
+
+class FloatColumn(IntegerColumn):
+    """
+    Floats stored as float64, with a bitmap flagging None values.
+    """
+
+    typecode = 'd'
+
+
+class BooleanColumn:
+    """
+    Booleans stored as a bitmap.
+    """
+
+    def __init__(self, bitmap, length):
+        self.bitmap = bitmap
+        self.length = length
+
+    @classmethod
+    def from_values(cls, values):
+        if None in values:
+            raise TypeError('boolean columns cannot hold None')
+        return cls(pack_bits(values), len(values))
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, index):
+        return get_bit(self.bitmap, index)
+
+    def to_list(self):
+        return unpack_bits(self.bitmap, self.length)
+
+
+class TextColumn:
+    """
+    Strings stored end to end in a single string, the arena, with the offset of each one.
+    """
+
+    def __init__(self, arena, offsets):
+        self.arena = arena
+        self.offsets = offsets
+
+    @classmethod
+    def from_values(cls, values):
+        from array import array
+
+        return cls(''.join(values), array('q', accumulate(map(len, values), initial=0)))
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        return self.arena[self.offsets[index]:self.offsets[index + 1]]
+
+    def to_list(self):
+        arena = self.arena
+        return [arena[start:end] for start, end in zip(self.offsets, islice(self.offsets, 1, None))]
+
+
+class ObjectColumn:
+    """
+    Values kept as a list of Python objects, e.g. Decimals, or dates shared with every row of the same date.
+    """
+
+    def __init__(self, values):
+        self.values = values
+
+    @classmethod
+    def from_values(cls, values):
+        return cls(list(values))
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, index):
+        return self.values[index]
+
+    def to_list(self):
+        return list(self.values)
+
+
+# Storage of each kind of values, other kinds are kept as objects
+COLUMN_TYPES = {'text': TextColumn, 'integer': IntegerColumn, 'float': FloatColumn, 'boolean': BooleanColumn}
+
+
+class RecordBatch:
+    """
+    Rows of one spec stored column by column, for consumers keeping many rows in memory.
+
+    Integers and floats are stored in int64 and float64 arrays, booleans in
+    bitmaps and text in string arenas, so a batch holds no Python object per
+    value but decimals and dates. Records, dictionaries and NDJSON are only
+    built when asked for.
+
+    Args:
+        record_type (type): Record type of the spec, as returned by make_record_type.
+        columns (list): Column storages, in spec order.
+        length (int): Number of rows.
+    """
+
+    def __init__(self, record_type, columns, length):
+        self.record_type = record_type
+        self.columns = columns
+        self.length = length
+
+    @classmethod
+    def from_columns(cls, record_type, values, length=None):
+        """
+        Build a batch from the values of each column.
+
+        Args:
+            record_type (type): Record type of the spec.
+            values (list): One list of values per column, in spec order.
+            length (int): Number of rows, only needed when the spec has no columns.
+
+        Returns:
+            RecordBatch: The batch.
+        """
+        columns = [
+            make_column(datatype, column_values)
+            for (_, _, _, datatype), column_values in zip(record_type.columns, values)
+        ]
+        return cls(record_type, columns, len(values[0]) if values else length or 0)
+
+    @classmethod
+    def from_rows(cls, record_type, rows):
+        """
+        Build a batch from rows.
+
+        Args:
+            record_type (type): Record type of the spec.
+            rows (list): Records, or tuples of values in spec order.
+
+        Returns:
+            RecordBatch: The batch.
+        """
+        values = list(zip(*rows)) if rows else [() for _ in record_type.columns]
+        return cls.from_columns(record_type, values, len(rows))
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError('record index out of range')
+        return self.record_type(column[index] for column in self.columns)
+
+    def __iter__(self):
+        if not self.columns:
+            return iter([self.record_type()] * self.length)
+        return map(self.record_type, zip(*self.to_columns()))
+
+    def column(self, column_name):
+        """
+        Get the values of a column.
+
+        Args:
+            column_name (str): Name of the column.
+
+        Returns:
+            list: Values of the column.
+        """
+        return self.columns[self.record_type.positions[column_name]].to_list()
+
+    def to_columns(self):
+        """
+        Get the values of every column.
+
+        Returns:
+            list: One list of values per column, in spec order.
+        """
+        return [column.to_list() for column in self.columns]
+
+    def iter_dicts(self):
+        """
+        Lazily build the dictionary of each row, as get_output_line would return it.
+
+        Yields:
+            dict: One dictionary per row.
+        """
+        names = self.record_type.names
+        if not self.columns:
+            yield from ({} for _ in range(self.length))
+            return
+        for values in zip(*self.to_columns()):
+            yield dict(zip(names, values))
+
+    def to_ndjson(self, serializer):
+        """
+        Encode the batch as NDJSON without building a dictionary per row when the serializer can.
+
+        Args:
+            serializer (Serializer): Serializer built for the spec.
+
+        Returns:
+            bytes: One JSON object per row, each followed by a newline.
+        """
+        return serializer.encode_columns(self.to_columns())
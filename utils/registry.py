@@ -0,0 +1,245 @@
+import os
+from utils.formatter import Formatter, Spec
+
+# Bumped whenever the layout of the on-disk cache changes
+CACHE_VERSION = 1
+
+def read_spec(path):
+    """
+    Read, hash, parse and validate a spec file in a single read.
+
+    Args:
+        path (str): Path of the spec file.
+
+    Returns:
+        tuple: Hex SHA-256 digest of the file content, and the Spec, or the
+            reason it is invalid as a str.
+
+    Raises:
+        OSError: If the file cannot be read.
+    """
+    import hashlib
+
+    with open(path, 'rb') as f:
+        content = f.read()
+
+    name = os.path.splitext(os.path.basename(path))[0]
+    try:
+        spec = Spec.from_string(content.decode('utf-8'), name)
+    except (UnicodeDecodeError, ValueError) as e:
+        spec = str(e) if isinstance(e, ValueError) else 'it is not UTF-8 text'
+    return hashlib.sha256(content).hexdigest(), spec
+
+def get_entry_spec(entry):
+    """
+    Get the spec of a registry entry.
+
+    Args:
+        entry (dict): Entry returned by SpecRegistry.get_entry.
+
+    Returns:
+        Spec: The parsed spec.
+
+    Raises:
+        ValueError: If the spec is invalid.
+    """
+    spec = entry['spec']
+    if isinstance(spec, str):
+        raise ValueError(spec)
+    return spec
+
+def get_entry_formatter(entry, engine='text', serializer='template', query=None):
+    """
+    Get a Formatter for the spec of a registry entry, reusing the one built for the same engine, serializer and query.
+
+    Args:
+        entry (dict): Entry returned by SpecRegistry.get_entry.
+        engine (str): Name of the engine.
+        serializer (str): Name of the serializer.
+        query (Query): Columns to keep and conditions lines must meet, None keeps everything.
+
+    Returns:
+        Formatter: Formatter of the spec.
+
+    Raises:
+        ValueError: If the spec is invalid, the engine unknown or the query does not suit the spec.
+    """
+    spec = get_entry_spec(entry)
+    formatters = entry['formatters']
+    key = (engine, serializer, query.describe() if query is not None else None)
+    if key not in formatters:
+        formatters[key] = Formatter(spec, engine=engine, serializer=serializer, query=query)
+    return formatters[key]
+
+
+class SpecRegistry:
+    """
+    Specs read once and kept until their file changes.
+
+    Specs are looked up by path and reused while the file's modification time
+    and size are unchanged, so a hit costs a single stat. A changed file is
+    read again, once, and its content hash decides whether it really changed.
+    Invalid specs are remembered too, with the reason they are invalid.
+
+    At most `max_size` specs are kept, the least recently used being evicted.
+    Each spec also keeps the Formatters built for it, so their compiled
+    decoders and serializers are reused.
+
+    With a `cache_path`, parsed specs are persisted to that pickle file by
+    save and loaded back when the registry is created, so a cold start only
+    stats unchanged spec files. Only load cache files written by this
+    application: unpickling runs code from the file.
+
+    Args:
+        max_size (int): Maximum number of specs kept in memory.
+        cache_path (str): Path of the on-disk cache, None keeps specs in memory only.
+    """
+
+    def __init__(self, max_size=1024, cache_path=None):
+        self.max_size = max_size
+        self.cache_path = cache_path
+        self.entries = {}
+        self.persisted = {}
+        self.stats = {'hits': 0, 'disk_hits': 0, 'misses': 0, 'evictions': 0}
+
+        if cache_path:
+            self.load()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get_entry(self, path):
+        """
+        Get the cache entry of a spec file, reading the file only if it changed.
+
+        Args:
+            path (str): Path of the spec file.
+
+        Returns:
+            dict: Entry with the file's (mtime_ns, size) key, content hash, Spec
+                or reason it is invalid, and Formatters.
+
+        Raises:
+            OSError: If the file cannot be read.
+        """
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        key = (stat.st_mtime_ns, stat.st_size)
+
+        # Entries are kept in least to most recently used order
+        entry = self.entries.pop(path, None)
+        if entry is not None and entry['key'] == key:
+            self.entries[path] = entry
+            self.stats['hits'] += 1
+            return entry
+
+        persisted = self.persisted.get(path)
+        if persisted is not None and persisted[0] == key:
+            sha256, dict_specs = persisted[1], persisted[2]
+            spec = Spec(dict_specs, os.path.splitext(os.path.basename(path))[0])
+            self.stats['disk_hits'] += 1
+        else:
+            sha256, spec = read_spec(path)
+            self.stats['misses'] += 1
+
+            # Touched but unchanged: keep the compiled formatters
+            if entry is not None and entry['sha256'] == sha256:
+                spec = entry['spec']
+
+        formatters = entry['formatters'] if entry is not None and entry['spec'] is spec else {}
+        entry = {'key': key, 'sha256': sha256, 'spec': spec, 'formatters': formatters}
+        self.entries[path] = entry
+
+        while len(self.entries) > self.max_size:
+            del self.entries[next(iter(self.entries))]
+            self.stats['evictions'] += 1
+
+        return entry
+
+    def get(self, path):
+        """
+        Get the spec of a spec file.
+
+        Args:
+            path (str): Path of the spec file.
+
+        Returns:
+            Spec: The parsed spec.
+
+        Raises:
+            OSError: If the file cannot be read.
+            ValueError: If the spec is invalid.
+        """
+        return get_entry_spec(self.get_entry(path))
+
+    def get_hash(self, path):
+        """
+        Get the hash of a spec file's content, without reading it again if it did not change.
+
+        Args:
+            path (str): Path of the spec file.
+
+        Returns:
+            str: Hex SHA-256 digest of the file content.
+        """
+        return self.get_entry(path)['sha256']
+
+    def get_formatter(self, path, engine='text', serializer='template', query=None):
+        """
+        Get a Formatter for a spec file, reusing the one built for the same spec, engine, serializer and query.
+
+        Args:
+            path (str): Path of the spec file.
+            engine (str): Name of the engine.
+            serializer (str): Name of the serializer.
+            query (Query): Columns to keep and conditions lines must meet, None keeps everything.
+
+        Returns:
+            Formatter: Formatter of the spec.
+
+        Raises:
+            OSError: If the file cannot be read.
+            ValueError: If the spec is invalid, the engine unknown or the query does not suit the spec.
+        """
+        return get_entry_formatter(self.get_entry(path), engine, serializer, query)
+
+    def get_stats(self):
+        """
+        Get the hit and miss counts of the registry.
+
+        Returns:
+            dict: Counts of lookups served from memory ('hits'), from the
+                on-disk cache ('disk_hits') or by reading the file ('misses'),
+                of evicted specs, and the number of specs in memory ('size').
+        """
+        return {**self.stats, 'size': len(self.entries)}
+
+    def load(self):
+        """
+        Load parsed specs from the on-disk cache, ignoring a missing, corrupt or outdated cache.
+        """
+        import pickle
+
+        try:
+            with open(self.cache_path, 'rb') as f:
+                version, persisted = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError, TypeError):
+            return
+        if version == CACHE_VERSION:
+            self.persisted = persisted
+
+    def save(self):
+        """
+        Write the valid specs in memory, and those loaded before that still exist, to the on-disk cache.
+        """
+        import pickle
+
+        persisted = {path: value for path, value in self.persisted.items() if os.path.exists(path)}
+        for path, entry in self.entries.items():
+            if isinstance(entry['spec'], Spec):
+                persisted[path] = (entry['key'], entry['sha256'], entry['spec'].dict_specs)
+
+        with open(f"{self.cache_path}.tmp", 'wb') as f:
+            pickle.dump((CACHE_VERSION, persisted), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(f"{self.cache_path}.tmp", self.cache_path)
+        self.persisted = persisted
@@ -0,0 +1,217 @@
+from utils.datatypes import MAX_INTEGER_WIDTH, get_datatype
+
+def load_orjson():
+    """
+    Import orjson if it is installed.
+
+    Returns:
+        module: The orjson module, or None if it is not installed.
+    """
+    try:
+        import orjson
+    except ImportError:
+        return None
+    return orjson
+
+def encode_default(value):
+    """
+    Encode the values JSON has no type for, as the json and orjson serializers' `default`.
+
+    Decimals are written as fixed-point strings, which keeps them exact and
+    never uses exponents, and dates as ISO 8601 strings, like the template
+    serializer writes them.
+
+    Args:
+        value (object): Value the serializer cannot encode itself.
+
+    Returns:
+        str: The value as a string.
+
+    Raises:
+        TypeError: If the value is neither a Decimal nor a date.
+    """
+    from decimal import Decimal
+
+    if isinstance(value, Decimal):
+        # str() switches to exponents for small values and trailing zeros, e.g. 1E-7 or 0E-7
+        return format(value, 'f')
+    if hasattr(value, 'isoformat'):
+        return str(value)
+    raise TypeError(f"Object of type {value.__class__.__name__} is not JSON serializable")
+
+def generate_encoder_source(columns):
+    """
+    Generate the source of encode functions specialised to the given columns.
+
+    Every key fragment (`{"name": `, `, "valid": `, ...) is formatted once, so
+    encoding a row only formats its values.
+
+    Args:
+        columns (list): Columns as returned by get_columns.
+
+    Returns:
+        str: Python source defining an `encode(row)` function returning a JSON
+            object, and an `encode_lines(columns)` function returning one JSON
+            object per row from a list of column value lists when there are columns.
+    """
+    from json.encoder import encode_basestring_ascii
+
+    variables = [f'v{index}' for index in range(len(columns))]
+    conversions = []
+    parts = []
+
+    for index, (column_name, _, _, datatype) in enumerate(columns):
+        separator = '{' if index == 0 else ', '
+        parts.append(repr(f'{separator}{encode_basestring_ascii(column_name)}: '))
+        parts.append(f"f'{{v{index}}}'")
+
+        kind = get_datatype(datatype).kind
+        if kind == 'boolean':
+            conversions.append(f'v{index} = \'true\' if v{index} else \'false\'')
+        elif kind in ['integer', 'float']:
+            conversions.append(f'v{index} = \'null\' if v{index} is None else v{index}')
+        elif kind == 'decimal':
+            # Fixed-point, as str() of small Decimals uses exponents; neither needs escaping
+            conversions.append(f'v{index} = \'null\' if v{index} is None else f\'"{{v{index}:f}}"\'')
+        elif kind == 'date':
+            conversions.append(f'v{index} = \'null\' if v{index} is None else f\'"{{v{index}}}"\'')
+        else:
+            conversions.append(f'v{index} = encode_string(v{index})')
+
+    parts.append(repr('}' if columns else '{}'))
+    json_object = ' '.join(parts)
+
+    lines = ['def encode(row):']
+    lines += [f'    {variable} = row[{column_name!r}]' for variable, (column_name, *_) in zip(variables, columns)]
+    lines += [f'    {conversion}' for conversion in conversions]
+    lines += [f'    return {json_object}', '']
+
+    if not columns:
+        return '\n'.join(lines)
+
+    lines += ['def encode_lines(columns):', '    lines = []', '    append = lines.append']
+    lines += [f'    for {", ".join(variables)}, in zip(*columns):']
+    lines += [f'        {conversion}' for conversion in conversions]
+    lines += [f'        append({json_object})', '    return lines', '']
+    return '\n'.join(lines)
+
+def get_serializer(name, columns):
+    """
+    Build a serializer turning decoded rows into NDJSON.
+
+    Args:
+        name (str): Name of the serializer, one of SERIALIZERS.
+        columns (list): Columns of the spec, as returned by get_columns.
+
+    Returns:
+        Serializer: Serializer for rows of that spec.
+
+    Raises:
+        ValueError: If no serializer has that name.
+        ImportError: If the serializer needs a package that is not installed.
+    """
+    # The json module is imported on first use to keep importing this module cheap
+    import json
+
+    names = [column_name for column_name, *_ in columns]
+
+    if name == 'auto':
+        name = 'orjson' if load_orjson() else 'template'
+
+    if name == 'json':
+        return Serializer(json.JSONEncoder(default=encode_default).encode, names)
+    if name == 'template':
+        namespace = {'encode_string': json.encoder.encode_basestring_ascii}
+        exec(compile(generate_encoder_source(columns), '<encoder>', 'exec'), namespace)
+        return Serializer(namespace['encode'], names, namespace.get('encode_lines'))
+    if name == 'orjson':
+        orjson = load_orjson()
+        if orjson is None:
+            raise ImportError("The 'orjson' serializer requires the orjson package")
+        dumps = orjson.dumps
+        if any(get_datatype(datatype).kind == 'integer' and end - start > MAX_INTEGER_WIDTH
+               for _, start, end, datatype in columns):
+            # orjson only writes 64-bit integers; the standard library writes the same compact JSON for any integer
+            encode_str = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'), default=encode_default).encode
+
+            def encode_compact(row):
+                return encode_str(row).encode('utf-8')
+
+            return OrjsonSerializer(encode_compact, names)
+        if not any(get_datatype(datatype).kind == 'decimal' for _, _, _, datatype in columns):
+            # orjson writes dates itself, only Decimals need encode_default
+            return OrjsonSerializer(dumps, names)
+
+        def encode(row):
+            return dumps(row, default=encode_default)
+
+        return OrjsonSerializer(encode, names)
+
+    raise ValueError(f"Unknown serializer {name!r}, expected one of {', '.join(SERIALIZERS)}")
+
+
+class Serializer:
+    """
+    Encode rows as NDJSON from a function returning one JSON object as `str`.
+
+    Output uses the standard library's default separators and ASCII escaping,
+    e.g. `{"name": "Diabetes", "valid": true, "count": 1}`.
+
+    Args:
+        encode (callable): Function encoding one row as a JSON object.
+        names (list): Column names, in spec order.
+        encode_lines (callable): Optional function encoding a list of column
+            value lists as one JSON object per row, without building rows.
+    """
+
+    def __init__(self, encode, names, encode_lines=None):
+        self.encode = encode
+        self.names = names
+        self.encode_lines = encode_lines
+
+    def encode_chunk(self, rows):
+        """
+        Encode a chunk of rows as NDJSON.
+
+        Args:
+            rows (list): Decoded rows.
+
+        Returns:
+            bytes: One JSON object per row, each followed by a newline.
+        """
+        if not rows:
+            return b''
+        return ('\n'.join(map(self.encode, rows)) + '\n').encode('ascii')
+
+    def encode_columns(self, columns):
+        """
+        Encode a chunk of columns as NDJSON.
+
+        Args:
+            columns (list): One list of values per column, in spec order.
+
+        Returns:
+            bytes: One JSON object per row, each followed by a newline.
+        """
+        if self.encode_lines is None:
+            return self.encode_chunk([dict(zip(self.names, values)) for values in zip(*columns)])
+
+        lines = self.encode_lines(columns)
+        if not lines:
+            return b''
+        return ('\n'.join(lines) + '\n').encode('ascii')
+
+
+class OrjsonSerializer(Serializer):
+    """
+    Encode rows as compact NDJSON with orjson, e.g. `{"name":"Diabetes","valid":true,"count":1}`.
+    """
+
+    def encode_chunk(self, rows):
+        if not rows:
+            return b''
+        return b'\n'.join(map(self.encode, rows)) + b'\n'
+
+
+# 'auto' picks orjson when it is installed and 'template' otherwise
+SERIALIZERS = ['template', 'json', 'orjson', 'auto']
@@ -0,0 +1,126 @@
+import io
+import os
+from utils.compression import detect_codec, open_decompressed
+from utils.writer import AtomicWriter
+
+def get_shard_ranges(path, shards):
+    """
+    Split a file into contiguous byte ranges that start and end on line boundaries.
+
+    Args:
+        path (str): Path of the file to split.
+        shards (int): Desired number of ranges.
+
+    Returns:
+        list: List of (start, end) byte offsets covering the whole file. Fewer than
+            `shards` ranges are returned when lines are too long to split further,
+            and at least one range is always returned. Compressed files cannot be
+            split and give a single (0, None) range.
+    """
+    if detect_codec(path):
+        return [(0, None)]
+
+    size = os.path.getsize(path)
+    boundaries = [0]
+
+    with open(path, 'rb') as f:
+        for index in range(1, shards):
+            target = size * index // shards
+            if target <= boundaries[-1]:
+                continue
+
+            # Move to the start of the first line beginning at or after target
+            f.seek(target - 1)
+            f.readline()
+            boundary = f.tell()
+            if boundary < size and boundary > boundaries[-1]:
+                boundaries.append(boundary)
+
+    boundaries.append(size)
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+def open_data_file(path, start=0, end=None):
+    """
+    Open a data file in text mode, optionally restricted to a byte range.
+
+    Compressed data files, detected from their extension, are decompressed in
+    a background thread and can only be read whole.
+
+    Args:
+        path (str): Path of the data file.
+        start (int): Byte offset of the first line to read, must be a line boundary.
+        end (int): Byte offset where reading stops, None reads to the end of the file.
+
+    Returns:
+        file: Text file object yielding the lines within the range.
+
+    Raises:
+        ValueError: If a byte range of a compressed data file is requested.
+    """
+    if detect_codec(path):
+        check_whole_file(path, start, end)
+        return io.TextIOWrapper(open_decompressed(path))
+
+    if start == 0 and end is None:
+        return open(path, 'r')
+
+    f = open(path, 'rb')
+    f.seek(start)
+    if end is None:
+        return io.TextIOWrapper(f)
+    return io.TextIOWrapper(io.BufferedReader(RangeReader(f, end - start)))
+
+def check_whole_file(path, start, end):
+    """
+    Check that a compressed data file is read whole, as its byte offsets are not those of its lines.
+
+    Raises:
+        ValueError: If the range is not the whole file.
+    """
+    if start != 0 or end is not None:
+        raise ValueError(f"Compressed data file {os.path.basename(path)} cannot be read by byte range")
+
+def concat_files(paths, output_path):
+    """
+    Concatenate files in order into a single file and remove them.
+
+    The file is only renamed to `output_path` once complete, see AtomicWriter.
+
+    Args:
+        paths (list): Paths of the files to concatenate, in order.
+        output_path (str): Path of the file to write.
+    """
+    import shutil
+
+    with AtomicWriter(output_path) as output_file:
+        for path in paths:
+            with open(path, 'rb') as f:
+                shutil.copyfileobj(f, output_file, output_file.buffer_size)
+    for path in paths:
+        os.remove(path)
+
+
+class RangeReader(io.RawIOBase):
+    """
+    Raw binary reader returning at most `length` bytes from the current position of a file.
+    """
+
+    def __init__(self, f, length):
+        self.f = f
+        self.remaining = length
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        size = min(len(buffer), self.remaining)
+        if size <= 0:
+            return 0
+
+        read = self.f.readinto(memoryview(buffer)[:size])
+        self.remaining -= read
+        return read
+
+    def close(self):
+        self.f.close()
+        super().close()
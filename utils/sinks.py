@@ -0,0 +1,349 @@
+import os
+from utils.compression import get_codec_extension, open_compressed
+from utils.datatypes import MAX_INTEGER_WIDTH, get_datatype
+from utils.sharding import concat_files
+from utils.writer import DEFAULT_BUFFER_SIZE, AtomicWriter
+
+def load_pyarrow():
+    """
+    Import pyarrow, needed by every columnar output format.
+
+    Returns:
+        module: The pyarrow module.
+
+    Raises:
+        ImportError: If pyarrow is not installed.
+    """
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise ImportError("Arrow, Feather and Parquet output require the pyarrow package") from e
+    return pyarrow
+
+def get_arrow_type(pa, datatype, width):
+    """
+    Get the Arrow type of a column from the kind of its datatype.
+
+    Decimals fit any value of their field: implied decimals have their scale
+    and as many digits as the field, and DECIMAL fields, whose point can be
+    anywhere, as many digits on both sides of the point as the field.
+    INTEGER fields wider than an int64 holds are decimals without a scale.
+
+    Args:
+        pa (module): The pyarrow module.
+        datatype (Datatype): Datatype of the column.
+        width (int): Width of the column.
+
+    Returns:
+        pyarrow.DataType: Type of the column.
+
+    Raises:
+        ValueError: If the field is too wide for a decimal256.
+    """
+    if datatype.kind == 'integer' and width > MAX_INTEGER_WIDTH:
+        return pa.decimal128(width, 0) if width <= 38 else pa.decimal256(width, 0)
+    if datatype.kind == 'decimal':
+        scale = datatype.scale if datatype.scale is not None else max(width - 1, 0)
+        precision = max(width if datatype.scale is not None else width + scale, scale, 1)
+        return pa.decimal128(precision, scale) if precision <= 38 else pa.decimal256(precision, scale)
+
+    types = {'integer': pa.int64(), 'float': pa.float64(), 'boolean': pa.bool_(), 'date': pa.date32()}
+    return types.get(datatype.kind, pa.string())
+
+def get_arrow_schema(columns):
+    """
+    Build the Arrow schema of a spec: TEXT as utf8, INTEGER as nullable int64,
+    or decimal128 past 18 digits, FLOAT as float64, BOOLEAN as bool, DATE as
+    date32 and decimals as decimal128.
+
+    Other datatypes are written as utf8, as they are in NDJSON output.
+
+    Args:
+        columns (list): Columns as returned by get_columns.
+
+    Returns:
+        pyarrow.Schema: Schema with one field per column, in spec order.
+
+    Raises:
+        ValueError: If a column is too wide for any Arrow type of its datatype.
+    """
+    pa = load_pyarrow()
+    fields = []
+    for column_name, start, end, datatype in columns:
+        try:
+            fields.append((column_name, get_arrow_type(pa, get_datatype(datatype), end - start)))
+        except ValueError as e:
+            raise ValueError(f"Column {column_name!r} of width {end - start} has no Arrow type: {e}") from None
+    return pa.schema(fields)
+
+def get_extension(output_format, compression=None):
+    """
+    Get the file extension of an output format.
+
+    Args:
+        output_format (str): Name of the output format, one of OUTPUT_FORMATS.
+        compression (str): Name of the codec compressing the output, one of CODECS, or None.
+
+    Returns:
+        str: Extension including the leading dot, followed by the codec's extension, e.g. `.ndjson.zst`.
+
+    Raises:
+        ValueError: If no output format or codec has that name, or the output
+            format is columnar, as those compress their own data.
+    """
+    try:
+        extension = OUTPUT_FORMATS[output_format]
+    except KeyError:
+        raise ValueError(f"Unknown output format {output_format!r}, expected one of {', '.join(OUTPUT_FORMATS)}") \
+            from None
+
+    if compression is not None and output_format != 'ndjson':
+        raise ValueError(f"Compression only applies to ndjson output, not {output_format}")
+    return extension + get_codec_extension(compression)
+
+def open_sink(output_format, output_path, columns, serializer, compression=None, buffer_size=DEFAULT_BUFFER_SIZE):
+    """
+    Open an output file for the rows of a spec.
+
+    Args:
+        output_format (str): Name of the output format, one of OUTPUT_FORMATS.
+        output_path (str): Path of the output file to write.
+        columns (list): Columns of the spec, as returned by get_columns.
+        serializer (Serializer): Serializer encoding rows, used by NDJSON output.
+        compression (str): Name of the codec compressing NDJSON output, one of CODECS, or None.
+        buffer_size (int): Bytes of output gathered before each write to the output file.
+
+    Returns:
+        Sink: Sink writing chunks of rows or columns, to be used as a context manager.
+    """
+    get_extension(output_format, compression)
+    if output_format == 'ndjson':
+        return NdjsonSink(output_path, serializer, compression, buffer_size)
+    if output_format == 'parquet':
+        return ParquetSink(output_path, columns, buffer_size)
+    return ArrowSink(output_path, columns, buffer_size)
+
+def merge_outputs(output_format, part_paths, output_path):
+    """
+    Join output files written for consecutive parts of a data file into one, removing the parts.
+
+    Compressed NDJSON parts are concatenated too: gzip members, zstd frames
+    and lz4 frames decompress back to back. The output file is only renamed
+    to `output_path` once complete, see AtomicWriter.
+
+    Args:
+        output_format (str): Name of the output format of the parts.
+        part_paths (list): Paths of the part files, in order.
+        output_path (str): Path of the output file to write.
+    """
+    if output_format == 'ndjson':
+        concat_files(part_paths, output_path)
+        return
+
+    pa = load_pyarrow()
+    writer = None
+
+    # Copy record batches part by part so only one batch is held in memory at a time
+    with AtomicWriter(output_path) as output_file:
+        for part_path in part_paths:
+            if output_format == 'parquet':
+                import pyarrow.parquet as pq
+                with pq.ParquetFile(part_path) as part:
+                    writer = writer or pq.ParquetWriter(output_file, part.schema_arrow)
+                    for batch in part.iter_batches():
+                        writer.write_batch(batch)
+            else:
+                with pa.memory_map(part_path) as source:
+                    reader = pa.ipc.open_file(source)
+                    writer = writer or pa.ipc.new_file(output_file, reader.schema)
+                    for index in range(reader.num_record_batches):
+                        writer.write_batch(reader.get_batch(index))
+        writer.close()
+
+    for part_path in part_paths:
+        os.remove(part_path)
+
+
+class Sink:
+    """
+    Output file receiving decoded chunks, either as rows or as columns.
+
+    Writing a chunk encodes it first, e.g. as NDJSON bytes or as a record
+    batch, then writes the encoded chunk, so the two steps can be timed apart.
+    Sinks write through an AtomicWriter: the output file only appears at its
+    path once closed without error, and is discarded if the `with` block
+    raises.
+    """
+
+    def encode_rows(self, rows):
+        """
+        Encode a chunk of rows for writing.
+
+        Args:
+            rows (list): One dictionary per row.
+
+        Returns:
+            object: Encoded chunk, None if there is nothing to write.
+        """
+        raise NotImplementedError
+
+    def encode_columns(self, columns):
+        """
+        Encode a chunk of columns for writing.
+
+        Args:
+            columns (list): One list of values per column, in spec order.
+
+        Returns:
+            object: Encoded chunk, None if there is nothing to write.
+        """
+        raise NotImplementedError
+
+    def write(self, payload):
+        """
+        Write an encoded chunk.
+
+        Args:
+            payload (object): Chunk returned by encode_rows or encode_columns.
+        """
+        raise NotImplementedError
+
+    def write_rows(self, rows):
+        """
+        Write a chunk of rows.
+
+        Args:
+            rows (list): One dictionary per row.
+        """
+        self.write(self.encode_rows(rows))
+
+    def write_columns(self, columns):
+        """
+        Write a chunk of columns.
+
+        Args:
+            columns (list): One list of values per column, in spec order.
+        """
+        self.write(self.encode_columns(columns))
+
+    def close_writer(self):
+        """
+        Finish writing the output, before its AtomicWriter `file` is closed.
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """
+        Finish writing the output and rename it to its path.
+        """
+        try:
+            self.close_writer()
+        except BaseException:
+            self.file.abort()
+            raise
+        finally:
+            self.file.close()
+
+    def abort(self):
+        """
+        Stop writing and discard the output, leaving any previous file at its path untouched.
+        """
+        self.file.abort()
+        try:
+            self.close()
+        except Exception:
+            # The error that aborted the sink is the one worth reporting
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc_info):
+        if exc_type is not None:
+            self.abort()
+        else:
+            self.close()
+
+
+class NdjsonSink(Sink):
+    """
+    Write one JSON object per row using a spec's serializer, optionally compressed in a background thread.
+    """
+
+    def __init__(self, output_path, serializer, compression=None, buffer_size=DEFAULT_BUFFER_SIZE):
+        self.serializer = serializer
+        self.file = AtomicWriter(output_path, buffer_size)
+        try:
+            self.f = open_compressed(self.file, compression) if compression else self.file
+        except BaseException:
+            self.file.abort()
+            self.file.close()
+            raise
+
+    def encode_rows(self, rows):
+        return self.serializer.encode_chunk(rows)
+
+    def encode_columns(self, columns):
+        return self.serializer.encode_columns(columns)
+
+    def write(self, payload):
+        self.f.write(payload)
+
+    def close_writer(self):
+        if self.f is not self.file:
+            self.f.close()
+
+
+class ArrowSink(Sink):
+    """
+    Write each chunk as a record batch of an Arrow IPC file, which is also the Feather v2 format.
+    """
+
+    def __init__(self, output_path, columns, buffer_size=DEFAULT_BUFFER_SIZE):
+        self.pa = load_pyarrow()
+        self.schema = get_arrow_schema(columns)
+        self.names = self.schema.names
+        self.file = AtomicWriter(output_path, buffer_size)
+        try:
+            self.writer = self.open_writer(self.file)
+        except BaseException:
+            self.file.abort()
+            self.file.close()
+            raise
+
+    def open_writer(self, f):
+        return self.pa.ipc.new_file(f, self.schema)
+
+    def encode_rows(self, rows):
+        return self.encode_columns([[row[name] for row in rows] for name in self.names])
+
+    def encode_columns(self, columns):
+        if columns and columns[0]:
+            return self.pa.record_batch(columns, schema=self.schema)
+        return None
+
+    def write(self, payload):
+        if payload is not None:
+            self.writer.write_batch(payload)
+
+    def close_writer(self):
+        self.writer.close()
+
+
+class ParquetSink(ArrowSink):
+    """
+    Write each chunk as a row group of a Parquet file.
+    """
+
+    def open_writer(self, f):
+        import pyarrow.parquet as pq
+        return pq.ParquetWriter(f, self.schema)
+
+
+# Output formats and the extension of the files they write
+OUTPUT_FORMATS = {
+    'ndjson': '.ndjson',
+    'arrow': '.arrow',
+    'feather': '.feather',
+    'parquet': '.parquet',
+}
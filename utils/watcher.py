@@ -0,0 +1,109 @@
+import os
+import time
+
+def scan_stats(directory):
+    """
+    Get the size and modification time of the regular files in a directory.
+
+    Args:
+        directory (str): Directory path.
+
+    Returns:
+        dict: Dictionary mapping file names to (size, mtime_ns) tuples, empty
+            if the directory does not exist.
+    """
+    try:
+        with os.scandir(directory) as entries:
+            stats = {}
+            for entry in entries:
+                try:
+                    if entry.is_file():
+                        stat = entry.stat()
+                        stats[entry.name] = (stat.st_size, stat.st_mtime_ns)
+                except FileNotFoundError:
+                    # Removed between listing and stat
+                    continue
+            return stats
+    except FileNotFoundError:
+        return {}
+
+
+class DirectoryWatcher:
+    """
+    Report files of a directory that were added or modified, once they stop changing.
+
+    A file is reported when its size and modification time are the same in
+    two consecutive polls, so files still being written are not picked up
+    half way. Polling only lists the directory again when its own modification
+    time changed, which happens when files are created, renamed or removed,
+    and otherwise stats the files waiting to settle. A full listing every
+    `full_scan_interval` seconds also catches files rewritten in place.
+
+    Args:
+        directory (str): Directory to watch.
+        full_scan_interval (float): Seconds between full listings of an unchanged directory.
+    """
+
+    def __init__(self, directory, full_scan_interval=5.0):
+        self.directory = directory
+        self.full_scan_interval = full_scan_interval
+        self.directory_mtime = None
+        self.last_full_scan = 0.0
+        self.previous = {}
+        self.reported = {}
+
+    def get_directory_mtime(self):
+        try:
+            return os.stat(self.directory).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def scan(self):
+        """
+        Stat the files that may have changed since the previous poll.
+
+        Returns:
+            dict: Dictionary mapping file names to (size, mtime_ns) tuples.
+        """
+        directory_mtime = self.get_directory_mtime()
+        now = time.monotonic()
+
+        if directory_mtime != self.directory_mtime or now - self.last_full_scan >= self.full_scan_interval:
+            self.directory_mtime = directory_mtime
+            self.last_full_scan = now
+            return scan_stats(self.directory)
+
+        # Nothing was added or removed: only files waiting to settle can change
+        stats = dict(self.reported)
+        for name in self.previous:
+            if self.previous[name] != self.reported.get(name):
+                try:
+                    stat = os.stat(os.path.join(self.directory, name))
+                    stats[name] = (stat.st_size, stat.st_mtime_ns)
+                except FileNotFoundError:
+                    stats.pop(name, None)
+        return stats
+
+    def poll(self):
+        """
+        Find files that changed and have settled since they were last reported.
+
+        Returns:
+            tuple: List of (file name, (size, mtime_ns)) tuples of settled new
+                or modified files, and list of file names removed since the
+                previous poll.
+        """
+        stats = self.scan()
+        changed = [
+            (name, stat) for name, stat in stats.items()
+            if self.previous.get(name) == stat and self.reported.get(name) != stat
+        ]
+        removed = [name for name in self.reported if name not in stats]
+
+        for name, stat in changed:
+            self.reported[name] = stat
+        for name in removed:
+            del self.reported[name]
+        self.previous = stats
+
+        return sorted(changed), removed
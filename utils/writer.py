@@ -0,0 +1,127 @@
+import io
+import os
+
+# Bytes gathered before they are written to the output file in one call
+DEFAULT_BUFFER_SIZE = 8 << 20
+
+def fsync_directory(directory):
+    """
+    Flush a directory entry to disk, so a file renamed into it survives a crash.
+
+    Not every platform can open directories; there this does nothing.
+
+    Args:
+        directory (str): Path of the directory.
+    """
+    if not hasattr(os, 'O_DIRECTORY'):
+        return
+    fd = os.open(directory or '.', os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class AtomicWriter(io.RawIOBase):
+    """
+    Write a file through a temporary file, renamed to its final path only once complete.
+
+    Writes are gathered into a buffer of `buffer_size` bytes that is written
+    with a single call, so many small writes cost few system calls. Closing
+    writes the rest, fsyncs the temporary file and renames it over `path`, so
+    readers only ever see the previous file or the complete new one. An
+    aborted writer removes its temporary file instead, and so does a writer
+    garbage collected without being closed.
+
+    Args:
+        path (str): Final path of the file.
+        buffer_size (int): Bytes gathered before writing, 0 writes every call through.
+        fsync (bool): Flush the file and its directory entry to disk before and after renaming it.
+    """
+
+    def __init__(self, path, buffer_size=DEFAULT_BUFFER_SIZE, fsync=True):
+        self.path = path
+        self.temp_path = f'{path}.{os.getpid()}.tmp'
+        self.buffer_size = buffer_size
+        self.fsync = fsync
+        self.buffer = []
+        self.buffered = 0
+        self.position = 0
+        self.aborted = False
+        self.f = open(self.temp_path, 'wb', buffering=0)
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        # Callers may reuse the memory of anything but bytes
+        b = b if b.__class__ is bytes else bytes(b)
+        size = len(b)
+        if not self.buffer and size >= self.buffer_size:
+            # Large enough already, skip copying it into the buffer
+            self.write_through(b)
+        else:
+            self.buffer.append(b)
+            self.buffered += size
+            if self.buffered >= self.buffer_size:
+                self.flush_buffer()
+        self.position += size
+        return size
+
+    def tell(self):
+        return self.position
+
+    def write_through(self, b):
+        with memoryview(b) as view:
+            written = 0
+            # Unbuffered writes may be partial
+            while written < len(view):
+                written += self.f.write(view[written:])
+
+    def flush_buffer(self):
+        if self.buffer:
+            # Joining once is much cheaper than growing a bytearray write by write
+            self.write_through(b''.join(self.buffer))
+            self.buffer = []
+            self.buffered = 0
+
+    def abort(self):
+        """
+        Discard the file when closed, leaving any previous file at `path` untouched.
+        """
+        self.aborted = True
+
+    def close(self):
+        if self.closed:
+            return
+        try:
+            if not self.aborted:
+                self.flush_buffer()
+                if self.fsync:
+                    os.fsync(self.f.fileno())
+        except BaseException:
+            self.aborted = True
+            raise
+        finally:
+            self.f.close()
+            super().close()
+            if self.aborted:
+                try:
+                    os.remove(self.temp_path)
+                except FileNotFoundError:
+                    pass
+            else:
+                os.replace(self.temp_path, self.path)
+                if self.fsync:
+                    fsync_directory(os.path.dirname(self.path))
+
+    def __del__(self):
+        # io.IOBase closes, which would publish a partial file; only an explicit close commits it
+        if not self.closed:
+            self.abort()
+        super().__del__()
+
+    def __exit__(self, exc_type, *exc_info):
+        if exc_type is not None:
+            self.abort()
+        self.close()